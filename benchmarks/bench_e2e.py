@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""End-to-end benchmark: real consume_events_sse consumers against the local stand-in relay.
+
+For each target rate (default 10, 1000 and 10000 events/s) this starts a fresh
+`python -m awfl.devrelay` and a fresh worker process. The worker runs the real
+project consumer (executes tools) and session consumer (logs one session) with
+API_ORIGIN pointed at the relay, HOME and the working directory in a throwaway
+sandbox, and stdout discarded. The relay then emits a mix of READ_FILE,
+UPDATE_FILE and RUN_COMMAND tool calls and content events for --duration
+seconds; the worker waits until the project cursor reaches the last event (or
+--drain-timeout) and reports:
+
+- sustained throughput (events fully processed / seconds to process them)
+- dispatch latency percentiles (queue: reader -> handler start) and the other
+  pipeline stages from awfl.events.latency
+- peak RSS (sampled /proc/self/status VmRSS; ru_maxrss elsewhere)
+- CPU per event (worker process CPU only; tool subprocesses are excluded)
+- callback success rate (callbacks received by the relay without an error
+  field / tool calls emitted)
+
+Results are written as JSON (suite metadata + one entry per rate) so runs on
+different releases can be compared with --compare.
+
+Usage:
+  python benchmarks/bench_e2e.py [--rates 10,1000,10000] [--duration 10] [--out FILE]
+  python benchmarks/bench_e2e.py --compare old.json new.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+TOOLS = "READ_FILE,UPDATE_FILE,RUN_COMMAND"
+PROJECT_ID = "bench"
+SESSION_ID = "load-0"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get_json(url: str, data=None, timeout: float = 10.0):
+    body = json.dumps(data).encode("utf-8") if data is not None else None
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# ----- worker (runs inside the sandbox) -----
+
+async def _worker(ns: argparse.Namespace) -> dict:
+    from awfl.consumer import consume_events_sse
+    from awfl.consumer.telemetry import telemetry_stats
+    from awfl.events.latency import latency_summary
+    from awfl.response_handler import set_session
+    from awfl.utils.http import close_http_session, http_stats
+
+    set_session(SESSION_ID)
+    origin = os.environ["API_ORIGIN"]
+    consumers = [asyncio.create_task(consume_events_sse(scope=s), name=f"bench-{s}") for s in ns.scopes.split(",")]
+
+    peak_rss = _rss_bytes()
+    stop_sampling = False
+
+    async def _sample_rss():
+        nonlocal peak_rss
+        while not stop_sampling:
+            peak_rss = max(peak_rss, _rss_bytes())
+            await asyncio.sleep(0.1)
+
+    sampler = asyncio.create_task(_sample_rss())
+
+    # Wait for the consumers to connect before generating load
+    for _ in range(200):
+        if _get_json(f"{origin}/_relay/stats")["streams_open"] >= len(consumers):
+            break
+        await asyncio.sleep(0.05)
+
+    cpu0 = time.process_time()
+    t0 = time.monotonic()
+    await asyncio.to_thread(
+        _get_json,
+        f"{origin}/_relay/load",
+        {
+            "projectId": PROJECT_ID,
+            "rate": ns.rate,
+            "sessions": ns.sessions,
+            "tools": ns.tools,
+            "toolRatio": ns.tool_ratio,
+            "payloadBytes": ns.payload_bytes,
+            "durationSecs": ns.duration,
+            "seed": 1,
+        },
+    )
+
+    stats = {}
+    drained = False
+    deadline = t0 + ns.duration + ns.drain_timeout
+    processed_at = None
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.2)
+        stats = await asyncio.to_thread(_get_json, f"{origin}/_relay/stats")
+        load = stats.get("load") or {}
+        if load.get("running"):
+            continue
+        cursor = stats["cursors"].get(f"{PROJECT_ID}:*")
+        if cursor == str(stats["events_emitted"]) and stats["pending_callbacks"] == 0:
+            processed_at = time.monotonic()
+            drained = True
+            break
+    elapsed = (processed_at or time.monotonic()) - t0
+    cpu = time.process_time() - cpu0
+    # Snapshot before cancelling: closed connections leave the telemetry registry
+    conns = telemetry_stats()
+
+    for t in consumers:
+        t.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+    http = http_stats()["async"]
+    await close_http_session()
+    stop_sampling = True
+    await sampler
+
+    load = stats.get("load") or {}
+    emitted = stats.get("events_emitted", 0)
+    tool_calls = sum(v for k, v in (load.get("by_tool") or {}).items() if k != "content")
+    received = conns.get("sse-project", {}).get("events", 0)
+    callbacks_ok = stats.get("callbacks", 0) - stats.get("callback_errors", 0)
+    # Without a drained cursor, count only what the project consumer actually received
+    processed = emitted if drained else received
+    stages = {}
+    for row in latency_summary():
+        stages.setdefault(row["stage"], {})[row["tool"]] = {k: row[k] for k in ("count", "p50", "p95", "p99", "max")}
+
+    return {
+        "target_rate": ns.rate,
+        "duration_secs": ns.duration,
+        "emitted": emitted,
+        "emit_rate": load.get("actual_rate"),
+        "tool_calls": tool_calls,
+        "drained": drained,
+        "elapsed_secs": round(elapsed, 3),
+        "throughput_eps": round(processed / elapsed, 1) if elapsed > 0 else None,
+        "dispatch_latency_ms": stages.get("queue", {}),
+        "latency_ms": stages,
+        "peak_rss_mb": round(peak_rss / 2**20, 1),
+        "cpu_secs": round(cpu, 3),
+        "cpu_us_per_event": round(cpu / processed * 1e6, 1) if processed else None,
+        "callbacks": stats.get("callbacks", 0),
+        "callback_errors": stats.get("callback_errors", 0),
+        "callback_success_rate": round(callbacks_ok / tool_calls, 4) if tool_calls else None,
+        "callback_latency_ms": stats.get("callback_latency_ms"),
+        "reconnects": sum(c.get("reconnects", 0) for c in conns.values()),
+        "http_requests": http["requests"],
+        "http_connections_created": http["connections_created"],
+        "http_connections_reused": http["connections_reused"],
+    }
+
+
+# ----- driver -----
+
+def _run_level(ns: argparse.Namespace, rate: float) -> dict:
+    port = _free_port()
+    origin = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory(prefix="awfl-bench-") as sandbox:
+        with open(os.path.join(sandbox, "README.md"), "w") as f:
+            f.write("benchmark fixture\n" * 64)
+        env = dict(os.environ)
+        env.update(
+            {
+                "API_ORIGIN": origin,
+                "SKIP_AUTH": "1",
+                "AWFL_PROJECT_ID": PROJECT_ID,
+                "HOME": sandbox,
+                "AWFL_CURSOR_FLUSH_SECS": "0.2",
+                "PYTHONUNBUFFERED": "1",
+            }
+        )
+        env.pop("WORKFLOW_ENV", None)
+        relay = subprocess.Popen(
+            [sys.executable, "-m", "awfl.devrelay", "--port", str(port), "--project-id", PROJECT_ID, "--heartbeat", "5"],
+            cwd=sandbox,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            for _ in range(100):
+                try:
+                    _get_json(f"{origin}/_relay/stats", timeout=1)
+                    break
+                except Exception:
+                    time.sleep(0.1)
+            result_path = os.path.join(sandbox, "result.json")
+            cmd = [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--worker",
+                "--result",
+                result_path,
+                "--rate",
+                str(rate),
+                "--duration",
+                str(ns.duration),
+                "--drain-timeout",
+                str(ns.drain_timeout),
+                "--sessions",
+                str(ns.sessions),
+                "--tools",
+                ns.tools,
+                "--tool-ratio",
+                str(ns.tool_ratio),
+                "--payload-bytes",
+                str(ns.payload_bytes),
+                "--scopes",
+                ns.scopes,
+            ]
+            subprocess.run(cmd, cwd=sandbox, env=env, stdout=subprocess.DEVNULL, check=True)
+            with open(result_path) as f:
+                return json.load(f)
+        finally:
+            relay.terminate()
+            try:
+                relay.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                relay.kill()
+
+
+def _metadata() -> dict:
+    meta = {
+        "suite": "e2e",
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+    try:
+        from importlib.metadata import version
+
+        meta["awfl_version"] = version("awfl")
+    except Exception:
+        meta["awfl_version"] = None
+    try:
+        meta["git_commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except Exception:
+        meta["git_commit"] = None
+    try:
+        from awfl.utils import json_backend_name
+
+        meta["json_backend"] = json_backend_name()
+    except Exception:
+        pass
+    return meta
+
+
+def _summary_line(r: dict) -> str:
+    q = r["dispatch_latency_ms"]
+    qs = ", ".join(f"{tool} p50={v['p50']} p99={v['p99']}" for tool, v in sorted(q.items())) or "-"
+    return (
+        f"{r['target_rate']:>8g}/s  emitted={r['emitted']:<7} thr={r['throughput_eps']}/s  drained={r['drained']}  "
+        f"cpu={r['cpu_us_per_event']}us/evt  rss={r['peak_rss_mb']}MB  cb_ok={r['callback_success_rate']}  dispatch[{qs}]"
+    )
+
+
+def _compare(old_path: str, new_path: str) -> None:
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    by_rate = {r["target_rate"]: r for r in old["results"]}
+    print(f"{old['meta'].get('git_commit')} -> {new['meta'].get('git_commit')}")
+    for r in new["results"]:
+        o = by_rate.get(r["target_rate"])
+        if o is None:
+            continue
+        parts = []
+        for key in ("throughput_eps", "cpu_us_per_event", "peak_rss_mb", "callback_success_rate", "http_connections_created"):
+            a, b = o.get(key), r.get(key)
+            if isinstance(a, (int, float)) and isinstance(b, (int, float)) and a:
+                parts.append(f"{key}={a:g}->{b:g} ({(b - a) / a * 100:+.1f}%)")
+        print(f"{r['target_rate']:>8g}/s  " + "  ".join(parts))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rates", default="10,1000,10000", help="comma-separated target events/sec")
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds of load per rate")
+    ap.add_argument("--drain-timeout", type=float, default=60.0, help="max seconds to wait for the backlog after load stops")
+    ap.add_argument("--sessions", type=int, default=4)
+    ap.add_argument("--tools", default=TOOLS)
+    ap.add_argument("--tool-ratio", type=float, default=0.5)
+    ap.add_argument("--payload-bytes", type=int, default=256)
+    ap.add_argument("--scopes", default="project,session", help="consumers to run in the worker")
+    ap.add_argument("--out", default=None, help="results file (default benchmarks/results/e2e-<time>.json)")
+    ap.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results files and exit")
+    # internal: one measurement inside the sandbox
+    ap.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--result", help=argparse.SUPPRESS)
+    ap.add_argument("--rate", type=float, help=argparse.SUPPRESS)
+    ns = ap.parse_args()
+
+    if ns.compare:
+        _compare(*ns.compare)
+        return
+    if ns.worker:
+        result = asyncio.run(_worker(ns))
+        with open(ns.result, "w") as f:
+            json.dump(result, f)
+        return
+
+    rates = [float(r) for r in ns.rates.split(",") if r.strip()]
+    results = []
+    for rate in rates:
+        r = _run_level(ns, rate)
+        results.append(r)
+        print(_summary_line(r), flush=True)
+
+    out = ns.out or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "results", f"e2e-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    params = {k: getattr(ns, k) for k in ("duration", "drain_timeout", "sessions", "tools", "tool_ratio", "payload_bytes", "scopes")}
+    with open(out, "w") as f:
+        json.dump({"meta": _metadata(), "params": params, "results": results}, f, indent=2)
+    print(f"wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-event CPU of decoding and routing an SSE event in mode="both".
+
+- legacy: json.loads of the frame, then the logger and the executor each walk the
+  raw dict and json.loads the tool-call arguments (the previous code paths).
+- model:  one json_loads (orjson when installed) into an Event that both sinks
+  share, with arguments decoded lazily once.
+
+Only decoding and field extraction are timed; logging output is discarded and no
+tool is executed. Reports CPU microseconds per event (time.process_time).
+
+Usage:
+  python benchmarks/bench_event_model.py [--events N] [--content-bytes N] [--repeat N]
+"""
+import argparse
+import json
+import time
+from unittest import mock
+
+from awfl.events.model import Event
+from awfl.response_handler import event_logger
+from awfl.response_handler.rh_utils import is_background_from_payload, ts_to_ms
+from awfl.utils import json_backend_name, json_loads
+
+
+def build_frames(events: int, content_bytes: int) -> list:
+    frames = []
+    for i in range(events):
+        args = {"filepath": f"src/module_{i}.py", "content": "x" * content_bytes}
+        payload = {
+            "create_time": "2025-01-01T00:00:00Z",
+            "callback_id": f"cb-{i}",
+            "status": "Running",
+            "cost": 0.01 * i,
+            "content": None,
+            "attributes": {"sessionId": "s-1"},
+            "tool_call": {"function": {"name": "UPDATE_FILE", "arguments": json.dumps(args)}},
+        }
+        frames.append(json.dumps(payload))
+    return frames
+
+
+def _legacy_logger(data: dict) -> None:
+    # Field access as process_event did before the Event model
+    updated_at = data.get("create_time")
+    ts_ms = ts_to_ms(updated_at) if updated_at else 0
+    is_background = is_background_from_payload(data)
+    event_logger.apply_status(data.get("status"), data.get("error"), is_background=is_background, ts_ms=ts_ms)
+    if "cost" in data:
+        event_logger.log_cost_if_changed(data.get("cost"))
+    tc = data.get("tool_call")
+    if tc:
+        fn = (tc or {}).get("function", {}) or {}
+        name = (fn.get("name") or "").upper()
+        args_raw = fn.get("arguments") or "{}"
+        try:
+            args = json.loads(args_raw) if isinstance(args_raw, str) else (args_raw or {})
+        except Exception:
+            args = {}
+        event_logger.log_tool_call(name, args, is_background=is_background)
+
+
+def _legacy_executor_prelude(data: dict):
+    # Field access handle_response did before dispatching on the tool name
+    data.get("callback_id"), data.get("create_time"), data.get("workdir")
+    tc = data.get("tool_call")
+    if tc:
+        fn = (tc or {}).get("function", {}) or {}
+        name = (fn.get("name") or "").upper()
+        args_raw = fn.get("arguments") or "{}"
+        args = json.loads(args_raw) if isinstance(args_raw, str) else (args_raw or {})
+        return name, args.get("filepath")
+    return None
+
+
+def _model_executor_prelude(ev: Event):
+    ev.callback_id, ev.create_time, ev.workdir
+    if ev.tool_call:
+        return ev.tool_name, ev.args.get("filepath")
+    return None
+
+
+def run_legacy(frames: list) -> None:
+    for text in frames:
+        data = json.loads(text)
+        _legacy_logger(data)
+        _legacy_executor_prelude(data)
+
+
+def run_model(frames: list) -> None:
+    for text in frames:
+        ev = Event(json_loads(text))
+        event_logger.process_event(ev)
+        _model_executor_prelude(ev)
+
+
+def measure(fn, frames: list, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.process_time()
+        fn(frames)
+        best = min(best, time.process_time() - t0)
+    return {"cpu_seconds": round(best, 6), "cpu_us_per_event": round(best / len(frames) * 1e6, 2)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--events", type=int, default=20000)
+    ap.add_argument("--content-bytes", type=int, default=2048)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    frames = build_frames(args.events, args.content_bytes)
+    with mock.patch.object(event_logger, "log_unique", lambda *_a, **_k: None):
+        results = {
+            "json_backend": json_backend_name(),
+            "events": len(frames),
+            "legacy": measure(run_legacy, frames, args.repeat),
+            "model": measure(run_model, frames, args.repeat),
+        }
+    results["speedup"] = round(results["legacy"]["cpu_seconds"] / results["model"]["cpu_seconds"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
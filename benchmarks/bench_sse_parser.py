@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: line-based SSEParser vs byte-level SSEByteParser.
+
+Builds a synthetic text/event-stream with tool-call sized events and measures
+events/sec plus traced memory (tracemalloc peak and allocated blocks) for:
+
+- legacy: the previous consumer path (aiohttp line iterator -> decode ->
+  splitlines(True) -> SSEParser.feed_line)
+- bytes:  iter_chunked-style chunks -> SSEByteParser.feed
+
+With --pipeline, both paths also run behind a real aiohttp StreamReader so the
+line iterator's own cost (the old `async for raw in resp.content`) is included.
+
+Usage:
+  python benchmarks/bench_sse_parser.py [--events N] [--data-bytes N] [--chunk N] [--repeat N] [--pipeline]
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from awfl.consumer.sse_parser import SSEParser, SSEByteParser
+
+
+def build_stream(events: int, data_bytes: int) -> bytes:
+    parts = []
+    filler = "x" * max(0, data_bytes)
+    for i in range(events):
+        payload = {
+            "create_time": "2025-01-01T00:00:00Z",
+            "callback_id": f"cb-{i}",
+            "tool_call": {"function": {"name": "READ_FILE", "arguments": json.dumps({"filepath": "README.md"})}},
+            "content": filler,
+        }
+        parts.append(f"id: {i}\nevent: message\ndata: {json.dumps(payload)}\n\n")
+        if i % 50 == 0:
+            parts.append(": heartbeat\n\n")
+    return "".join(parts).encode("utf-8")
+
+
+def run_legacy(lines: list) -> int:
+    parser = SSEParser()
+    count = 0
+    for raw in lines:
+        line = raw.decode("utf-8", errors="ignore")
+        for l in line.splitlines(True):
+            if parser.feed_line(l) is not None:
+                count += 1
+    return count
+
+
+def run_bytes(chunks: list) -> int:
+    parser = SSEByteParser()
+    count = 0
+    for chunk in chunks:
+        count += len(parser.feed(chunk))
+    return count
+
+
+class _Protocol:
+    """Just enough of aiohttp's BaseProtocol for a detached StreamReader."""
+
+    _reading_paused = False
+
+    def pause_reading(self, **_kw):
+        self._reading_paused = True
+
+    def resume_reading(self, **_kw):
+        self._reading_paused = False
+
+
+def _reader(chunks: list):
+    from aiohttp.streams import StreamReader
+
+    reader = StreamReader(_Protocol(), 2**16, loop=asyncio.get_event_loop())
+    for c in chunks:
+        reader.feed_data(c)
+    reader.feed_eof()
+    return reader
+
+
+async def _pipeline_legacy(chunks: list) -> int:
+    parser = SSEParser()
+    count = 0
+    async for raw in _reader(chunks):
+        line = raw.decode("utf-8", errors="ignore")
+        for l in line.splitlines(True):
+            if parser.feed_line(l) is not None:
+                count += 1
+    return count
+
+
+async def _pipeline_bytes(chunks: list) -> int:
+    parser = SSEByteParser()
+    count = 0
+    async for raw in _reader(chunks).iter_chunked(64 * 1024):
+        count += len(parser.feed(raw))
+    return count
+
+
+def run_pipeline_legacy(chunks: list) -> int:
+    return asyncio.run(_pipeline_legacy(chunks))
+
+
+def run_pipeline_bytes(chunks: list) -> int:
+    return asyncio.run(_pipeline_bytes(chunks))
+
+
+def measure(fn, arg, repeat: int) -> dict:
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        try:
+            count = fn(arg)
+        except Exception as e:
+            # e.g. aiohttp's line iterator rejecting lines above its limit
+            return {"error": f"{type(e).__name__}: {e}"[:200]}
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    blocks_before = tracemalloc.take_snapshot()
+    fn(arg)
+    _cur, peak = tracemalloc.get_traced_memory()
+    blocks_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(s.count_diff for s in blocks_after.compare_to(blocks_before, "filename") if s.count_diff > 0)
+    return {
+        "events": count,
+        "seconds": round(best, 6),
+        "events_per_sec": round(count / best) if best > 0 else None,
+        "peak_traced_kib": round(peak / 1024, 1),
+        "retained_blocks": grown,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--events", type=int, default=20000)
+    ap.add_argument("--data-bytes", type=int, default=512)
+    ap.add_argument("--chunk", type=int, default=64 * 1024)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--pipeline", action="store_true", help="also measure behind aiohttp's StreamReader")
+    args = ap.parse_args()
+
+    stream = build_stream(args.events, args.data_bytes)
+    lines = stream.splitlines(True)  # what aiohttp's line iterator would hand us
+    chunks = [stream[i : i + args.chunk] for i in range(0, len(stream), args.chunk)]
+
+    results = {
+        "stream_bytes": len(stream),
+        "legacy": measure(run_legacy, lines, args.repeat),
+        "bytes": measure(run_bytes, chunks, args.repeat),
+    }
+    if args.pipeline:
+        results["pipeline_legacy"] = measure(run_pipeline_legacy, chunks, args.repeat)
+        results["pipeline_bytes"] = measure(run_pipeline_bytes, chunks, args.repeat)
+    for prefix in ("", "pipeline_"):
+        legacy = results.get(prefix + "legacy")
+        new = results.get(prefix + "bytes")
+        if legacy and new and legacy.get("events_per_sec") and new.get("events_per_sec"):
+            results[prefix + "speedup"] = round((new["events_per_sec"] or 0) / legacy["events_per_sec"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
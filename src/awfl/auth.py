@@ -1,11 +1,13 @@
+import asyncio
 import os
 import time
 import json
 import base64
 import pathlib
+import weakref
 from typing import Dict, Any, Optional, Tuple
 
-import requests
+import aiohttp
 
 CACHE_DIR = pathlib.Path.home() / ".awfl"
 CACHE_PATH = CACHE_DIR / "tokens.json"
@@ -132,11 +134,17 @@ def _get_google_oauth_client_secret() -> str:
     )
 
 
+def _http():
+    # Local import to avoid circular import at module import time (awfl.utils imports awfl.auth)
+    from awfl.utils.http import get_sync_session
+    return get_sync_session()
+
+
 def _firebase_refresh(refresh_token: str) -> Tuple[str, str, int]:
     api_key = _get_firebase_api_key()
     if not api_key:
         raise RuntimeError("FIREBASE_API_KEY not set; cannot refresh Firebase token.")
-    r = requests.post(
+    r = _http().post(
         f"{FIREBASE_REFRESH_URL}?key={api_key}",
         data={
             "grant_type": "refresh_token",
@@ -145,7 +153,29 @@ def _firebase_refresh(refresh_token: str) -> Tuple[str, str, int]:
         timeout=20,
     )
     r.raise_for_status()
-    d = r.json()
+    return _parse_refresh(r.json(), refresh_token)
+
+
+async def _firebase_refresh_async(refresh_token: str) -> Tuple[str, str, int]:
+    """_firebase_refresh() on the shared aiohttp session (does not block the event loop)."""
+    from awfl.utils.http import get_http_session
+
+    api_key = _get_firebase_api_key()
+    if not api_key:
+        raise RuntimeError("FIREBASE_API_KEY not set; cannot refresh Firebase token.")
+    async with get_http_session().post(
+        f"{FIREBASE_REFRESH_URL}?key={api_key}",
+        data={
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+        },
+        timeout=aiohttp.ClientTimeout(total=20),
+    ) as r:
+        r.raise_for_status()
+        return _parse_refresh(await r.json(content_type=None), refresh_token)
+
+
+def _parse_refresh(d: Dict[str, Any], refresh_token: str) -> Tuple[str, str, int]:
     id_token = d["id_token"]
     new_refresh = d.get("refresh_token", refresh_token)
     expires_at = _now() + int(d.get("expires_in", 3600)) - 60
@@ -162,7 +192,7 @@ def _firebase_sign_in_with_google_id_token(google_id_token: str) -> Dict[str, An
         "returnSecureToken": True,
         "returnIdpCredential": True,
     }
-    r = requests.post(
+    r = _http().post(
         f"{FIREBASE_IDP_URL}?key={api_key}",
         json=payload,
         timeout=30,
@@ -181,7 +211,7 @@ def _firebase_sign_in_with_custom_token(custom_token: str) -> Dict[str, Any]:
         "token": custom_token,
         "returnSecureToken": True,
     }
-    r = requests.post(
+    r = _http().post(
         f"{FIREBASE_CUSTOM_TOKEN_URL}?key={api_key}",
         json=payload,
         timeout=30,
@@ -203,7 +233,7 @@ def _google_device_flow() -> str:
         print(f"[auth] Using GOOGLE_OAUTH_CLIENT_ID={client_id}")
 
     # Step 1: request device/user codes
-    r = requests.post(
+    r = _http().post(
         DEVICE_CODE_URL,
         data={
             "client_id": client_id,
@@ -249,7 +279,7 @@ def _google_device_flow() -> str:
         # Some Google OAuth clients require a client_secret; include if present
         if client_secret:
             data["client_secret"] = client_secret
-        t = requests.post(TOKEN_URL, data=data, timeout=20)
+        t = _http().post(TOKEN_URL, data=data, timeout=20)
         if t.status_code == 200:
             tok = t.json()
             if "id_token" in tok:
@@ -380,6 +410,10 @@ def _refresh_if_needed(acct: Dict[str, Any], gcp_project: Optional[str] = None)
     if _now() < int(acct.get("expiresAt", 0)):
         return acct
     id_token, refresh_token, expires_at = _firebase_refresh(acct.get("refreshToken"))
+    return _store_refreshed(acct, id_token, refresh_token, expires_at, gcp_project)
+
+
+def _store_refreshed(acct: Dict[str, Any], id_token: str, refresh_token: str, expires_at: int, gcp_project: Optional[str] = None) -> Dict[str, Any]:
     acct.update({
         "idToken": id_token,
         "refreshToken": refresh_token or acct.get("refreshToken"),
@@ -490,3 +524,59 @@ def get_auth_headers() -> Dict[str, str]:
             headers["Authorization"] = f"Bearer {acct['idToken']}"
 
     return headers
+
+
+def _cached_account(gcp_project: str) -> Optional[Dict[str, Any]]:
+    """The cached account get_auth_headers() would use, without logging in or refreshing."""
+    cache = _load_cache()
+    if os.getenv("FIREBASE_CUSTOM_TOKEN"):
+        for v in _project_bucket(cache, gcp_project).get("accounts", {}).values():
+            if v.get("provider") == "custom":
+                return v
+        return None
+    return _get_active_account_for_project(cache, gcp_project)
+
+
+# One lock per event loop: asyncio locks bind to the loop that first waits on
+# them, and the CLI runs one-shot loops (run_blocking/asyncio.run) besides the main one
+_refresh_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+
+def _refresh_lock() -> asyncio.Lock:
+    loop = asyncio.get_running_loop()
+    lock = _refresh_locks.get(loop)
+    if lock is None:
+        lock = _refresh_locks[loop] = asyncio.Lock()
+    return lock
+
+
+def _needs_refresh(acct: Optional[Dict[str, Any]]) -> bool:
+    if acct is None:
+        # Only a custom token can be exchanged without an interactive login
+        return bool(os.getenv("FIREBASE_CUSTOM_TOKEN"))
+    return _now() >= int(acct.get("expiresAt", 0))
+
+
+async def get_auth_headers_async() -> Dict[str, str]:
+    """get_auth_headers() for callers on the event loop.
+
+    An expired Firebase token is refreshed over the shared aiohttp session rather
+    than a blocking requests call, so SSE consumers and the lock refresher keep
+    running. A first-time custom-token exchange runs in a worker thread. Both
+    happen under one lock, so concurrent callers trigger a single refresh. Like
+    get_auth_headers(), this never starts an interactive device login.
+    """
+    if os.getenv("SKIP_AUTH") != "1" and not os.getenv("FIREBASE_ID_TOKEN"):
+        gcp_project = _resolve_gcp_project()
+        if _needs_refresh(_cached_account(gcp_project)):
+            # Single flight: callers that find the token expired at the same time share one refresh
+            async with _refresh_lock():
+                acct = _cached_account(gcp_project)
+                if acct is None and os.getenv("FIREBASE_CUSTOM_TOKEN"):
+                    return await asyncio.to_thread(get_auth_headers)
+                # Re-checked under the lock: whoever held it may have refreshed already
+                if acct is not None and _needs_refresh(acct):
+                    id_token, refresh_token, expires_at = await _firebase_refresh_async(acct.get("refreshToken"))
+                    _store_refreshed(acct, id_token, refresh_token, expires_at, gcp_project)
+    # Token is fresh in the cache now; this only reads it
+    return get_auth_headers()
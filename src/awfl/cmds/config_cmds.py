@@ -46,6 +46,123 @@ def set_token_override(token: str | None) -> bool:
     return True
 
 
+def _status_connections() -> None:
+    from awfl.consumer.telemetry import telemetry_stats
+    for name, st in telemetry_stats().items():
+        reasons = ", ".join(f"{k}={v}" for k, v in st["reconnect_reasons"].items()) or "none"
+        log_unique(
+            f"📡 {name}: {st['state']} events/s={st['events_per_sec']} bytes/s={st['bytes_per_sec']} "
+            f"reconnects={st['reconnects']} ({reasons}) connect={st['time_to_connect']}s "
+            f"first_event={st['time_to_first_event']}s since_heartbeat={st['secs_since_heartbeat']}s backoff={st['backoff']}s"
+        )
+
+
+def _status_dispatchers() -> None:
+    from awfl.consumer.dispatch import dispatcher_stats
+    for name, st in dispatcher_stats().items():
+        log_unique(
+            f"📬 {name}: depth={st['depth']}/{st['maxsize']} high_water={st['high_water']} dispatched={st['dispatched']} blocked_puts={st['blocked_puts']}"
+        )
+
+
+def _status_committers() -> None:
+    from awfl.consumer.cursor_committer import committer_stats
+    for name, st in committer_stats().items():
+        log_unique(
+            f"📌 {name}: pending={st['pending']} recorded={st['recorded']} commits={st['commits']} flushes={st['flushes']} ({st['flush_rate']}/s)"
+        )
+
+
+def _status_journals() -> None:
+    from awfl.consumer.cursor_journal import journal_stats
+    for path, st in journal_stats().items():
+        log_unique(
+            f"📓 cursor journal {path}: cursors={st['cursors']} hits={st['hits']} misses={st['misses']} fsyncs={st['fsyncs']} adopted_remote={st['adopted_remote']}"
+        )
+
+
+def _status_ledgers() -> None:
+    from awfl.response_handler.ledger import ledger_stats
+    for path, st in ledger_stats().items():
+        log_unique(
+            f"♻️ execution ledger {path}: entries={st['entries']} replays_skipped={st['hits_memory'] + st['hits_disk']} misses={st['misses']}"
+        )
+
+
+def _status_lanes() -> None:
+    from awfl.consumer.lanes import lanes_stats
+    for name, st in lanes_stats().items():
+        log_unique(
+            f"🛤️ {name}: lanes={st['lanes']} running={st['running']}/{st['max_concurrency']} queued={st['queued']} completed={st['completed']} waiting_for_order={st['waiting_for_order']} ({st['order_runs']} runs)"
+        )
+
+
+def _status_commands() -> None:
+    from awfl.response_handler.commands import command_stats
+    cs = command_stats()
+    log_unique(
+        f"🐚 commands: running={cs['running']} started={cs['started']} completed={cs['completed']} timed_out={cs['timed_out']} cancelled={cs['cancelled']}"
+    )
+
+
+def _status_tools() -> None:
+    from awfl.response_handler.executor import tool_stats
+    ts = tool_stats()
+    pools = " ".join(f"{name}={p['running']}/{p['limit']}" for name, p in sorted(ts["pools"].items()))
+    log_unique(
+        f"🧰 tools: {pools} inflight={ts['inflight']} completed={ts['completed']} cancelled={ts['cancelled']} timed_out={ts['timed_out']}"
+    )
+
+
+def _status_reads() -> None:
+    from awfl.response_handler.file_reader import reader_stats
+    rs = reader_stats()
+    log_unique(
+        f"📄 reads: reads={rs['reads']} bytes={rs['bytes_read']} line indexes built={rs['index_builds']} reused={rs['index_hits']} cached={rs['cached_indexes']}"
+    )
+
+
+def _status_writes() -> None:
+    from awfl.response_handler.file_writer import writer_stats
+    ws = writer_stats()
+    log_unique(f"✏️ writes: written={ws['written']} unchanged={ws['unchanged']} conflicts={ws['conflicts']}")
+
+
+def _status_read_cache() -> None:
+    from awfl.response_handler.read_cache import read_cache_stats
+    rc = read_cache_stats()
+    log_unique(
+        f"🗃️ read cache: hits={rc['hits']} misses={rc['misses']} hit_rate={rc['hit_rate']:.0%} entries={rc['entries']} "
+        f"bytes={rc['bytes']}/{rc['budget_bytes']} evictions={rc['evictions']} invalidations={rc['invalidations']} watched_dirs={rc['watched_dirs']}"
+    )
+
+
+def _status_http() -> None:
+    from awfl.utils.http import http_stats
+    hs = http_stats()
+    a, s = hs["async"], hs["sync"]
+    log_unique(
+        f"🌐 http: async requests={a['requests']} conns created={a['connections_created']} reused={a['connections_reused']} "
+        f"dns hit/miss={a['dns_cache_hits']}/{a['dns_cache_misses']} | sync requests={s['requests']} conns created={s['connections_created']}"
+    )
+
+
+_STATUS_SECTIONS = [
+    ("connections", _status_connections),
+    ("dispatchers", _status_dispatchers),
+    ("cursor committers", _status_committers),
+    ("cursor journals", _status_journals),
+    ("execution ledgers", _status_ledgers),
+    ("lanes", _status_lanes),
+    ("commands", _status_commands),
+    ("tools", _status_tools),
+    ("reads", _status_reads),
+    ("writes", _status_writes),
+    ("read cache", _status_read_cache),
+    ("http", _status_http),
+]
+
+
 def print_status() -> None:
     mode = os.getenv('WORKFLOW_EXEC_MODE', 'api').lower()
     origin = os.getenv('API_ORIGIN') or 'http://localhost:5050'
@@ -55,5 +172,11 @@ def print_status() -> None:
     ctype = os.getenv('AWFL_CONSUMER_TYPE') or 'LOCAL'
     # wf_dir = resolve_workflows_dir()
     log_unique(f"⚙️ Exec mode: {mode} | API_ORIGIN: {origin} | SKIP_AUTH={skip} | OVERRIDE_TOKEN={'yes' if has_override else 'no'} | AWFL_PROJECT_ID={proj} | AWFL_CONSUMER_TYPE={ctype}")
+    for name, section in _STATUS_SECTIONS:
+        # Each section on its own: one failing stats source must not hide the others
+        try:
+            section()
+        except Exception as e:
+            log_unique(f"⚠️ {name}: unavailable: {e}")
     if mode == 'api':
         print_whoami()
@@ -1,12 +1,34 @@
 from __future__ import annotations
 
-import requests
-from awfl.auth import get_auth_headers
+import json
+
+import aiohttp
+
+from awfl.auth import get_auth_headers_async
+from awfl.response_handler import get_session
+from awfl.response_handler.executor import cancel_session_tools
 from awfl.utils import log_unique, _get_workflow_env_suffix, _ensure_env_suffix, get_api_origin
+from awfl.utils.aio import run_blocking, running_loop, spawn
+from awfl.utils.http import get_http_session
 from awfl.state import get_active_execution, clear_active_execution
 
 
 def stop_or_cancel_active() -> bool:
+    """Cancel the active execution and this session's in-flight local tools.
+
+    From the prompt the stop request runs in the background.
+    """
+    if running_loop() is not None:
+        spawn(stop_or_cancel_active_async(), name="stop-execution")
+        return True
+    return run_blocking(stop_or_cancel_active_async())
+
+
+async def stop_or_cancel_active_async() -> bool:
+    # Local tools first: a running build should not outlive the stop request
+    cancelled = cancel_session_tools(get_session())
+    if cancelled:
+        log_unique(f"🛑 Cancelled {cancelled} in-flight tool call(s) for this session.")
     log_unique("🛑 Attempting to cancel the active workflow execution via API...")
     active = get_active_execution()
     if not active:
@@ -28,25 +50,26 @@ def stop_or_cancel_active() -> bool:
     url = f"{origin}/workflows/exec/stop"
     try:
         headers = {"Content-Type": "application/json"}
-        headers.update(get_auth_headers())
+        headers.update(await get_auth_headers_async())
     except Exception as e:
         log_unique(f"❌ Auth initialization failed: {e}")
         return True
 
     try:
-        resp = requests.post(
+        async with get_http_session().post(
             url,
             headers=headers,
             json={"execId": exec_id, "workflow": workflow_for_stop},
-            timeout=20,
-        )
-        if resp.status_code >= 400:
+            timeout=aiohttp.ClientTimeout(total=20),
+        ) as resp:
+            text = await resp.text()
+        if resp.status >= 400:
             # Try to show JSON error if available
             try:
-                err_body = resp.json()
+                err_body = json.loads(text)
             except Exception:
-                err_body = resp.text
-            log_unique(f"❌ Stop request failed ({resp.status_code}): {err_body}")
+                err_body = text
+            log_unique(f"❌ Stop request failed ({resp.status}): {err_body}")
         else:
             log_unique(
                 f"🛑 Stop requested for execution: {execution_name} (execId={exec_id}, workflow={workflow_for_stop})"
@@ -0,0 +1,56 @@
+from typing import List
+
+from awfl.utils import log_unique
+
+
+def _fmt(v) -> str:
+    return "-" if v is None else f"{v:g}"
+
+
+def print_event_latency(args: List[str]) -> bool:
+    """perf events [reset]: p50/p95/p99 per pipeline stage and tool (milliseconds)."""
+    from awfl.events.latency import latency_summary, reset_latency
+
+    if args and args[0] == "reset":
+        reset_latency()
+        log_unique("⏱️ Event latency histograms reset.")
+        return True
+    rows = latency_summary()
+    if not rows:
+        log_unique("⏱️ No event latency samples yet.")
+        return True
+    lines = [
+        "⏱️ Event latency (ms): relay=server->reader, queue=reader->handler, tool=execution, callback=POST, total=server->callback",
+        f"  {'stage':<9}{'tool':<14}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}",
+    ]
+    for r in rows:
+        lines.append(
+            f"  {r['stage']:<9}{r['tool']:<14}{r['count']:>7}{_fmt(r['p50']):>10}{_fmt(r['p95']):>10}{_fmt(r['p99']):>10}{_fmt(r['max']):>10}"
+        )
+    log_unique("\n".join(lines))
+    return True
+
+
+def replay_capture_cmd(args: List[str]) -> bool:
+    """replay <capture> [--fast|--speed N] [--mode log|execute|both] [--live] [--quiet] [--json]"""
+    import asyncio
+
+    from awfl.consumer.replay import parse_replay_args, run_replay
+    from awfl.utils.aio import spawn
+
+    try:
+        ns = parse_replay_args(args)
+    except SystemExit:
+        # argparse already printed usage; never let it exit the CLI
+        return True
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    if loop is None:
+        asyncio.run(run_replay(ns))
+    else:
+        # Called from the interactive prompt: run alongside the consumers and report when done
+        spawn(run_replay(ns), name="sse-replay")
+        log_unique(f"📼 Replaying {ns.path} in the background...")
+    return True
@@ -12,6 +12,7 @@ from .exec_ctl import stop_or_cancel_active
 from .auth_cmds import handle_login, print_whoami, handle_logout
 from .config_cmds import set_exec_mode, set_api_origin, set_skip_auth, set_token_override, print_status
 from .model_cmds import get_or_set_model
+from .perf_cmds import print_event_latency, replay_capture_cmd
 from .deploy_cmds import deploy_workflows, deploy_awfl_workflows
 from .dev import handle_dev_command
 from .files_cmds import upload_files_cmd
@@ -29,6 +30,8 @@ def _default_help() -> bool:
         "Commands:\n"
         "  help | ?\n"
         "  status\n"
+        "  perf events [reset]\n"
+        "  replay <capture> [--fast|--speed N] [--mode log|execute|both] [--live] [--quiet] [--json]\n"
         "  login | auth login\n"
         "  whoami | auth status\n"
         "  logout | auth logout\n"
@@ -105,6 +108,11 @@ def handle_command(line: str) -> bool:
         return _default_help()
     if cmd in ("status",):
         return print_status() or True
+    if cmd == "perf events" or cmd.startswith("perf events "):
+        return print_event_latency(cmd.split()[2:])
+    if cmd == "replay" or cmd.startswith("replay "):
+        # Capture paths are case-sensitive; split the original line
+        return replay_capture_cmd(shlex.split(line)[1:])
     if cmd in ("login", "auth login"):
         return handle_login()
     if cmd in ("whoami", "auth status"):
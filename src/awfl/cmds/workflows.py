@@ -2,11 +2,10 @@ import os
 from pathlib import Path
 from typing import Dict, List, Optional
 
-import requests
-
 from awfl.state import set_active_workflow, get_active_workflow, normalize_workflow, get_workflow_env_suffix
 from awfl.utils import log_unique, get_api_origin, LOCATION
 from awfl.auth import get_auth_headers
+from awfl.utils.http import get_sync_session
 from .common import get_orig_cwd
 
 
@@ -173,7 +172,7 @@ def _fetch_remote_workflow_names(location: Optional[str]) -> Optional[List[str]]
         headers = {}
 
     try:
-        resp = requests.get(url, headers=headers, timeout=30)
+        resp = get_sync_session().get(url, headers=headers, timeout=30)
     except Exception as e:
         log_unique(f"⚠️ API request error: {e}")
         return None
@@ -0,0 +1,121 @@
+import base64
+import json
+import os
+import struct
+import time
+from typing import Iterator, Optional, Tuple
+
+from awfl.utils import log_unique
+
+# Raw SSE capture files for offline replay (see replay.py).
+#
+# When AWFL_SSE_CAPTURE_DIR is set, each consume_events_sse task tees every
+# chunk it reads, with its offset from the start of the capture, into
+# sse-{scope}-{YYYYmmdd-HHMMSS}.{ndjson|bin}. Connection boundaries are recorded
+# too so replay resets the parser exactly where the live consumer did.
+#
+# Formats (AWFL_SSE_CAPTURE_FORMAT):
+# - ndjson (default): a header line {"awfl_capture": 1, ...} then one object per
+#   record: {"t": secs, "b": base64 bytes} or {"t": secs, "connect": {...}}
+# - bin: b"AWFLCAP1" then records of struct "<dBI" (t, kind, length) + payload;
+#   kind 0 = data, 1 = connect (payload is JSON metadata)
+
+MAGIC = b"AWFLCAP1"
+_REC = struct.Struct("<dBI")
+KIND_DATA = 0
+KIND_CONNECT = 1
+
+
+class CaptureWriter:
+    def __init__(self, path: str, *, fmt: str = "ndjson", scope: str = ""):
+        self.path = path
+        self.fmt = "bin" if fmt == "bin" else "ndjson"
+        self._t0 = time.monotonic()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._f = open(path, "wb")
+        self.records = 0
+        self.bytes = 0
+        if self.fmt == "bin":
+            self._f.write(MAGIC)
+        else:
+            header = {"awfl_capture": 1, "scope": scope, "started": time.time()}
+            self._f.write((json.dumps(header) + "\n").encode("utf-8"))
+
+    def _offset(self) -> float:
+        return round(time.monotonic() - self._t0, 6)
+
+    def connect(self, **meta) -> None:
+        """Mark a new connection; replay starts a fresh parser here."""
+        t = self._offset()
+        if self.fmt == "bin":
+            payload = json.dumps(meta).encode("utf-8")
+            self._f.write(_REC.pack(t, KIND_CONNECT, len(payload)) + payload)
+        else:
+            self._f.write((json.dumps({"t": t, "connect": meta}) + "\n").encode("utf-8"))
+
+    def data(self, chunk: bytes) -> None:
+        t = self._offset()
+        if self.fmt == "bin":
+            self._f.write(_REC.pack(t, KIND_DATA, len(chunk)))
+            self._f.write(chunk)
+        else:
+            line = '{"t": %r, "b": "%s"}\n' % (t, base64.b64encode(chunk).decode("ascii"))
+            self._f.write(line.encode("ascii"))
+        self.records += 1
+        self.bytes += len(chunk)
+
+    def flush(self) -> None:
+        self._f.flush()
+
+    def close(self) -> None:
+        try:
+            self._f.close()
+        except Exception:
+            pass
+
+
+def open_capture(scope: str) -> Optional[CaptureWriter]:
+    """Capture writer for this consumer when AWFL_SSE_CAPTURE_DIR is set, else None."""
+    base = os.getenv("AWFL_SSE_CAPTURE_DIR")
+    if not base:
+        return None
+    fmt = (os.getenv("AWFL_SSE_CAPTURE_FORMAT") or "ndjson").strip().lower()
+    ext = "bin" if fmt == "bin" else "ndjson"
+    name = f"sse-{scope}-{time.strftime('%Y%m%d-%H%M%S')}.{ext}"
+    path = os.path.join(os.path.expanduser(base), name)
+    try:
+        writer = CaptureWriter(path, fmt=fmt, scope=scope)
+    except Exception as e:
+        log_unique(f"⚠️ Could not open SSE capture file {path}: {e}")
+        return None
+    log_unique(f"📼 Capturing raw SSE stream ({scope}) to {path}")
+    return writer
+
+
+def read_capture(path: str) -> Iterator[Tuple[float, int, bytes]]:
+    """Yield (offset_secs, kind, payload) records from an ndjson or bin capture."""
+    with open(path, "rb") as f:
+        head = f.read(len(MAGIC))
+        if head == MAGIC:
+            while True:
+                hdr = f.read(_REC.size)
+                if len(hdr) < _REC.size:
+                    return
+                t, kind, n = _REC.unpack(hdr)
+                payload = f.read(n)
+                if len(payload) < n:
+                    return  # truncated tail (capture was still being written)
+                yield t, kind, payload
+        f.seek(0)
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except Exception:
+                continue
+            if "b" in rec:
+                yield float(rec.get("t") or 0.0), KIND_DATA, base64.b64decode(rec["b"])
+            elif "connect" in rec:
+                yield float(rec.get("t") or 0.0), KIND_CONNECT, json.dumps(rec["connect"]).encode("utf-8")
+
+
+__all__ = ["CaptureWriter", "open_capture", "read_capture", "KIND_DATA", "KIND_CONNECT"]
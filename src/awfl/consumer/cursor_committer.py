@@ -0,0 +1,183 @@
+import asyncio
+import contextlib
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from awfl.utils import log_unique
+from awfl.utils.http import auth_headers_async
+
+from .cursors import update_cursor
+from .cursor_journal import CursorJournal
+from .debug import dbg
+
+# Coalescing cursor committer.
+#
+# Dispatch records the latest processed event id per (project, session,
+# workspace, scope) and a background task flushes only the newest position per
+# scope on a time or count threshold. A burst of 500 events therefore becomes a
+# handful of POSTs instead of 500 sequential round trips. Positions are only
+# recorded after an event was dispatched, so resume stays at-least-once: at
+# worst we replay the events since the last successful flush. When a local
+# journal is attached each flush is also appended there (one fsync per flush).
+
+CursorKey = Tuple[Optional[str], Optional[str], Optional[str], str]
+
+_registry: Dict[str, "CursorCommitter"] = {}
+
+
+class CursorCommitter:
+    def __init__(
+        self,
+        session_http: aiohttp.ClientSession,
+        *,
+        interval_secs: float = 1.0,
+        max_pending: int = 50,
+        name: str = "cursor-committer",
+        journal: Optional[CursorJournal] = None,
+    ):
+        self._http = session_http
+        self._interval = max(0.05, float(interval_secs))
+        self._max_pending = max(1, int(max_pending))
+        self._name = name
+        self._journal = journal
+        # key -> (event_id, timestamp)
+        self._pending: Dict[CursorKey, Tuple[str, Optional[str]]] = {}
+        self._since_flush = 0
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._started_at = time.monotonic()
+
+        self.recorded = 0
+        self.flushes = 0
+        self.commits = 0
+        self.failures = 0
+
+    # ----- lifecycle -----
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=self._name)
+        _registry[self._name] = self
+
+    async def close(self, *, timeout: float = 5.0) -> None:
+        """Stop the background task and make a final best-effort flush."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        self._task = None
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(self.flush(), timeout=timeout)
+        if _registry.get(self._name) is self:
+            _registry.pop(self._name, None)
+
+    # ----- producer side -----
+
+    def record(
+        self,
+        *,
+        event_id: str,
+        project_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        workspace_id: Optional[str] = None,
+        scope: str = "session",
+        timestamp: Optional[str] = None,
+    ) -> None:
+        """Remember the newest dispatched event for a scope; superseded ids are dropped."""
+        if not event_id:
+            return
+        key: CursorKey = (project_id, session_id, workspace_id, scope)
+        self._pending[key] = (str(event_id), timestamp)
+        self.recorded += 1
+        self._since_flush += 1
+        if self._since_flush >= self._max_pending:
+            self._wake.set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    # ----- flushing -----
+
+    async def flush(self) -> int:
+        """POST the latest position for every pending scope. Returns successful commits."""
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch = self._pending
+            self._pending = {}
+            self._since_flush = 0
+            self.flushes += 1
+
+            # Durable local copy first (one fsync per flush) so a restart can resume without the network
+            if self._journal is not None:
+                records = [
+                    (project_id, session_id if scope == "session" else None, event_id)
+                    for (project_id, session_id, _ws, scope), (event_id, _ts) in batch.items()
+                ]
+                try:
+                    await asyncio.to_thread(self._journal.append_many, records)
+                except Exception as e:
+                    log_unique(f"⚠️ Failed to journal cursors locally: {e}")
+
+            # Resolve auth once per flush instead of once per event
+            headers: Dict[str, str] = await auth_headers_async({"Content-Type": "application/json"}, purpose="cursors POST")
+
+            ok_count = 0
+            for key, (event_id, ts) in batch.items():
+                project_id, session_id, workspace_id, scope = key
+                ok = await update_cursor(
+                    self._http,
+                    event_id=event_id,
+                    project_id=project_id,
+                    session_id=session_id,
+                    workspace_id=workspace_id,
+                    scope=scope,
+                    timestamp=ts,
+                    headers=headers,
+                )
+                if ok:
+                    ok_count += 1
+                    self.commits += 1
+                else:
+                    self.failures += 1
+                    # Retry on the next flush unless a newer position was recorded meanwhile
+                    self._pending.setdefault(key, (event_id, ts))
+            dbg(f"{self._name} flushed {ok_count}/{len(batch)} cursor(s)")
+            return ok_count
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=self._interval)
+            self._wake.clear()
+            if self._pending:
+                try:
+                    await self.flush()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log_unique(f"⚠️ Failed to flush cursors: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = max(1e-6, time.monotonic() - self._started_at)
+        return {
+            "pending": len(self._pending),
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "commits": self.commits,
+            "failures": self.failures,
+            "coalesced": max(0, self.recorded - self.commits - len(self._pending)),
+            "flush_rate": round(self.flushes / elapsed, 3),
+        }
+
+
+def committer_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of all live cursor committers keyed by name."""
+    return {name: c.stats() for name, c in list(_registry.items())}
+
+
+__all__ = ["CursorCommitter", "committer_stats"]
@@ -0,0 +1,253 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from awfl.utils import _get_workflow_env_suffix, log_unique
+
+from .cursors import event_id_key
+from .debug import dbg
+
+try:  # POSIX advisory locks; several terminals share one journal file
+    import fcntl  # type: ignore
+except Exception:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore
+
+# Local durable cursor journal.
+#
+# An append-only JSON-lines file (~/.awfl/cursors{env}.jsonl) holding the
+# newest dispatched event id per (project, session). Session cursors use the
+# session id; the project-wide cursor uses an empty one. The consumer reads it
+# at startup and on every reconnect, so resuming needs no cursor GET. The
+# remote cursor service is reconciled in the background and the larger of the
+# two positions wins.
+#
+# Writes are batched: the cursor committer appends one line per coalesced
+# scope and fsyncs once per flush. When the file grows well past the number of
+# live keys it is compacted in place (write temp + os.replace) under the same
+# lock that guards appends.
+#
+# AWFL_CURSOR_JOURNAL=0 disables the journal; AWFL_CURSOR_JOURNAL_PATH moves it.
+
+JournalKey = Tuple[str, str]  # (project_id, session_id or "")
+
+_COMPACT_MIN_LINES = 1000
+
+
+def journal_key(project_id: Optional[str], session_id: Optional[str] = None) -> Optional[JournalKey]:
+    if not project_id:
+        return None
+    return (str(project_id), str(session_id or ""))
+
+
+def _newer(candidate: Optional[str], current: Optional[str]) -> bool:
+    """True when candidate should replace current (max position; unordered ids keep current)."""
+    if not candidate:
+        return False
+    if not current:
+        return True
+    ck, cur = event_id_key(candidate), event_id_key(current)
+    if ck is None or cur is None:
+        return False
+    return ck > cur
+
+
+class CursorJournal:
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[JournalKey, str] = {}
+        self._loaded = False
+        self._lines = 0
+        self._mutex = threading.RLock()  # appends run in worker threads
+
+        self.hits = 0
+        self.misses = 0
+        self.appends = 0
+        self.fsyncs = 0
+        self.compactions = 0
+        self.adopted_remote = 0
+
+    # ----- reading -----
+
+    def load(self) -> None:
+        """Read the journal into memory; later lines win unless they move a cursor backwards."""
+        with self._mutex:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        self._lines += 1
+                        try:
+                            rec = json.loads(line)
+                            key = (str(rec["p"]), str(rec.get("s") or ""))
+                            eid = str(rec["e"])
+                        except Exception:
+                            # Torn or foreign line (e.g. crash mid-append); skip it
+                            continue
+                        cur = self._entries.get(key)
+                        if cur is None or event_id_key(eid) is None or event_id_key(cur) is None or _newer(eid, cur):
+                            self._entries[key] = eid
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                log_unique(f"⚠️ Could not read cursor journal {self.path}: {e}")
+            dbg(f"cursor journal loaded: {len(self._entries)} cursor(s) from {self._lines} line(s)")
+
+    def get(self, project_id: Optional[str], session_id: Optional[str] = None) -> Optional[str]:
+        key = journal_key(project_id, session_id)
+        if key is None:
+            return None
+        if not self._loaded:
+            self.load()
+        eid = self._entries.get(key)
+        if eid:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return eid
+
+    # ----- writing -----
+
+    def append_many(self, records: Iterable[Tuple[Optional[str], Optional[str], str]]) -> int:
+        """Append (project_id, session_id, event_id) records with a single fsync. Blocking."""
+        lines = []
+        now = round(time.time(), 3)
+        with self._mutex:
+            if not self._loaded:
+                self.load()
+            for project_id, session_id, event_id in records:
+                key = journal_key(project_id, session_id)
+                if key is None or not event_id:
+                    continue
+                cur = self._entries.get(key)
+                if cur == event_id:
+                    continue
+                self._entries[key] = str(event_id)
+                lines.append(json.dumps({"p": key[0], "s": key[1], "e": str(event_id), "t": now}) + "\n")
+            if not lines:
+                return 0
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                fd = self._open_locked()
+                try:
+                    os.write(fd, "".join(lines).encode("utf-8"))
+                    os.fsync(fd)
+                    self.fsyncs += 1
+                    self._lines += len(lines)
+                    self.appends += len(lines)
+                    if self._lines >= max(_COMPACT_MIN_LINES, 8 * len(self._entries)):
+                        self._compact_locked()
+                finally:
+                    os.close(fd)  # releases the flock
+            except Exception as e:
+                log_unique(f"⚠️ Could not append to cursor journal {self.path}: {e}")
+                return 0
+            return len(lines)
+
+    def observe_remote(self, project_id: Optional[str], session_id: Optional[str], event_id: Optional[str]) -> Optional[str]:
+        """Reconcile with the remote cursor: adopt it when it is ahead. Returns the winning id."""
+        key = journal_key(project_id, session_id)
+        if key is None:
+            return event_id
+        if not self._loaded:
+            self.load()
+        local = self._entries.get(key)
+        if _newer(event_id, local):
+            self.adopted_remote += 1
+            self.append_many([(project_id, session_id, str(event_id))])
+            return str(event_id)
+        return local
+
+    def _compact_locked(self) -> None:
+        # Re-read under the flock so other terminals' appends survive the rewrite
+        merged: Dict[JournalKey, str] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                        key = (str(rec["p"]), str(rec.get("s") or ""))
+                        eid = str(rec["e"])
+                    except Exception:
+                        continue
+                    cur = merged.get(key)
+                    if cur is None or event_id_key(eid) is None or event_id_key(cur) is None or _newer(eid, cur):
+                        merged[key] = eid
+        except FileNotFoundError:
+            pass
+        for key, eid in self._entries.items():
+            if key not in merged or not _newer(merged[key], eid):
+                merged[key] = eid
+        tmp = f"{self.path}.tmp-{os.getpid()}"
+        now = round(time.time(), 3)
+        with open(tmp, "w", encoding="utf-8") as f:
+            for (p, s), e in merged.items():
+                f.write(json.dumps({"p": p, "s": s, "e": e, "t": now}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._entries = merged
+        self._lines = len(merged)
+        self.compactions += 1
+        dbg(f"cursor journal compacted to {len(merged)} line(s)")
+
+    def _open_locked(self) -> int:
+        """Open for append holding the flock, retrying if another process compacted the file meanwhile."""
+        while True:
+            fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+            if fcntl is None:
+                return fd
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                if os.fstat(fd).st_ino == os.stat(self.path).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+            except Exception:
+                return fd  # locking unsupported here; append without it
+            os.close(fd)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "cursors": len(self._entries),
+            "lines": self._lines,
+            "hits": self.hits,
+            "misses": self.misses,
+            "appends": self.appends,
+            "fsyncs": self.fsyncs,
+            "compactions": self.compactions,
+            "adopted_remote": self.adopted_remote,
+        }
+
+
+_journals: Dict[str, CursorJournal] = {}
+
+
+def _journal_path() -> str:
+    override = os.getenv("AWFL_CURSOR_JOURNAL_PATH")
+    if override:
+        return os.path.expanduser(override)
+    return os.path.expanduser(f"~/.awfl/cursors{_get_workflow_env_suffix()}.jsonl")
+
+
+def get_journal() -> Optional[CursorJournal]:
+    """Process-wide journal for the current environment, or None when disabled."""
+    if os.getenv("AWFL_CURSOR_JOURNAL", "1") == "0":
+        return None
+    path = _journal_path()
+    j = _journals.get(path)
+    if j is None:
+        j = CursorJournal(path)
+        _journals[path] = j
+    return j
+
+
+def journal_stats() -> Dict[str, Dict[str, Any]]:
+    return {path: j.stats() for path, j in list(_journals.items())}
+
+
+__all__ = ["CursorJournal", "get_journal", "journal_key", "journal_stats"]
@@ -1,10 +1,10 @@
 import asyncio
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import aiohttp
 
-from awfl.auth import get_auth_headers
 from awfl.utils import get_api_origin, log_unique
+from awfl.utils.http import auth_headers_async
 
 # Back-compat note:
 # The previous implementation persisted a local JSON file with a map of
@@ -12,7 +12,9 @@ from awfl.utils import get_api_origin, log_unique
 # We now use the remote /api/workflows/events/cursors service to fetch and
 # update per-project and per-session cursors so multiple consumers can run in
 # parallel without interfering. The helper functions below are asynchronous and
-# operate against the remote API using the provided aiohttp session.
+# operate against the remote API using the provided aiohttp session. A local
+# append-only journal (cursor_journal.py) now fronts them for instant resume;
+# the remote service stays the source of truth across machines.
 
 
 def _cursors_url() -> str:
@@ -20,6 +22,36 @@ def _cursors_url() -> str:
     return f"{origin}/workflows/events/cursors"
 
 
+def event_id_key(event_id: Optional[str]) -> Optional[Tuple[int, ...]]:
+    """Sortable key for relay event ids, or None when the id is not comparable.
+
+    Accepts plain integers ("42") and stream-style ids ("1700000000000-3");
+    anything else is treated as opaque.
+    """
+    if not event_id:
+        return None
+    parts = str(event_id).strip().split("-")
+    if not parts or len(parts) > 2 or not all(p.isdigit() for p in parts):
+        return None
+    return tuple(int(p) for p in parts)
+
+
+def earliest_event_id(*event_ids: Optional[str]) -> Optional[str]:
+    """Oldest of several cursors, so one stream can resume every sink that shares it.
+
+    Returns None when any id is missing or the ids cannot be ordered.
+    """
+    keyed = []
+    for eid in event_ids:
+        key = event_id_key(eid)
+        if key is None:
+            return None
+        keyed.append((key, str(eid)))
+    if not keyed:
+        return None
+    return min(keyed)[1]
+
+
 async def get_resume_event_id(
     session_http: aiohttp.ClientSession,
     *,
@@ -47,11 +79,7 @@ async def get_resume_event_id(
         params["sessionId"] = session_id
 
     url = _cursors_url()
-    headers: Dict[str, str] = {}
-    try:
-        headers.update(get_auth_headers())
-    except Exception as e:
-        log_unique(f"⚠️ Could not resolve auth headers for cursors GET: {e}")
+    headers: Dict[str, str] = await auth_headers_async(purpose="cursors GET")
 
     try:
         async with session_http.get(url, headers=headers, params=params, timeout=15) as resp:
@@ -94,6 +122,7 @@ async def update_cursor(
     workspace_id: Optional[str] = None,
     scope: str = "session",  # "session" | "project" | "both"
     timestamp: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
 ) -> bool:
     """Persist a cursor position to the remote service.
 
@@ -102,6 +131,8 @@ async def update_cursor(
       - "project": update project-wide cursor
       - "both": update both
     - Provide either project_id (preferred) or workspace_id.
+    - headers may carry pre-resolved auth headers (e.g. one resolution per batch);
+      when omitted they are resolved here.
 
     Returns True on success, False otherwise.
     """
@@ -129,11 +160,8 @@ async def update_cursor(
             body["target"] = "project"
 
     url = _cursors_url()
-    headers: Dict[str, str] = {"Content-Type": "application/json"}
-    try:
-        headers.update(get_auth_headers())
-    except Exception as e:
-        log_unique(f"⚠️ Could not resolve auth headers for cursors POST: {e}")
+    if headers is None:
+        headers = await auth_headers_async({"Content-Type": "application/json"}, purpose="cursors POST")
 
     try:
         async with session_http.post(url, headers=headers, json=body, timeout=15) as resp:
@@ -0,0 +1,145 @@
+import asyncio
+import contextlib
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from awfl.utils import log_unique
+
+from .debug import dbg
+
+# Bounded hand-off between the SSE reader and event dispatch.
+#
+# The reader task only parses frames and enqueues them. A single worker task
+# drains the queue in arrival order and awaits the handler (JSON decode,
+# forward_event, cursor update). When the queue is full, put() blocks the reader
+# so backpressure is explicit instead of unbounded memory growth, and a slow
+# tool call no longer stalls reading the socket until the queue fills up.
+
+Handler = Callable[[Any], Awaitable[None]]
+
+# Live dispatchers by name so status/telemetry can report queue depth
+_registry: Dict[str, "EventDispatcher"] = {}
+
+
+class EventDispatcher:
+    """Single-worker bounded queue that dispatches items in order.
+
+    Observability via stats():
+      depth, maxsize, high_water, enqueued, dispatched, errors,
+      blocked_puts (times the reader had to wait), blocked_secs (total wait)
+    """
+
+    def __init__(self, handler: Handler, *, maxsize: int = 1000, name: str = "sse-dispatch"):
+        self._handler = handler
+        self._maxsize = max(1, int(maxsize))
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self._maxsize)
+        self._name = name
+        self._worker: Optional[asyncio.Task] = None
+        self._blocked_since: Optional[float] = None
+
+        self.high_water = 0
+        self.enqueued = 0
+        self.dispatched = 0
+        self.errors = 0
+        self.blocked_puts = 0
+        self.blocked_secs = 0.0
+
+    # ----- lifecycle -----
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run(), name=self._name)
+        _registry[self._name] = self
+
+    async def close(self) -> None:
+        """Stop the worker; queued items that were not dispatched are dropped.
+
+        Dropped items never advanced the cursor, so they are replayed on resume.
+        """
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._worker
+        self._worker = None
+        while not self._queue.empty():
+            with contextlib.suppress(asyncio.QueueEmpty):
+                self._queue.get_nowait()
+                self._queue.task_done()
+        if _registry.get(self._name) is self:
+            _registry.pop(self._name, None)
+
+    async def join(self) -> None:
+        """Wait until every enqueued item has been dispatched."""
+        if self._worker is None or self._worker.done():
+            return
+        await self._queue.join()
+
+    # ----- producer side -----
+
+    @property
+    def backpressured(self) -> bool:
+        """True while the reader is blocked waiting for queue capacity."""
+        return self._blocked_since is not None
+
+    async def put(self, item: Any) -> None:
+        if self._queue.full():
+            self.blocked_puts += 1
+            self._blocked_since = time.monotonic()
+            if self.blocked_puts == 1:
+                log_unique(
+                    f"⏸️ SSE dispatch queue full ({self._maxsize}); pausing reads until handlers catch up"
+                )
+            try:
+                await self._queue.put(item)
+            finally:
+                self.blocked_secs += time.monotonic() - self._blocked_since
+                self._blocked_since = None
+        else:
+            self._queue.put_nowait(item)
+        self.enqueued += 1
+        depth = self._queue.qsize()
+        if depth > self.high_water:
+            # Only log when crossing a power-of-two to keep debug output sparse
+            if depth & (depth - 1) == 0:
+                dbg(f"{self._name} queue high-water mark: {depth}/{self._maxsize}")
+            self.high_water = depth
+
+    # ----- consumer side -----
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._handler(item)
+                self.dispatched += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Handler owns error reporting; keep the worker alive regardless
+                self.errors += 1
+                dbg(f"{self._name} handler error: {e}")
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        blocked = self.blocked_secs
+        if self._blocked_since is not None:
+            blocked += time.monotonic() - self._blocked_since
+        return {
+            "depth": self._queue.qsize(),
+            "maxsize": self._maxsize,
+            "high_water": self.high_water,
+            "enqueued": self.enqueued,
+            "dispatched": self.dispatched,
+            "errors": self.errors,
+            "blocked_puts": self.blocked_puts,
+            "blocked_secs": round(blocked, 3),
+        }
+
+
+def dispatcher_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of all live dispatchers keyed by name."""
+    return {name: d.stats() for name, d in list(_registry.items())}
+
+
+__all__ = ["EventDispatcher", "dispatcher_stats"]
@@ -0,0 +1,204 @@
+import asyncio
+import contextlib
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from awfl.utils import log_unique
+
+from .debug import dbg
+
+# Per-session execution lanes for the project-scope consumer.
+#
+# Events are sharded by session id into ordered lanes: each lane has its own
+# bounded queue and worker, so one session's long RUN_COMMAND no longer blocks
+# another session's READ_FILE. Order is preserved within a lane and a global
+# semaphore caps how many handlers run at once across all lanes.
+#
+# Cursor safety: lanes complete out of arrival order, so a cursor may only move
+# to an event once every earlier event has completed too. Each submission gets a
+# sequence number and on_advance is called with the newest item of the
+# contiguous completed prefix. Completions past a gap are kept as runs of
+# consecutive seqs holding only the run's newest item. Only that item can
+# ever be handed to on_advance. So a lane stuck on a long command costs one
+# entry per gap, not one per event other sessions finish meanwhile.
+
+Handler = Callable[[Any], Awaitable[None]]
+AdvanceCallback = Callable[[Any], None]
+
+_registry: Dict[str, "SessionLanes"] = {}
+
+
+class _Lane:
+    __slots__ = ("key", "queue", "task", "processed")
+
+    def __init__(self, key: str, maxsize: int):
+        self.key = key
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.task: Optional[asyncio.Task] = None
+        self.processed = 0
+
+
+class SessionLanes:
+    def __init__(
+        self,
+        handler: Handler,
+        *,
+        on_advance: Optional[AdvanceCallback] = None,
+        max_concurrency: int = 8,
+        lane_queue_max: int = 100,
+        idle_secs: float = 60.0,
+        name: str = "session-lanes",
+    ):
+        self._handler = handler
+        self._on_advance = on_advance
+        self._max_concurrency = max(1, int(max_concurrency))
+        self._sem = asyncio.Semaphore(self._max_concurrency)
+        self._lane_queue_max = max(1, int(lane_queue_max))
+        self._idle_secs = max(0.1, float(idle_secs))
+        self._name = name
+        self._lanes: Dict[str, _Lane] = {}
+        self._closed = False
+
+        # Ordered completion tracking
+        self._next_seq = 0
+        self._commit_seq = 0
+        # Completed runs past the watermark: start -> (end, item at end), and end -> start
+        self._runs: Dict[int, Tuple[int, Any]] = {}
+        self._run_ends: Dict[int, int] = {}
+        self._waiting = 0
+        self._outstanding = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+        self.submitted = 0
+        self.completed = 0
+        self.errors = 0
+        self.running = 0
+        self.peak_running = 0
+        self.peak_lanes = 0
+        _registry[self._name] = self
+
+    # ----- producer side -----
+
+    async def submit(self, key: Optional[str], item: Any) -> None:
+        """Queue item on the lane for key; waits only when that lane's queue is full."""
+        if self._closed:
+            raise RuntimeError("SessionLanes is closed")
+        lane_key = key or ""
+        lane = self._lanes.get(lane_key)
+        if lane is None:
+            lane = _Lane(lane_key, self._lane_queue_max)
+            self._lanes[lane_key] = lane
+            lane.task = asyncio.create_task(self._run_lane(lane), name=f"{self._name}:{lane_key or '-'}")
+            self.peak_lanes = max(self.peak_lanes, len(self._lanes))
+            dbg(f"{self._name}: opened lane {lane_key or '-'} ({len(self._lanes)} active)")
+        seq = self._next_seq
+        self._next_seq += 1
+        self._outstanding += 1
+        self._idle.clear()
+        self.submitted += 1
+        if lane.queue.full():
+            log_unique(
+                f"⏸️ Session lane {lane_key or '-'} is full ({self._lane_queue_max}); waiting for it to drain"
+            )
+        await lane.queue.put((seq, item))
+
+    async def join(self) -> None:
+        """Wait until every submitted item has been handled."""
+        await self._idle.wait()
+
+    async def close(self) -> None:
+        """Cancel all lane workers; unfinished items are dropped (their cursors never advanced)."""
+        self._closed = True
+        lanes = list(self._lanes.values())
+        self._lanes.clear()
+        for lane in lanes:
+            if lane.task and not lane.task.done():
+                lane.task.cancel()
+        for lane in lanes:
+            if lane.task:
+                with contextlib.suppress(asyncio.CancelledError):
+                    await lane.task
+        if _registry.get(self._name) is self:
+            _registry.pop(self._name, None)
+
+    # ----- workers -----
+
+    async def _run_lane(self, lane: _Lane) -> None:
+        while True:
+            try:
+                seq, item = await asyncio.wait_for(lane.queue.get(), timeout=self._idle_secs)
+            except asyncio.TimeoutError:
+                if lane.queue.empty():
+                    # Retire idle lanes so long-lived consumers do not accumulate workers
+                    if self._lanes.get(lane.key) is lane:
+                        del self._lanes[lane.key]
+                    return
+                continue
+            try:
+                async with self._sem:
+                    self.running += 1
+                    self.peak_running = max(self.peak_running, self.running)
+                    try:
+                        await self._handler(item)
+                    finally:
+                        self.running -= 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                dbg(f"{self._name}: handler error on lane {lane.key or '-'}: {e}")
+            lane.processed += 1
+            self._complete(seq, item)
+
+    def _complete(self, seq: int, item: Any) -> None:
+        self.completed += 1
+        start, end, newest = seq, seq, item
+        # Merge with the run ending just before seq and the one starting just after it
+        left = self._run_ends.pop(seq - 1, None)
+        if left is not None:
+            del self._runs[left]
+            start = left
+        right = self._runs.pop(seq + 1, None)
+        if right is not None:
+            end, newest = right
+            del self._run_ends[end]
+        advanced = None
+        if start == self._commit_seq:
+            advanced = newest
+            self._commit_seq = end + 1
+            self._waiting -= end - start  # the rest of the run was already waiting
+        else:
+            self._runs[start] = (end, newest)
+            self._run_ends[end] = start
+            self._waiting += 1
+        self._outstanding -= 1
+        if self._outstanding == 0:
+            self._idle.set()
+        if advanced is not None and self._on_advance is not None:
+            try:
+                self._on_advance(advanced)
+            except Exception as e:
+                dbg(f"{self._name}: on_advance error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lanes": len(self._lanes),
+            "peak_lanes": self.peak_lanes,
+            "running": self.running,
+            "peak_running": self.peak_running,
+            "max_concurrency": self._max_concurrency,
+            "queued": sum(l.queue.qsize() for l in self._lanes.values()),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "errors": self.errors,
+            "waiting_for_order": self._waiting,
+            "order_runs": len(self._runs),
+        }
+
+
+def lanes_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of all live lane groups keyed by name."""
+    return {name: l.stats() for name, l in list(_registry.items())}
+
+
+__all__ = ["SessionLanes", "lanes_stats"]
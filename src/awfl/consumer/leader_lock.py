@@ -5,8 +5,8 @@ from typing import Any, Dict, Optional, Tuple
 
 import aiohttp
 
-from awfl.auth import get_auth_headers
 from awfl.utils import get_api_origin
+from awfl.utils.http import auth_headers_async
 
 # Server-backed project consumer leader lock helpers
 #
@@ -107,14 +107,8 @@ async def acquire_lock(
     url = f"{get_api_origin()}/workflows/projects/{project_id}/consumer-lock/acquire"
     cid = consumer_id or get_consumer_id()
     ctype = get_consumer_type()
-    headers: Dict[str, str] = {
-        "Content-Type": "application/json",
-    }
-    # Add auth headers (best-effort)
-    try:
-        headers.update(get_auth_headers())
-    except Exception:
-        pass
+    # Auth headers are best-effort
+    headers: Dict[str, str] = await auth_headers_async({"Content-Type": "application/json"})
 
     # Optional hints via headers per API
     if cid:
@@ -191,13 +185,7 @@ async def release_lock(
     cid = consumer_id or get_consumer_id()
     ctype = get_consumer_type()
 
-    headers: Dict[str, str] = {
-        "Content-Type": "application/json",
-    }
-    try:
-        headers.update(get_auth_headers())
-    except Exception:
-        pass
+    headers: Dict[str, str] = await auth_headers_async({"Content-Type": "application/json"})
 
     if cid:
         headers["x-consumer-id"] = cid
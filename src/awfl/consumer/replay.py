@@ -0,0 +1,172 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from awfl.events.model import Event
+from awfl.utils import json_loads, log_unique
+
+from . import routing
+from .capture import KIND_CONNECT, KIND_DATA, read_capture
+from .sse_parser import SSEByteParser
+
+# Replay a raw SSE capture (see capture.py) through the same path the live
+# consumer uses: SSEByteParser -> json decode -> Event -> forward_event.
+#
+# speed=1.0 reproduces the recorded inter-chunk timing, 2.0 plays twice as
+# fast, and 0 (--fast) feeds chunks back to back to measure throughput.
+#
+# With dry_run (the default) tools are not executed: forward_event gets a stub
+# handler that does the same decoding (tool name, arguments) and counts the
+# calls, so a capture from a real session can be replayed without touching the
+# filesystem, running commands or posting callbacks. quiet skips the log sink
+# (and its prompt status updates). Both are passed per call, never patched into
+# the modules: a replay started from the prompt runs next to the live
+# consumers, whose events must still execute and log normally.
+
+
+class _DryRunExecutor:
+    def __init__(self):
+        self.tools: Counter = Counter()
+        self.bad_args = 0
+
+    async def __call__(self, data: Any) -> None:
+        ev = Event.coerce(data)
+        if not ev.tool_call:
+            return
+        if ev.args_error is not None:
+            self.bad_args += 1
+        self.tools[ev.tool_name or "?"] += 1
+
+
+def _no_log(_ev: Event) -> None:
+    return None
+
+
+async def replay_capture(
+    path: str,
+    *,
+    speed: float = 1.0,
+    mode: routing.Mode = "both",
+    dry_run: bool = True,
+    quiet: bool = False,
+) -> Dict[str, Any]:
+    """Push a capture through the parser and forward_event; returns a throughput report."""
+    dry = _DryRunExecutor() if dry_run else None
+    report: Dict[str, Any] = {
+        "path": path,
+        "mode": mode,
+        "dry_run": dry_run,
+        "speed": speed,
+        "connections": 0,
+        "chunks": 0,
+        "bytes": 0,
+        "events": 0,
+        "parse_errors": 0,
+        "handler_errors": 0,
+    }
+
+    logger = _no_log if quiet else None
+    parser = SSEByteParser()
+    started = time.perf_counter()
+    try:
+        for t, kind, payload in read_capture(path):
+            if kind == KIND_CONNECT:
+                # The live consumer starts a fresh parser per connection
+                parser.close()
+                parser = SSEByteParser()
+                report["connections"] += 1
+                continue
+            if kind != KIND_DATA:
+                continue
+            if speed and speed > 0:
+                delay = t / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            report["chunks"] += 1
+            report["bytes"] += len(payload)
+            for frame in parser.feed(payload):
+                data_text = frame.get("data")
+                if not data_text:
+                    continue
+                try:
+                    obj = json_loads(data_text)
+                except Exception:
+                    report["parse_errors"] += 1
+                    continue
+                if not isinstance(obj, dict):
+                    report["parse_errors"] += 1
+                    continue
+                evt_id = frame.get("id")
+                ev = Event(obj, event_id=str(evt_id) if evt_id else None, received_at=time.time())
+                report["events"] += 1
+                try:
+                    await routing.forward_event(ev, mode=mode, handler=dry, logger=logger)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    report["handler_errors"] += 1
+    finally:
+        parser.close()
+
+    elapsed = time.perf_counter() - started
+    report["elapsed_secs"] = round(elapsed, 4)
+    report["events_per_sec"] = round(report["events"] / elapsed, 1) if elapsed > 0 else None
+    report["mb_per_sec"] = round(report["bytes"] / elapsed / 1e6, 2) if elapsed > 0 else None
+    if dry is not None:
+        report["tool_calls"] = dict(dry.tools)
+        report["bad_args"] = dry.bad_args
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"📼 Replayed {report['path']} (mode={report['mode']}, {'dry-run' if report['dry_run'] else 'LIVE'}, "
+        f"speed={'max' if not report['speed'] else report['speed']})",
+        f"  events={report['events']} chunks={report['chunks']} bytes={report['bytes']} "
+        f"connections={report['connections']} parse_errors={report['parse_errors']} handler_errors={report['handler_errors']}",
+        f"  elapsed={report['elapsed_secs']}s events/s={report['events_per_sec']} MB/s={report['mb_per_sec']}",
+    ]
+    if report.get("tool_calls"):
+        calls = ", ".join(f"{k}={v}" for k, v in sorted(report["tool_calls"].items()))
+        lines.append(f"  tool calls (not executed): {calls}")
+    return "\n".join(lines)
+
+
+def parse_replay_args(argv) -> argparse.Namespace:
+    p = argparse.ArgumentParser(prog="replay", description="Replay a raw SSE capture")
+    p.add_argument("path")
+    p.add_argument("--fast", action="store_true", help="ignore recorded timing; replay as fast as possible")
+    p.add_argument("--speed", type=float, default=1.0, help="timing multiplier (2 = twice as fast)")
+    p.add_argument("--mode", choices=("log", "execute", "both"), default="both")
+    p.add_argument("--live", action="store_true", help="really execute tool calls (default is dry-run)")
+    p.add_argument("--quiet", action="store_true", help="suppress event log output")
+    p.add_argument("--json", action="store_true", help="print the report as JSON")
+    return p.parse_args(list(argv))
+
+
+async def run_replay(ns: argparse.Namespace) -> Optional[Dict[str, Any]]:
+    try:
+        report = await replay_capture(
+            ns.path,
+            speed=0.0 if ns.fast else ns.speed,
+            mode=ns.mode,
+            dry_run=not ns.live,
+            quiet=ns.quiet,
+        )
+    except FileNotFoundError:
+        log_unique(f"⚠️ Capture file not found: {ns.path}")
+        return None
+    log_unique(json.dumps(report, indent=2) if ns.json else format_report(report))
+    return report
+
+
+__all__ = ["replay_capture", "format_report", "parse_replay_args", "run_replay"]
+
+
+if __name__ == "__main__":
+    import sys
+
+    asyncio.run(run_replay(parse_replay_args(sys.argv[1:])))
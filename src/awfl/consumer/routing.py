@@ -1,35 +1,34 @@
 import json
-from typing import Dict, Any, Optional, Literal
+from typing import Any, Awaitable, Callable, Dict, Literal, Optional
 
+from awfl.events.model import Event, session_id_of
 from awfl.response_handler import handle_response, process_event
 
 Mode = Literal["execute", "log", "both"]
 
 
-def event_session_id(obj: Dict[str, Any]) -> Optional[str]:
-    try:
-        attrs = obj.get("attributes") or {}
-        sid = attrs.get("sessionId") if isinstance(attrs, dict) else None
-        if sid:
-            return str(sid)
-        payload = obj.get("payload") or {}
-        sid = payload.get("sessionId") if isinstance(payload, dict) else None
-        if sid:
-            return str(sid)
-        cb = obj.get("callback_session") or obj.get("callbackSession")
-        if cb:
-            return str(cb)
-    except Exception:
-        pass
-    return None
-
-
-async def forward_event(obj: Dict[str, Any], mode: Mode = "both") -> None:
+def event_session_id(obj: Dict[str, Any] | Event) -> Optional[str]:
+    if isinstance(obj, Event):
+        return obj.session_id
+    return session_id_of(obj)
+
+
+async def forward_event(
+    obj: Dict[str, Any] | Event,
+    mode: Mode = "both",
+    *,
+    handler: Optional[Callable[[Event], Awaitable[None]]] = None,
+    logger: Optional[Callable[[Event], None]] = None,
+) -> None:
     """Route an incoming event to logging, execution, or both.
 
     - mode="execute": perform side effects only (no logs)
     - mode="log": log/status only (no side effects)
     - mode="both": do both in order: log first, then execute
+
+    handler/logger default to handle_response/process_event; callers such as
+    replay pass their own instead of patching this module, so live events
+    routed at the same time are unaffected.
     """
     # Defensive parse of JSON in case upstream occasionally ships a string
     if isinstance(obj, str):
@@ -37,13 +36,15 @@ async def forward_event(obj: Dict[str, Any], mode: Mode = "both") -> None:
             obj = json.loads(obj)
         except Exception:
             obj = {"content": str(obj)}
+    # Decode once; logger and executor share the same Event (and its lazily parsed arguments)
+    obj = Event.coerce(obj)
 
     if mode in ("log", "both"):
         try:
-            process_event(obj)
+            (logger or process_event)(obj)
         except Exception:
             # Swallow logger errors to not break execution path
             pass
 
     if mode in ("execute", "both"):
-        await handle_response(obj)
+        await (handler or handle_response)(obj)
@@ -1,20 +1,25 @@
 import asyncio
-import json
 import os
 import random
 import contextlib
+import time
 import traceback
+from collections import OrderedDict
 from typing import Optional, Tuple
 
 import aiohttp
 
-from awfl.auth import get_auth_headers
 from awfl.response_handler import get_session
-from awfl.utils import get_api_origin, log_unique
-from awfl.events.workspace import resolve_project_id, get_or_create_workspace
-
-from .cursors import get_resume_event_id, update_cursor
-from .sse_parser import SSEParser
+from awfl.utils import get_api_origin, json_loads, log_unique
+from awfl.utils.http import auth_headers_async, get_http_session
+from awfl.events.model import Event
+from awfl.events.latency import record_latency, since_ms
+from awfl.events.workspace import resolve_project_id, get_or_create_workspace, WorkspaceResolutionCache
+
+from .cursors import get_resume_event_id, event_id_key, earliest_event_id
+from .cursor_committer import CursorCommitter
+from .cursor_journal import get_journal
+from .sse_parser import SSEByteParser, read_spilled_data
 from .leader_lock import (
     get_consumer_id,
     acquire_lock,
@@ -22,10 +27,35 @@ from .leader_lock import (
     get_consumer_type,
     get_external_lock_token,
 )
-from .routing import forward_event
+from .routing import forward_event, event_session_id
+from .lanes import SessionLanes
+from .dispatch import EventDispatcher
+from .telemetry import ConnectionTelemetry
+from .capture import open_capture
 from .debug import dbg, is_debug, is_debug_raw
 
 
+class _RecentIds:
+    """Bounded set of (sink, workspace, event id) already handed to a sink.
+
+    Reconnects do not wait for queued or running events, so the stream replays
+    everything after the committed watermark; those events are skipped here.
+    """
+
+    def __init__(self, maxlen: int = 4096):
+        self._maxlen = maxlen
+        self._ids: "OrderedDict[tuple, None]" = OrderedDict()
+
+    def seen(self, key: tuple) -> bool:
+        """True when key was seen before; records it otherwise."""
+        if key in self._ids:
+            return True
+        self._ids[key] = None
+        if len(self._ids) > self._maxlen:
+            self._ids.popitem(last=False)
+        return False
+
+
 async def _resolve_project_and_workspace(
     session_http: aiohttp.ClientSession,
     forced_session_id: Optional[str],
@@ -41,13 +71,16 @@ async def _resolve_project_and_workspace(
 
 async def consume_events_sse(
     stream_url: Optional[str] = None,
-    scope: str = "session",  # "session" | "project"
+    scope: str = "session",  # "session" | "project" | "both"
 ):
     """Connect to the awfl-relay SSE stream (workspace-based) and forward events.
 
     New model (no background concept):
     - Project-scope consumer executes tool side effects for all sessions, silently (no logs).
     - Session-scope consumers only log events (no execution) so multiple terminals can display progress.
+    - scope="both" multiplexes the two over one project-wide connection: events fan out to an
+      "execute" sink (project cursor, leader lock) and a "log" sink for the current session
+      (session cursor). If another terminal holds the lock, only the log sink stays active.
 
     Mechanics:
     - Resolves project by normalized git remote.
@@ -56,6 +89,20 @@ async def consume_events_sse(
     - For project scope, ensures single-leader per project using a server-side lease lock.
     - For session scope, will NOT create a project if missing; waits until the project exists to avoid duplicate creation.
     - Robust reconnection with backoff and jitter; reacts to session change for session scope.
+    - The socket reader only parses frames into a bounded queue (AWFL_SSE_QUEUE_MAX); a dispatcher task
+      decodes and forwards events, so slow tool calls do not stall the stream.
+    - Frames are read in raw chunks (no aiohttp line-length limit); events larger than
+      AWFL_SSE_SPILL_BYTES are spilled to a temp file and decoded from disk.
+    - Project scope shards events into per-session ordered lanes that run concurrently
+      (AWFL_LANES_MAX_CONCURRENCY, AWFL_LANE_QUEUE_MAX); its cursor only advances past
+      events whose predecessors have all completed. Reconnects do not wait for running
+      lanes: the stream resumes from that watermark and redelivered events are skipped.
+    - The resolved project/workspace is cached across reconnects (AWFL_WORKSPACE_CACHE_TTL_SECS) and
+      only re-resolved on expiry, a 401/404/410 from the stream endpoint, or a session change.
+    - Resume positions come from a local cursor journal (~/.awfl/cursors*.jsonl) when present, so
+      reconnects need no cursor GET; the remote cursor is reconciled in the background (max wins).
+    - Cursors are coalesced per scope and flushed in the background (AWFL_CURSOR_FLUSH_SECS /
+      AWFL_CURSOR_FLUSH_EVENTS), and always on reconnect, session switch and cancellation.
 
     Returns a small string status on termination to help the caller classify the outcome:
     - "skipped-lock": Project consumer skipped because another instance holds the leader lock (benign).
@@ -71,7 +118,12 @@ async def consume_events_sse(
     scope = (scope or "session").lower()
 
     # Creation policy: project stream is allowed to create; session stream must wait for it
-    create_project_if_missing = (scope == "project")
+    create_project_if_missing = scope in ("project", "both")
+
+    # Sinks served by this connection
+    executes = scope in ("project", "both")
+    logs = scope in ("session", "both")
+    multiplex = scope == "both"
 
     log_unique(
         f"🔌 Connecting to events stream (workspace mode, scope={scope}): {stream_url}"
@@ -102,6 +154,51 @@ async def consume_events_sse(
     except Exception:
         idle_stall_secs = 75.0
 
+    # Read size for raw stream chunks fed to the byte-level SSE parser
+    try:
+        read_chunk_bytes = max(1024, int(os.getenv("AWFL_SSE_READ_CHUNK_BYTES", str(64 * 1024))))
+    except Exception:
+        read_chunk_bytes = 64 * 1024
+
+    # Events with data above this size are spilled to a temp file instead of memory (0 disables)
+    try:
+        spill_bytes = max(0, int(os.getenv("AWFL_SSE_SPILL_BYTES", str(8 * 1024 * 1024))))
+    except Exception:
+        spill_bytes = 8 * 1024 * 1024
+    spill_dir = os.getenv("AWFL_SSE_SPILL_DIR") or None
+
+    # Bounded dispatch queue between the socket reader and event handlers
+    try:
+        queue_max = max(1, int(os.getenv("AWFL_SSE_QUEUE_MAX", "1000")))
+    except Exception:
+        queue_max = 1000
+
+    # Cursor commit coalescing: flush the newest id per scope every N seconds or M events
+    try:
+        cursor_flush_secs = float(os.getenv("AWFL_CURSOR_FLUSH_SECS", "1.0"))
+    except Exception:
+        cursor_flush_secs = 1.0
+    try:
+        cursor_flush_events = int(os.getenv("AWFL_CURSOR_FLUSH_EVENTS", "50"))
+    except Exception:
+        cursor_flush_events = 50
+
+    # How long a resolved project/workspace is reused across reconnects (0 disables)
+    try:
+        workspace_cache_ttl = float(os.getenv("AWFL_WORKSPACE_CACHE_TTL_SECS", "600"))
+    except Exception:
+        workspace_cache_ttl = 600.0
+
+    # Project-scope per-session lanes: global handler cap and per-lane queue bound
+    try:
+        lane_concurrency = max(1, int(os.getenv("AWFL_LANES_MAX_CONCURRENCY", "8")))
+    except Exception:
+        lane_concurrency = 8
+    try:
+        lane_queue_max = max(1, int(os.getenv("AWFL_LANE_QUEUE_MAX", "100")))
+    except Exception:
+        lane_queue_max = 100
+
     # Lock lease and refresh tuning
     def _clamp_lease(ms: int) -> int:
         # Server bounds: min 5s, default 45s, max 10m
@@ -132,207 +229,505 @@ async def consume_events_sse(
     except Exception:
         no_refresh = False
 
-    if scope == "project" and external_lock_token:
+    if executes and external_lock_token:
         log_unique("🔏 External project lock token detected (AWFL_PROJECT_LOCK_TOKEN). Will use it on acquire/refresh.")
         if no_refresh:
             log_unique("⛔ External lock marked non-renewable (AWFL_PROJECT_LOCK_NO_REFRESH=1); local refresher will be disabled.")
 
-    async with aiohttp.ClientSession(timeout=client_timeout) as session_http:
-        project_id_for_lock: Optional[str] = None
-        leader_acquired = False
-        lost_lock = False
-        refresher_task: Optional[asyncio.Task] = None
-
-        # Parent task handle for cooperative cancellation
-        parent_task = asyncio.current_task()
-
-        async def _start_or_confirm_lock(project_id: str) -> Optional[str]:
-            nonlocal leader_acquired
-            nonlocal refresher_task
-            nonlocal lost_lock
-
-            # Attempt to acquire/refresh lock; retry transiently if unknown status
-            attempt = 0
-            while True:
-                attempt += 1
-                acquired, refreshed, conflict, payload = await acquire_lock(
-                    session_http,
-                    project_id=project_id,
-                    lease_ms=lease_ms,
-                )
-                if conflict:
-                    # Another consumer holds the lock
-                    # Prefer top-level msRemaining; fall back to holder.expiresInMs
+    # Shared keep-alive pool (utils.http); the stream request overrides the default timeout
+    session_http = get_http_session()
+    project_id_for_lock: Optional[str] = None
+    leader_acquired = False
+    lost_lock = False
+    refresher_task: Optional[asyncio.Task] = None
+
+    # Parent task handle for cooperative cancellation
+    parent_task = asyncio.current_task()
+
+    async def _start_or_confirm_lock(project_id: str) -> Optional[str]:
+        nonlocal leader_acquired
+        nonlocal refresher_task
+        nonlocal lost_lock
+
+        # Attempt to acquire/refresh lock; retry transiently if unknown status
+        attempt = 0
+        while True:
+            attempt += 1
+            acquired, refreshed, conflict, payload = await acquire_lock(
+                session_http,
+                project_id=project_id,
+                lease_ms=lease_ms,
+            )
+            if conflict:
+                # Another consumer holds the lock
+                # Prefer top-level msRemaining; fall back to holder.expiresInMs
+                expires_in_ms = None
+                try:
+                    if isinstance(payload, dict):
+                        if payload.get("msRemaining") is not None:
+                            expires_in_ms = int(payload.get("msRemaining"))
+                        else:
+                            holder = payload.get("holder") or {}
+                            v = holder.get("expiresInMs") or holder.get("expiresIn")
+                            if v is not None:
+                                expires_in_ms = int(v)
+                except Exception:
                     expires_in_ms = None
-                    try:
-                        if isinstance(payload, dict):
-                            if payload.get("msRemaining") is not None:
-                                expires_in_ms = int(payload.get("msRemaining"))
-                            else:
-                                holder = payload.get("holder") or {}
-                                v = holder.get("expiresInMs") or holder.get("expiresIn")
-                                if v is not None:
-                                    expires_in_ms = int(v)
-                    except Exception:
-                        expires_in_ms = None
-                    if expires_in_ms is not None:
-                        log_unique(
-                            f"🦬 Project-wide SSE already active for project {project_id}; skipping in this terminal (lock expires in ~{int(expires_in_ms)/1000:.0f}s)."
-                        )
-                    else:
-                        log_unique(
-                            f"🦬 Project-wide SSE already active for project {project_id}; skipping in this terminal."
-                        )
-                    return "skipped-lock"
-                if acquired or refreshed:
-                    leader_acquired = True
-                    cid = get_consumer_id()
-                    used_ext = bool(external_lock_token)
-                    if acquired:
-                        log_unique(
-                            f"🔐 Acquired project consumer lock for {project_id} as {cid} (lease={lease_ms}ms){' via external token' if used_ext else ''}"
-                        )
-                    else:
-                        log_unique(
-                            f"🔄 Refreshed project consumer lock for {project_id} as {cid} (lease={lease_ms}ms){' via external token' if used_ext else ''}"
-                        )
-                    # Start refresher if allowed and not already running
-                    if not no_refresh:
-                        if not refresher_task or refresher_task.done():
-                            refresher_task = asyncio.create_task(
-                                _lease_refresher(project_id), name="awfl-lock-refresher"
-                            )
-                    else:
-                        dbg("External lock marked non-renewable; skipping local refresher task")
-                    return None
-                # Unknown/other response; backoff and retry a few times, then keep trying with capped backoff
-                delay = min(5.0, 0.5 * attempt) + random.random()
-                log_unique(
-                    f"⚠️ Lock acquire/refresh returned indeterminate status (attempt {attempt}); retrying in ~{delay:.1f}s"
-                )
-                await asyncio.sleep(delay)
-
-        # lease refresher impl
-        async def _lease_refresher(project_id: str):
-            nonlocal lost_lock
-
-            loop = asyncio.get_event_loop()
-            last_success = loop.time()
-            # Start with the normal interval; on failures we switch to shorter retries
-            next_delay = refresh_interval_secs
-            # Short retry baseline: 1s..5s depending on lease length
-            short_retry_floor = max(1.0, min(5.0, lease_secs / 10.0))
-
-            while True:
-                await asyncio.sleep(next_delay)
-                acquired, refreshed, conflict, _payload = await acquire_lock(
-                    session_http,
-                    project_id=project_id,
-                    lease_ms=lease_ms,
-                )
-                now = loop.time()
-                if conflict:
+                if expires_in_ms is not None:
                     log_unique(
-                        "❌ Lost project consumer lock due to conflict with another active consumer; terminating."
+                        f"🦬 Project-wide SSE already active for project {project_id}; skipping in this terminal (lock expires in ~{int(expires_in_ms)/1000:.0f}s)."
                     )
-                    lost_lock = True
-                    if parent_task:
-                        parent_task.cancel()
-                    return
-                if acquired or refreshed:
-                    last_success = now
-                    next_delay = refresh_interval_secs
-                    # Optional: keep refresh logs light
-                    dbg(
-                        f"Refreshed project lock for {project_id} (acquired={acquired}, refreshed={refreshed})"
+                else:
+                    log_unique(
+                        f"🦬 Project-wide SSE already active for project {project_id}; skipping in this terminal."
                     )
-                    continue
-
-                # Transient failure; retry sooner than the full interval to avoid lease expiry
-                since_ok = now - last_success
-                remaining = max(0.0, lease_secs - since_ok)
-                if remaining <= 0:
+                return "skipped-lock"
+            if acquired or refreshed:
+                leader_acquired = True
+                cid = get_consumer_id()
+                used_ext = bool(external_lock_token)
+                if acquired:
+                    log_unique(
+                        f"🔐 Acquired project consumer lock for {project_id} as {cid} (lease={lease_ms}ms){' via external token' if used_ext else ''}"
+                    )
+                else:
                     log_unique(
-                        "❌ Lost project consumer lock (lease expired without successful refresh); terminating."
+                        f"🔄 Refreshed project consumer lock for {project_id} as {cid} (lease={lease_ms}ms){' via external token' if used_ext else ''}"
                     )
-                    lost_lock = True
-                    if parent_task:
-                        parent_task.cancel()
-                    return
-                # Retry quickly within the remaining grace window
-                # Aim to try multiple times before expiry with a bit of jitter
-                next_delay = max(short_retry_floor, min(5.0, remaining / 3.0)) + random.random()
+                # Start refresher if allowed and not already running
+                if not no_refresh:
+                    if not refresher_task or refresher_task.done():
+                        refresher_task = asyncio.create_task(
+                            _lease_refresher(project_id), name="awfl-lock-refresher"
+                        )
+                else:
+                    dbg("External lock marked non-renewable; skipping local refresher task")
+                return None
+            # Unknown/other response; backoff and retry a few times, then keep trying with capped backoff
+            delay = min(5.0, 0.5 * attempt) + random.random()
+            log_unique(
+                f"⚠️ Lock acquire/refresh returned indeterminate status (attempt {attempt}); retrying in ~{delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    # lease refresher impl
+    async def _lease_refresher(project_id: str):
+        nonlocal lost_lock
+
+        loop = asyncio.get_event_loop()
+        last_success = loop.time()
+        # Start with the normal interval; on failures we switch to shorter retries
+        next_delay = refresh_interval_secs
+        # Short retry baseline: 1s..5s depending on lease length
+        short_retry_floor = max(1.0, min(5.0, lease_secs / 10.0))
+
+        while True:
+            await asyncio.sleep(next_delay)
+            acquired, refreshed, conflict, _payload = await acquire_lock(
+                session_http,
+                project_id=project_id,
+                lease_ms=lease_ms,
+            )
+            now = loop.time()
+            if conflict:
                 log_unique(
-                    f"⚠️ Lock refresh failed; retrying in ~{next_delay:.1f}s (grace ~{int(remaining)}s remaining)"
+                    "❌ Lost project consumer lock due to conflict with another active consumer; terminating."
                 )
+                lost_lock = True
+                if parent_task:
+                    parent_task.cancel()
+                return
+            if acquired or refreshed:
+                last_success = now
+                next_delay = refresh_interval_secs
+                # Optional: keep refresh logs light
+                dbg(
+                    f"Refreshed project lock for {project_id} (acquired={acquired}, refreshed={refreshed})"
+                )
+                continue
 
-        while True:
-            # Resolve project and workspace according to scope
-            forced_session_id = None
-            if scope == "session":
-                try:
-                    forced_session_id = get_session()
-                except Exception:
-                    forced_session_id = None
+            # Transient failure; retry sooner than the full interval to avoid lease expiry
+            since_ok = now - last_success
+            remaining = max(0.0, lease_secs - since_ok)
+            if remaining <= 0:
+                log_unique(
+                    "❌ Lost project consumer lock (lease expired without successful refresh); terminating."
+                )
+                lost_lock = True
+                if parent_task:
+                    parent_task.cancel()
+                return
+            # Retry quickly within the remaining grace window
+            # Aim to try multiple times before expiry with a bit of jitter
+            next_delay = max(short_retry_floor, min(5.0, remaining / 3.0)) + random.random()
+            log_unique(
+                f"⚠️ Lock refresh failed; retrying in ~{next_delay:.1f}s (grace ~{int(remaining)}s remaining)"
+            )
+
+    evt_count = 0
+    telemetry = ConnectionTelemetry(f"sse-{scope}")
+    # Project/workspace resolution survives reconnects; only the stream GET is repeated
+    ws_cache = WorkspaceResolutionCache(ttl_secs=workspace_cache_ttl)
+    journal = get_journal()
+    if journal is not None:
+        await asyncio.to_thread(journal.load)
+    # Execute sink stays on until another terminal is found holding the project lock
+    exec_enabled = executes
+    # Per-sink resume positions when the connection resumed from an older shared id
+    sink_floors: dict = {}
+    recent_ids = _RecentIds()
+
+    # Dispatcher stage: decode, forward and persist the cursor for one queued SSE frame
+    async def _dispatch_event(item: dict):
+        nonlocal evt_count
+
+        evt = item["evt"]
+        evt_id = evt.get("id")
+        evt_type = evt.get("event") or "message"
+        evt_retry = evt.get("retry")
+        data_file = evt.get("data_file")
+        if data_file:
+            # Oversized event spilled to disk by the parser; decode it straight from the file
+            try:
+                data_text = await asyncio.to_thread(read_spilled_data, data_file)
+            except Exception as e:
+                log_unique(f"⚠️ Failed to read spilled SSE event (id={evt_id}, size={evt.get('data_size')}): {e}")
+                return
+        else:
+            # Take ownership so the queued frame does not keep a second reference alive
+            data_text = evt.pop("data", None) or ""
+
+        if not data_text or data_text.isspace():
+            # Ignore empty data events (e.g., heartbeat edge cases)
+            dbg("Empty data event; ignored")
+            return
+        evt_count += 1
+        preview = data_text if is_debug_raw() else data_text[:160]
+        # Precompute sanitized preview to avoid backslashes inside f-string expressions (Py<=3.11)
+        preview_one_line = preview.replace("\n", " ")
+        dbg(
+            f"evt#{evt_count} (type={evt_type}) id={evt_id} retry={evt_retry} data_len={len(data_text)} preview={preview_one_line}"
+        )
+        try:
+            obj = json_loads(data_text)
+        except Exception as e:
+            p = data_text if is_debug_raw() else data_text[:200]
+            log_unique(
+                f"⚠️ SSE event JSON parse error (id={evt_id}, type={evt_type}, retry={evt_retry}): {e}. data[0:{len(p)}]=" + p
+            )
+            return
+
+        # Keep only a preview of the raw text so large payloads are not held twice while the tool runs
+        data_len = len(data_text)
+        if not is_debug_raw():
+            data_text = data_text[:400]
+
+        if isinstance(obj, dict):
+            # Parse once: the logger and executor share this Event and its lazily decoded arguments
+            obj = Event(obj, event_id=str(evt_id) if evt_id else None, received_at=item.get("recv"))
+            if obj.created_at is not None and obj.received_at is not None:
+                # Server emission -> our reader; includes relay buffering and the network
+                record_latency("relay", since_ms(obj.created_at, obj.received_at), obj.tool_name or None)
+        job = {
+            "obj": obj,
+            "evt_id": evt_id,
+            "evt_type": evt_type,
+            "evt_retry": evt_retry,
+            "data_text": data_text,
+            "data_len": data_len,
+            "project_id": item["project_id"],
+            "session_id": item["session_id"],
+            "ws_id": item["ws_id"],
+        }
+        evt_session = event_session_id(obj) if isinstance(obj, Event) else None
+        evt_key = event_id_key(evt_id)
+
+        if logs:
+            # Log sink: a multiplexed stream carries every session, so keep only the current one
+            log_it = True
+            if multiplex:
+                sid, floor = sink_floors.get("session") or (None, None)
+                log_it = evt_session is not None and evt_session == job["session_id"]
+                if log_it and sid == evt_session and floor is not None and evt_key is not None:
+                    log_it = evt_key > floor
+            if log_it and evt_id and recent_ids.seen(("log", job["ws_id"], str(evt_id))):
+                dbg(f"Event {evt_id} already logged before the reconnect; skipped")
+                log_it = False
+            if log_it:
+                await _forward_job(job, "log")
+                _record_cursor(job, "session")
+
+        if executes and exec_enabled and lanes is not None:
+            floor = sink_floors.get("project")
+            if floor is not None and evt_key is not None and evt_key <= floor:
+                # Replayed only because the log sink resumed from an older id
+                return
+            if evt_id and recent_ids.seen(("execute", job["ws_id"], str(evt_id))):
+                # Still queued/running (or just finished) from before the reconnect
+                dbg(f"Event {evt_id} already submitted before the reconnect; skipped")
+                return
+            # Run concurrently per session, ordered within a session.
+            # The cursor advances from the lanes' contiguous completion watermark.
+            await lanes.submit(evt_session, job)
+
+    async def _execute_job(job: dict):
+        await _forward_job(job, "execute")
+
+    def _advance_project_cursor(job: dict):
+        _record_cursor(job, "project")
+
+    # Forward one decoded event to the CLI response handler for one sink
+    async def _forward_job(job: dict, mode: str):
+        obj = job["obj"]
+        evt_id, evt_type, evt_retry = job["evt_id"], job["evt_type"], job["evt_retry"]
+        data_text = job["data_text"]
+        try:
+            if isinstance(obj, Event):
+                await forward_event(obj, mode=mode)  # execute sink runs silently; log sink logs only
             else:
-                forced_session_id = None
+                # Non-dict payloads are unexpected; log and skip forwarding to avoid attribute errors downstream
+                kind = type(obj).__name__
+                rawfrag = data_text if is_debug_raw() else data_text[:400]
+                log_unique(
+                    f"⚠️ SSE event payload is not an object (id={evt_id}, type={evt_type}, retry={evt_retry}, payload_type={kind}); skipping forward. raw[0:{len(rawfrag)}]="
+                    + rawfrag
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            rawfrag = data_text if is_debug_raw() else data_text[:400]
+            tb = traceback.format_exc()
+            log_unique(
+                f"⚠️ Error handling SSE event (id={evt_id}, type={evt_type}, retry={evt_retry}, data_len={job['data_len']}): {e}\n{tb}\npreview[0:{len(rawfrag)}]="
+                + rawfrag.replace("\n", " ")
+            )
 
-            project_id, ws_id = await _resolve_project_and_workspace(
-                session_http,
-                forced_session_id,
-                create_project_if_missing=create_project_if_missing,
+    # Record new cursor per project/session (only after dispatch: at-least-once)
+    def _record_cursor(job: dict, target: str):
+        evt_id = job["evt_id"]
+        if not evt_id:
+            return
+        obj = job["obj"]
+        # Prefer server-provided create_time if present; else fall back to local time string
+        ts = None
+        if isinstance(obj, Event):
+            ts = obj.create_time or obj.get("time")
+        if ts is None:
+            ts = str(time.time())
+        # Coalesced: the committer flushes only the newest id per scope in the background
+        if target == "session":
+            if not job["session_id"]:
+                return
+            committer.record(
+                event_id=str(evt_id),
+                project_id=job["project_id"],
+                session_id=job["session_id"],
+                # A multiplexed stream reads the project workspace; key the session cursor by ids only
+                workspace_id=None if multiplex else job["ws_id"],
+                scope="session",
+                timestamp=str(ts) if ts is not None else None,
+            )
+        else:
+            committer.record(
+                event_id=str(evt_id),
+                project_id=job["project_id"],
+                workspace_id=job["ws_id"],
+                scope="project",
+                timestamp=str(ts) if ts is not None else None,
             )
-            dbg(f"Resolved project_id={project_id}, ws_id={ws_id}, scope={scope}, create_if_missing={create_project_if_missing}")
-            if not project_id or not ws_id:
-                # Could not resolve project/workspace. For session scope, this likely means project is not created yet.
-                if scope == "session":
-                    log_unique("⏳ Waiting for project-wide consumer to create/resolve project...")
-                await asyncio.sleep(min(backoff, 5.0))
-                backoff = min(backoff * 2, backoff_max)
-                continue
 
-            # For project-wide scope, ensure only one live consumer per project using server lock
-            if scope == "project":
-                project_id_for_lock = project_id
-                if not leader_acquired:
-                    reason = await _start_or_confirm_lock(project_id_for_lock)
-                    if reason == "skipped-lock":
-                        return "skipped-lock"  # benign skip
+    # Resume position: local journal first (no network), remote cursor service otherwise.
+    # A journal hit is reconciled with the remote in the background; the larger position wins.
+    reconcile_tasks: set = set()
+    reconciled: set = set()  # (project, session) pairs already reconciled in this process
+
+    async def _resume_cursor(
+        project_id: str, session_id: Optional[str] = None, workspace_id: Optional[str] = None
+    ) -> Optional[str]:
+        local = journal.get(project_id, session_id) if journal is not None else None
+        if local:
+            dbg(f"Resuming from journal cursor {local} (project={project_id}, session={session_id})")
+            if (project_id, session_id) not in reconciled:
+                reconciled.add((project_id, session_id))
+                t = asyncio.create_task(
+                    _reconcile_cursor(project_id, session_id, workspace_id, local), name="cursor-reconcile"
+                )
+                reconcile_tasks.add(t)
+                t.add_done_callback(reconcile_tasks.discard)
+            return local
+        remote = await get_resume_event_id(
+            session_http, project_id=project_id, session_id=session_id, workspace_id=workspace_id
+        )
+        if journal is not None and remote:
+            await asyncio.to_thread(journal.observe_remote, project_id, session_id, remote)
+        return remote
+
+    async def _reconcile_cursor(project_id: str, session_id: Optional[str], workspace_id: Optional[str], local: str):
+        try:
+            remote = await get_resume_event_id(
+                session_http, project_id=project_id, session_id=session_id, workspace_id=workspace_id
+            )
+            winner = await asyncio.to_thread(journal.observe_remote, project_id, session_id, remote)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            dbg(f"Cursor reconcile failed: {e}")
+            return
+        if winner != local:
+            # Remote is ahead (e.g. another machine held the lock); used from the next reconnect
+            dbg(f"Remote cursor {remote} ahead of journal {local}; adopted")
+        elif remote != local and event_id_key(remote) is not None and event_id_key(local) is not None:
+            # Journal is ahead (remote commit was lost); push it so other machines catch up
+            committer.record(
+                event_id=local,
+                project_id=project_id,
+                session_id=session_id,
+                workspace_id=workspace_id,
+                scope="session" if session_id else "project",
+            )
 
-            # Reset backoff when switching workspaces to be responsive
-            if ws_id != last_ws_id:
-                backoff = 1.0
+    def _cancel_reconciles():
+        for t in list(reconcile_tasks):
+            t.cancel()
+
+    # One connection, two cursors: resume from the older one and let each sink skip what it already saw
+    async def _multiplex_resume_id(project_id: str, ws_id: str, session_id: Optional[str]) -> Optional[str]:
+        session_resume = None
+        if session_id:
+            session_resume = await _resume_cursor(project_id, session_id)
+            sink_floors["session"] = (session_id, event_id_key(session_resume))
+        if not exec_enabled:
+            return session_resume
+        project_resume = await _resume_cursor(project_id, workspace_id=ws_id)
+        earliest = earliest_event_id(project_resume, session_resume)
+        if earliest is None or earliest == project_resume:
+            # Unordered ids or a missing session cursor: never replay executions for logs
+            return project_resume
+        sink_floors["project"] = event_id_key(project_resume)
+        return earliest
+
+    committer = CursorCommitter(
+        session_http,
+        interval_secs=cursor_flush_secs,
+        max_pending=cursor_flush_events,
+        name=f"cursor-committer-{scope}",
+        journal=journal,
+    )
+    committer.start()
+
+    # The execute sink runs tools: shard by session so sessions do not block each other
+    lanes: Optional[SessionLanes] = None
+    if executes:
+        lanes = SessionLanes(
+            _execute_job,
+            on_advance=_advance_project_cursor,
+            max_concurrency=lane_concurrency,
+            lane_queue_max=lane_queue_max,
+            name="session-lanes-project",
+        )
 
-            params = {"workspaceId": ws_id}
+    dispatcher = EventDispatcher(
+        _dispatch_event,
+        maxsize=queue_max,
+        name=f"sse-dispatch-{scope}",
+    )
+    dispatcher.start()
 
-            headers = {"Accept": "text/event-stream"}
-            try:
-                headers.update(get_auth_headers())
-            except Exception as e:
-                log_unique(f"⚠️ Could not resolve auth headers for SSE: {e}")
+    # Optional raw byte tee for offline replay (AWFL_SSE_CAPTURE_DIR)
+    capture = open_capture(scope)
 
-            # Advertise consumer type so server can differentiate LOCAL vs CLOUD consumers
+    while True:
+        # Resolve project and workspace according to scope
+        forced_session_id = None
+        if scope == "session":
             try:
-                headers["x-consumer-type"] = get_consumer_type()
+                forced_session_id = get_session()
             except Exception:
-                # Best-effort; default behavior on server is LOCAL if header missing
-                pass
+                forced_session_id = None
+        else:
+            forced_session_id = None
+        # Session whose events the log sink shows (a multiplexed stream reads the project workspace)
+        log_session_id = forced_session_id
+        if multiplex:
+            try:
+                log_session_id = get_session()
+            except Exception:
+                log_session_id = None
+
+        cached = ws_cache.get(forced_session_id)
+        if cached is not None:
+            project_id, ws_id = cached
+        else:
+            project_id, ws_id = await _resolve_project_and_workspace(
+                session_http,
+                forced_session_id,
+                create_project_if_missing=create_project_if_missing,
+            )
+            if project_id and ws_id:
+                ws_cache.put(forced_session_id, project_id, ws_id)
+        dbg(f"Resolved project_id={project_id}, ws_id={ws_id}, scope={scope}, create_if_missing={create_project_if_missing}")
+        if not project_id or not ws_id:
+            # Could not resolve project/workspace. For session scope, this likely means project is not created yet.
+            if scope == "session":
+                log_unique("⏳ Waiting for project-wide consumer to create/resolve project...")
+            telemetry.backing_off(min(backoff, 5.0))
+            await asyncio.sleep(min(backoff, 5.0))
+            backoff = min(backoff * 2, backoff_max)
+            continue
+
+        # For project-wide scope, ensure only one live consumer per project using server lock
+        if executes and exec_enabled:
+            project_id_for_lock = project_id
+            if not leader_acquired:
+                reason = await _start_or_confirm_lock(project_id_for_lock)
+                if reason == "skipped-lock" and multiplex:
+                    # Keep the connection for this terminal's logs; another terminal executes
+                    log_unique("ℹ️ Multiplexed consumer continuing in log-only mode.")
+                    exec_enabled = False
+                elif reason == "skipped-lock":
+                    _cancel_reconciles()
+                    telemetry.closed()
+                    if capture is not None:
+                        capture.close()
+                    await dispatcher.close()
+                    if lanes is not None:
+                        await lanes.close()
+                    await committer.close()
+                    return "skipped-lock"  # benign skip
+
+        # Reset backoff when switching workspaces to be responsive
+        if ws_id != last_ws_id:
+            backoff = 1.0
+
+        params = {"workspaceId": ws_id}
+
+        headers = await auth_headers_async({"Accept": "text/event-stream"}, purpose="SSE")
+
+        # Advertise consumer type so server can differentiate LOCAL vs CLOUD consumers
+        try:
+            headers["x-consumer-type"] = get_consumer_type()
+        except Exception:
+            # Best-effort; default behavior on server is LOCAL if header missing
+            pass
+
+        disconnect_reason = "stream-ended"
+        telemetry.attempt()
+        try:
+            # Inside the guarded section: a cancel or lost lock while draining still runs the cleanup below
+            # Persist the contiguous watermark and reconnect right away; queued and in-flight
+            # lanes keep running. Their events are redelivered after the resume id and skipped
+            # as already handled (ledger replay covers anything older than the recent-id window)
+            await committer.flush()
 
             # Attach Last-Event-ID cursor if available for this workspace and scope
+            sink_floors.clear()
             try:
                 if scope == "session":
-                    resume_id = await get_resume_event_id(
-                        session_http,
-                        project_id=project_id,
-                        session_id=forced_session_id,
-                        workspace_id=ws_id,
-                    )
+                    resume_id = await _resume_cursor(project_id, forced_session_id, ws_id)
+                elif multiplex:
+                    resume_id = await _multiplex_resume_id(project_id, ws_id, log_session_id)
                 else:
-                    resume_id = await get_resume_event_id(
-                        session_http,
-                        project_id=project_id,
-                        workspace_id=ws_id,
-                    )
+                    resume_id = await _resume_cursor(project_id, workspace_id=ws_id)
             except Exception as e:
                 log_unique(f"⚠️ Failed to get resume cursor: {e}")
                 resume_id = None
@@ -349,208 +744,183 @@ async def consume_events_sse(
                 f"GET {stream_url} params={params} Last-Event-ID={'set' if resume_id else 'none'}"
             )
 
-            try:
-                async with session_http.get(stream_url, headers=headers, params=params) as resp:
-                    if resp.status != 200:
-                        text = await resp.text()
-                        log_unique(f"❌ SSE connect failed ({resp.status}): {text[:500]}")
-                        # Backoff before retry
-                        await asyncio.sleep(backoff + random.random())
-                        backoff = min(backoff * 2, backoff_max)
-                        continue
-
-                    last_ws_id = ws_id
-                    log_unique(
-                        f"✅ SSE connected (workspace={ws_id}, scope={scope}). Resuming after id={resume_id or 'None'}"
-                    )
-
-                    parser = SSEParser()
-                    evt_count = 0
-
-                    # Idle stall watchdog task; force-close response if no bytes are seen for idle_stall_secs
-                    last_activity = asyncio.get_event_loop().time()
-
-                    async def _idle_watchdog():
-                        if idle_stall_secs and idle_stall_secs > 0:
-                            # Check roughly every 5 seconds (or 1/3 of stall window if small)
-                            interval = max(1.0, min(5.0, idle_stall_secs / 3.0))
-                            while True:
-                                await asyncio.sleep(interval)
-                                now = asyncio.get_event_loop().time()
-                                if now - last_activity > idle_stall_secs:
-                                    log_unique(
-                                        f"🧊 SSE idle for ~{int(now - last_activity)}s (threshold={int(idle_stall_secs)}s); forcing reconnect..."
-                                    )
-                                    try:
-                                        resp.close()
-                                    except Exception:
-                                        pass
-                                    break
-
-                    idle_task = asyncio.create_task(_idle_watchdog(), name="sse-idle-watchdog")
-                    try:
-                        async for raw in resp.content:
-                            # mark activity for watchdog
-                            last_activity = asyncio.get_event_loop().time()
-
-                            # If user switches CLI session, reconnect to new workspace (session scope only)
-                            if scope == "session":
-                                try:
-                                    current_session_id = get_session()
-                                except Exception:
-                                    current_session_id = last_session_id
-                                if current_session_id != last_session_id:
-                                    log_unique("🔄 Session changed; reconnecting SSE for new workspace...")
-                                    break
+            async with session_http.get(stream_url, headers=headers, params=params, timeout=client_timeout) as resp:
+                if resp.status != 200:
+                    text = await resp.text()
+                    log_unique(f"❌ SSE connect failed ({resp.status}): {text[:500]}")
+                    if resp.status in (401, 404, 410):
+                        # Workspace (or its grant) is gone; resolve from scratch next time
+                        ws_cache.invalidate(f"stream returned {resp.status}")
+                    # Backoff before retry
+                    telemetry.disconnected(f"http-{resp.status}")
+                    telemetry.backing_off(backoff)
+                    await asyncio.sleep(backoff + random.random())
+                    backoff = min(backoff * 2, backoff_max)
+                    continue
 
-                            # If lost lock was signaled while streaming, break to unwind
-                            if scope == "project" and lost_lock:
-                                break
+                last_ws_id = ws_id
+                telemetry.connected()
+                log_unique(
+                    f"✅ SSE connected (workspace={ws_id}, scope={scope}). Resuming after id={resume_id or 'None'}"
+                )
 
-                            try:
-                                line = raw.decode("utf-8", errors="ignore")
-                            except Exception:
-                                # If decoding fails, skip chunk
+                parser = SSEByteParser(spill_threshold=spill_bytes, spill_dir=spill_dir)
+                if capture is not None:
+                    capture.connect(ws_id=ws_id, resume_id=resume_id, scope=scope)
+
+                # Idle stall watchdog task; force-close response if no bytes are seen for idle_stall_secs
+                last_activity = asyncio.get_event_loop().time()
+
+                async def _idle_watchdog():
+                    nonlocal last_activity, disconnect_reason
+                    if idle_stall_secs and idle_stall_secs > 0:
+                        # Check roughly every 5 seconds (or 1/3 of stall window if small)
+                        interval = max(1.0, min(5.0, idle_stall_secs / 3.0))
+                        while True:
+                            await asyncio.sleep(interval)
+                            now = asyncio.get_event_loop().time()
+                            if dispatcher.backpressured:
+                                # Reader is intentionally paused on a full queue, not stalled
+                                last_activity = now
                                 continue
-
-                            for l in line.splitlines(True):  # keepends True to preserve newlines
-                                evt = parser.feed_line(l)
-                                if evt is None:
-                                    continue
-
-                                # Dispatch complete SSE event
-                                evt_id = evt.get("id")
-                                data_text = evt.get("data") or ""
-                                evt_type = evt.get("event") or "message"
-                                evt_retry = evt.get("retry")
-
-                                if not data_text.strip():
-                                    # Ignore empty data events (e.g., heartbeat edge cases)
-                                    dbg("Empty data event; ignored")
-                                    continue
-                                evt_count += 1
-                                preview = data_text if is_debug_raw() else data_text[:160]
-                                # Precompute sanitized preview to avoid backslashes inside f-string expressions (Py<=3.11)
-                                preview_one_line = preview.replace("\n", " ")
-                                dbg(
-                                    f"evt#{evt_count} (type={evt_type}) id={evt_id} retry={evt_retry} data_len={len(data_text)} preview={preview_one_line}"
+                            if now - last_activity > idle_stall_secs:
+                                disconnect_reason = "idle-stall"
+                                log_unique(
+                                    f"🧊 SSE idle for ~{int(now - last_activity)}s (threshold={int(idle_stall_secs)}s); forcing reconnect..."
                                 )
                                 try:
-                                    obj = json.loads(data_text)
-                                except Exception as e:
-                                    p = data_text if is_debug_raw() else data_text[:200]
-                                    log_unique(
-                                        f"⚠️ SSE event JSON parse error (id={evt_id}, type={evt_type}, retry={evt_retry}): {e}. data[0:{len(p)}]=" + p
-                                    )
-                                    continue
-
-                                # Forward to CLI response handler according to scope
-                                try:
-                                    mode = "execute" if scope == "project" else "log"
-                                    if isinstance(obj, dict):
-                                        await forward_event(obj, mode=mode)  # project executes silently; session logs only
-                                    else:
-                                        # Non-dict payloads are unexpected; log and skip forwarding to avoid attribute errors downstream
-                                        kind = type(obj).__name__
-                                        rawfrag = data_text if is_debug_raw() else data_text[:400]
-                                        log_unique(
-                                            f"⚠️ SSE event payload is not an object (id={evt_id}, type={evt_type}, retry={evt_retry}, payload_type={kind}); skipping forward. raw[0:{len(rawfrag)}]="
-                                            + rawfrag
-                                        )
-                                except Exception as e:
-                                    rawfrag = data_text if is_debug_raw() else data_text[:400]
-                                    tb = traceback.format_exc()
-                                    log_unique(
-                                        f"⚠️ Error handling SSE event (id={evt_id}, type={evt_type}, retry={evt_retry}, data_len={len(data_text)}): {e}\n{tb}\npreview[0:{len(rawfrag)}]="
-                                        + rawfrag.replace("\n", " ")
-                                    )
-
-                                # Persist new cursor remotely per project/session
-                                if evt_id:
-                                    # Prefer server-provided create_time if present; else fall back to local time string
-                                    ts = None
-                                    if isinstance(obj, dict):
-                                        ts = obj.get("create_time") or obj.get("time")
-                                    if ts is None:
-                                        try:
-                                            # Avoid import at top to keep light; local import
-                                            import time as _time
-
-                                            ts = str(_time.time())
-                                        except Exception:
-                                            ts = ""
-                                    try:
-                                        if scope == "session":
-                                            await update_cursor(
-                                                session_http,
-                                                event_id=str(evt_id),
-                                                project_id=project_id,
-                                                session_id=forced_session_id,
-                                                workspace_id=ws_id,
-                                                scope="session",
-                                                timestamp=str(ts) if ts is not None else None,
-                                            )
-                                        else:
-                                            await update_cursor(
-                                                session_http,
-                                                event_id=str(evt_id),
-                                                project_id=project_id,
-                                                workspace_id=ws_id,
-                                                scope="project",
-                                                timestamp=str(ts) if ts is not None else None,
-                                            )
-                                    except Exception as e:
-                                        log_unique(f"⚠️ Failed to update cursor: {e}")
-                    finally:
-                        if not idle_task.done():
-                            idle_task.cancel()
-                            with contextlib.suppress(asyncio.CancelledError):
-                                await idle_task
-
-                    # If we exit the async for, the connection closed or workspace changed. Fall through to reconnect.
-                    log_unique("ℹ️ SSE connection ended; reconnecting...")
-
-            except asyncio.CancelledError:
-                # Task canceled: exit cleanly
-                if scope == "project" and project_id_for_lock and leader_acquired:
-                    try:
-                        ok, released, conflict, _ = await release_lock(
-                            session_http, project_id=project_id_for_lock
-                        )
-                        if ok and released:
-                            log_unique("🔓 Released project consumer lock")
-                        elif ok and not released:
-                            log_unique("ℹ️ Lock release reported no active lock (already released or expired)")
-                        elif conflict:
-                            log_unique("⚠️ Lock release conflict; another holder present")
-                        else:
-                            log_unique("⚠️ Lock release failed")
-                    except Exception:
-                        log_unique("⚠️ Failed to release project consumer lock")
-                if scope == "project" and lost_lock:
-                    return "lost-lock"
-                log_unique("🛑 SSE consumer canceled; closing.")
-                return "cancelled"
-            except asyncio.TimeoutError:
-                # Socket read timeout (likely sleep/half-open). Reconnect.
-                log_unique("⌛ SSE read timed out; reconnecting to recover from possible sleep/half-open state...")
-                await asyncio.sleep(min(backoff, 5.0) + random.random())
-                backoff = min(backoff * 2, backoff_max)
-            except Exception as e:
-                # Network or parsing error -> backoff and retry
-                log_unique(f"⚠️ SSE error: {e}; reconnecting in ~{backoff:.1f}s")
-                await asyncio.sleep(backoff + random.random())
-                backoff = min(backoff * 2, backoff_max)
+                                    resp.close()
+                                except Exception:
+                                    pass
+                                break
 
-            # Small delay before attempting a reconnect
-            await asyncio.sleep(0.2)
+                idle_task = asyncio.create_task(_idle_watchdog(), name="sse-idle-watchdog")
+                try:
+                    async for raw in resp.content.iter_chunked(read_chunk_bytes):
+                        # mark activity for watchdog
+                        last_activity = asyncio.get_event_loop().time()
 
-        # Not reached, but ensure lock release
-        if scope == "project" and project_id_for_lock and leader_acquired:
-            try:
-                ok, released, conflict, _ = await release_lock(session_http, project_id=project_id_for_lock)
-                if ok and released:
-                    log_unique("🔓 Released project consumer lock")
-            except Exception:
-                pass
-        return "ended"
+                        # If user switches CLI session, reconnect to new workspace (session scope only)
+                        if scope == "session":
+                            try:
+                                current_session_id = get_session()
+                            except Exception:
+                                current_session_id = last_session_id
+                            if current_session_id != last_session_id:
+                                log_unique("🔄 Session changed; reconnecting SSE for new workspace...")
+                                ws_cache.invalidate()
+                                disconnect_reason = "session-change"
+                                break
+                        elif multiplex:
+                            # The shared stream already carries every session; just retarget the log sink
+                            try:
+                                current_session_id = get_session()
+                            except Exception:
+                                current_session_id = log_session_id
+                            if current_session_id != log_session_id:
+                                dbg(f"Session changed to {current_session_id}; log sink follows it on the shared stream")
+                                log_session_id = current_session_id
+
+                        # If lost lock was signaled while streaming, break to unwind
+                        if executes and lost_lock:
+                            disconnect_reason = "lost-lock"
+                            break
+
+                        if capture is not None:
+                            capture.data(raw)
+
+                        # Byte-level framing: data is decoded once per completed event
+                        frames = parser.feed(raw)
+                        telemetry.chunk(len(raw), len(frames))
+                        for evt in frames:
+                            # Hand the complete frame to the dispatcher; blocks only when the queue is full
+                            await dispatcher.put(
+                                {
+                                    "evt": evt,
+                                    "project_id": project_id,
+                                    "session_id": log_session_id,
+                                    "ws_id": ws_id,
+                                    "recv": time.time(),
+                                }
+                            )
+                finally:
+                    # Drop any partially received (possibly spilled) event; it is replayed on resume
+                    parser.close()
+                    if capture is not None:
+                        capture.flush()
+                    if not idle_task.done():
+                        idle_task.cancel()
+                        with contextlib.suppress(asyncio.CancelledError):
+                            await idle_task
+
+                # If we exit the async for, the connection closed or workspace changed. Fall through to reconnect.
+                telemetry.disconnected(disconnect_reason)
+                log_unique("ℹ️ SSE connection ended; reconnecting...")
+
+        except asyncio.CancelledError:
+            # Task canceled: exit cleanly
+            _cancel_reconciles()
+            telemetry.closed()
+            if capture is not None:
+                capture.close()
+            await dispatcher.close()
+            if lanes is not None:
+                await lanes.close()
+            await committer.close()
+            if executes and project_id_for_lock and leader_acquired:
+                try:
+                    ok, released, conflict, _ = await release_lock(
+                        session_http, project_id=project_id_for_lock
+                    )
+                    if ok and released:
+                        log_unique("🔓 Released project consumer lock")
+                    elif ok and not released:
+                        log_unique("ℹ️ Lock release reported no active lock (already released or expired)")
+                    elif conflict:
+                        log_unique("⚠️ Lock release conflict; another holder present")
+                    else:
+                        log_unique("⚠️ Lock release failed")
+                except Exception:
+                    log_unique("⚠️ Failed to release project consumer lock")
+            if executes and lost_lock:
+                return "lost-lock"
+            log_unique("🛑 SSE consumer canceled; closing.")
+            return "cancelled"
+        except asyncio.TimeoutError:
+            # Socket read timeout (likely sleep/half-open). Reconnect.
+            log_unique("⌛ SSE read timed out; reconnecting to recover from possible sleep/half-open state...")
+            telemetry.disconnected("read-timeout")
+            telemetry.backing_off(min(backoff, 5.0))
+            await asyncio.sleep(min(backoff, 5.0) + random.random())
+            backoff = min(backoff * 2, backoff_max)
+        except Exception as e:
+            # Network or parsing error -> backoff and retry
+            log_unique(f"⚠️ SSE error: {e}; reconnecting in ~{backoff:.1f}s")
+            # A watchdog-forced close surfaces as a payload error; keep the root cause
+            telemetry.disconnected(
+                disconnect_reason if disconnect_reason != "stream-ended" else f"error:{type(e).__name__}"
+            )
+            telemetry.backing_off(backoff)
+            await asyncio.sleep(backoff + random.random())
+            backoff = min(backoff * 2, backoff_max)
+
+        # Small delay before attempting a reconnect
+        await asyncio.sleep(0.2)
+
+    # Not reached, but ensure lock release
+    _cancel_reconciles()
+    telemetry.closed()
+    if capture is not None:
+        capture.close()
+    await dispatcher.close()
+    if lanes is not None:
+        await lanes.close()
+    await committer.close()
+    if executes and project_id_for_lock and leader_acquired:
+        try:
+            ok, released, conflict, _ = await release_lock(session_http, project_id=project_id_for_lock)
+            if ok and released:
+                log_unique("🔓 Released project consumer lock")
+        except Exception:
+            pass
+    return "ended"
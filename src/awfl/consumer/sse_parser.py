@@ -1,3 +1,9 @@
+import mmap
+import os
+import tempfile
+from typing import Optional
+
+
 class SSEParser:
     """Minimal SSE parser for text/event-stream.
 
@@ -53,3 +59,371 @@ class SSEParser:
             return None
         # Unknown field -> ignore
         return None
+
+
+# Line modes for SSEByteParser when a line spans chunk boundaries
+_MODE_START = 0  # field name not resolved yet; bytes buffered in _carry
+_MODE_DATA = 1   # inside a data: value; bytes stream straight into the data buffer
+_MODE_FIELD = 2  # inside a non-data field; bytes buffered in _carry (small values)
+_MODE_SKIP = 3   # inside a comment line; bytes discarded
+
+_LF = 0x0A
+_CR = 0x0D
+_COLON = 0x3A
+_SPACE = 0x20
+_BOM = b"\xef\xbb\xbf"
+
+
+class SSEByteParser:
+    """Incremental text/event-stream parser over raw byte chunks.
+
+    Follows the WHATWG event-stream interpretation rules:
+    - Lines end with CRLF, LF or CR (a CRLF split across chunks counts once).
+    - Leading BOM is ignored; lines starting with ':' are comments.
+    - One optional space after the colon is stripped from field values.
+    - Multiple data: lines are joined with LF; events without data are not dispatched.
+    - The last event id persists across events until changed; ids containing NUL are ignored.
+    - retry: only accepts ASCII digits.
+
+    data: values are accumulated into a reusable preallocated bytearray and decoded
+    exactly once per completed event. feed() returns event dicts shaped like SSEParser:
+      { 'id': str|None, 'event': str, 'data': str, 'retry': int|None }
+
+    Events whose data exceeds spill_threshold bytes are streamed to a temp file in
+    spill_dir instead of memory; they are returned with data=None plus
+      'data_file': <path>, 'data_size': <bytes>
+    and the caller owns the file (see read_spilled_data).
+    """
+
+    def __init__(
+        self,
+        initial_capacity: int = 64 * 1024,
+        max_retained: int = 1024 * 1024,
+        *,
+        spill_threshold: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+    ):
+        self._initial = max(16, int(initial_capacity))
+        self._max_retained = max(self._initial, int(max_retained))
+        self._buf = bytearray(self._initial)
+        self._spill_at = int(spill_threshold) if spill_threshold and spill_threshold > 0 else 0
+        self._spill_dir = spill_dir
+        self._spill = None
+        self._spilled = 0
+        self._last_id = None
+        self._started = False
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard any partially received line/event (e.g. on reconnect)."""
+        self._discard_spill()
+        self._dlen = 0
+        self._has_data = False
+        self._event = None
+        self._retry = None
+        self._carry = bytearray()
+        self._mode = _MODE_START
+        self._strip_space = False
+        self._skip_lf = False
+        if len(self._buf) > self._max_retained:
+            self._buf = bytearray(self._initial)
+
+    @property
+    def last_event_id(self):
+        return self._last_id
+
+    def close(self) -> None:
+        """Release buffers and remove any partially spilled event."""
+        self.reset()
+
+    # ----- data buffer -----
+
+    def _start_spill(self) -> None:
+        f = tempfile.NamedTemporaryFile(prefix="awfl-sse-", suffix=".data", dir=self._spill_dir, delete=False)
+        with memoryview(self._buf) as view:
+            f.write(view[: self._dlen])
+        self._spilled = self._dlen
+        self._dlen = 0
+        self._spill = f
+
+    def _discard_spill(self) -> None:
+        f = self._spill
+        self._spill = None
+        self._spilled = 0
+        if f is not None:
+            try:
+                f.close()
+            finally:
+                try:
+                    os.unlink(f.name)
+                except OSError:
+                    pass
+
+    def _append_data(self, src, start: int, end: int) -> None:
+        n = end - start
+        if n <= 0:
+            return
+        if self._spill is None and self._spill_at and self._dlen + n > self._spill_at:
+            self._start_spill()
+        if self._spill is not None:
+            self._spill.write(src[start:end])
+            self._spilled += n
+            return
+        need = self._dlen + n
+        if need > len(self._buf):
+            self._buf.extend(bytes(max(need, 2 * len(self._buf)) - len(self._buf)))
+        self._buf[self._dlen:need] = src[start:end]
+        self._dlen = need
+
+    def _begin_data_value(self) -> None:
+        # Each data: line after the first contributes a separating LF
+        if self._has_data and self._spill is not None:
+            self._spill.write(b"\n")
+            self._spilled += 1
+        elif self._has_data:
+            if self._dlen + 1 > len(self._buf):
+                self._buf.extend(bytes(len(self._buf)))
+            self._buf[self._dlen] = _LF
+            self._dlen += 1
+        self._has_data = True
+
+    # ----- line handling -----
+
+    def _field(self, name: bytes, value: bytes) -> None:
+        if name == b"event":
+            self._event = value.decode("utf-8", errors="replace")
+        elif name == b"id":
+            if b"\x00" not in value:
+                self._last_id = value.decode("utf-8", errors="replace")
+        elif name == b"retry":
+            if value and value.isdigit():
+                self._retry = int(value)
+        elif name == b"data":
+            self._begin_data_value()
+            self._append_data(value, 0, len(value))
+        # Unknown fields are ignored per spec
+
+    def _partial(self, mv: memoryview, start: int, end: int) -> None:
+        """Consume bytes of a line that continues beyond this chunk (or ends a carried line)."""
+        if start >= end:
+            return
+        mode = self._mode
+        if mode == _MODE_DATA:
+            if self._strip_space:
+                self._strip_space = False
+                if mv[start] == _SPACE:
+                    start += 1
+            self._append_data(mv, start, end)
+            return
+        if mode == _MODE_SKIP:
+            return
+        self._carry += mv[start:end]
+        if mode == _MODE_START:
+            line = self._carry
+            if line[0] == _COLON:
+                self._mode = _MODE_SKIP
+                self._carry = bytearray()
+                return
+            c = line.find(b":")
+            if c == -1:
+                return
+            if line[:c] == b"data":
+                # Switch to streaming: the value never sits in the line buffer
+                self._mode = _MODE_DATA
+                self._begin_data_value()
+                v = c + 1
+                if v < len(line):
+                    if line[v] == _SPACE:
+                        v += 1
+                else:
+                    self._strip_space = True
+                self._append_data(line, v, len(line))
+                self._carry = bytearray()
+            else:
+                self._mode = _MODE_FIELD
+
+    def _end_carried_line(self, out: list) -> None:
+        mode = self._mode
+        line = self._carry
+        self._mode = _MODE_START
+        self._strip_space = False
+        self._carry = bytearray()
+        if mode in (_MODE_DATA, _MODE_SKIP):
+            return
+        if not line:
+            self._dispatch(out)
+            return
+        c = line.find(b":")
+        if c == -1:
+            self._field(bytes(line), b"")
+            return
+        v = c + 1
+        if v < len(line) and line[v] == _SPACE:
+            v += 1
+        self._field(bytes(line[:c]), bytes(line[v:]))
+
+    def _take_event(self) -> dict:
+        if self._spill is not None:
+            f = self._spill
+            self._spill = None
+            f.close()
+            evt = {
+                "id": self._last_id,
+                "event": self._event or "message",
+                "data": None,
+                "retry": self._retry,
+                "data_file": f.name,
+                "data_size": self._spilled,
+            }
+            self._spilled = 0
+        else:
+            # Single decode per event straight from the buffer (no intermediate bytes copy)
+            data = str(memoryview(self._buf)[: self._dlen], "utf-8", "replace")
+            evt = {
+                "id": self._last_id,
+                "event": self._event or "message",
+                "data": data,
+                "retry": self._retry,
+            }
+        self._dlen = 0
+        self._has_data = False
+        self._event = None
+        self._retry = None
+        if len(self._buf) > self._max_retained:
+            self._buf = bytearray(self._initial)
+        return evt
+
+    def _dispatch(self, out: list) -> None:
+        if self._has_data:
+            out.append(self._take_event())
+        else:
+            self._event = None
+            self._retry = None
+
+    # ----- public API -----
+
+    def _handle_line(self, line: bytes, out: list) -> None:
+        """Handle one complete line outside the hot data: path."""
+        if not line:
+            self._dispatch(out)
+            return
+        if line[0] == _COLON:
+            return
+        c = line.find(b":")
+        if c == -1:
+            self._field(line, b"")
+            return
+        v = c + 1
+        if v < len(line) and line[v] == _SPACE:
+            v += 1
+        self._field(line[:c], line[v:])
+
+    def feed(self, chunk: bytes) -> list:
+        """Feed a chunk of bytes; returns the list of events completed by this chunk."""
+        out: list = []
+        n = len(chunk)
+        if not n:
+            return out
+        pos = 0
+        if not self._started:
+            self._started = True
+            if chunk.startswith(_BOM):
+                pos = 3
+        if self._skip_lf and pos < n:
+            self._skip_lf = False
+            if chunk[pos] == _LF:
+                pos += 1
+
+        mv = memoryview(chunk)
+        try:
+            # 1) Finish a line carried over from the previous chunk (streams large data: values)
+            if self._mode != _MODE_START or self._carry:
+                lf = chunk.find(b"\n", pos)
+                cr = chunk.find(b"\r", pos)
+                eol = lf if cr == -1 else (cr if lf == -1 else min(lf, cr))
+                if eol == -1:
+                    self._partial(mv, pos, n)
+                    return out
+                self._partial(mv, pos, eol)
+                self._end_carried_line(out)
+                pos = eol + 1
+                if chunk[eol] == _CR:
+                    if pos < n:
+                        if chunk[pos] == _LF:
+                            pos += 1
+                    else:
+                        self._skip_lf = True
+
+            # 2) Complete lines are split in C; bytes.splitlines only breaks on CR, LF and CRLF
+            last = max(chunk.rfind(b"\n"), chunk.rfind(b"\r"))
+            if last >= pos:
+                lines = chunk[pos : last + 1].splitlines()
+                buf = self._buf
+                spill_at = self._spill_at
+                for line in lines:
+                    if line and line[0] == 0x64 and line.startswith(b"data:"):
+                        # Hot path: append the value straight into the preallocated buffer
+                        v = 6 if len(line) > 5 and line[5] == _SPACE else 5
+                        dlen = self._dlen
+                        need = dlen + len(line) - v + 1
+                        if self._spill is not None or (spill_at and need > spill_at):
+                            self._begin_data_value()
+                            self._append_data(line, v, len(line))
+                            continue
+                        if need > len(buf):
+                            buf.extend(bytes(max(need, 2 * len(buf)) - len(buf)))
+                        if self._has_data:
+                            buf[dlen] = _LF
+                            dlen += 1
+                        self._has_data = True
+                        end = dlen + len(line) - v
+                        buf[dlen:end] = line[v:]
+                        self._dlen = end
+                    elif not line:
+                        if self._has_data:
+                            out.append(self._take_event())
+                            buf = self._buf
+                        else:
+                            self._event = None
+                            self._retry = None
+                    elif line[0] == 0x69 and line.startswith(b"id:"):
+                        v = line[4:] if len(line) > 3 and line[3] == _SPACE else line[3:]
+                        if b"\x00" not in v:
+                            self._last_id = v.decode("utf-8", "replace")
+                    else:
+                        self._handle_line(line, out)
+                        buf = self._buf
+                pos = last + 1
+                if pos >= n and chunk[last] == _CR:
+                    self._skip_lf = True
+
+            # 3) Remainder is the start of a line that continues in the next chunk
+            if pos < n:
+                self._partial(mv, pos, n)
+        finally:
+            mv.release()
+        return out
+
+
+def read_spilled_data(path: str, *, remove: bool = True) -> str:
+    """Decode a spilled event's data file via mmap and (by default) delete it.
+
+    Decoding straight from the mapping avoids an intermediate bytes copy, so the
+    only in-memory copy is the returned str.
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return ""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return str(mm, "utf-8", "replace")
+    finally:
+        if remove:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+__all__ = ["SSEParser", "SSEByteParser", "read_spilled_data"]
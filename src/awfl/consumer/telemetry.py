@@ -0,0 +1,194 @@
+import asyncio
+import importlib
+import json
+import os
+import time
+from collections import Counter, deque
+from typing import Any, Dict, Optional
+
+from awfl.utils import _get_workflow_env_suffix, log_unique
+
+# Connection health telemetry for the SSE consumer.
+#
+# One ConnectionTelemetry per consume_events_sse task. The reader loop calls a
+# couple of O(1) hooks per chunk (counters plus a per-second bucket for the
+# rates); everything else is derived when a snapshot is taken. Snapshots feed
+# the `status` command and, in headless mode, a JSON file rewritten every few
+# seconds (AWFL_STATUS_SNAPSHOT_PATH, default ~/.awfl/status{env}.json).
+
+_RATE_WINDOW_SECS = 10
+
+_registry: Dict[str, "ConnectionTelemetry"] = {}
+
+
+class ConnectionTelemetry:
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "starting"
+        self.events = 0
+        self.bytes = 0
+        self.connects = 0
+        self.reconnects = 0
+        self.reasons: Counter = Counter()
+        self.last_reason: Optional[str] = None
+        self.backoff = 0.0
+        self.time_to_connect: Optional[float] = None
+        self.time_to_first_event: Optional[float] = None
+        self._attempt_at: Optional[float] = None
+        self._connected_at: Optional[float] = None
+        self._last_bytes_at: Optional[float] = None
+        self._last_event_at: Optional[float] = None
+        # (second, events, bytes) buckets for the rolling rates
+        self._buckets: deque = deque(maxlen=_RATE_WINDOW_SECS + 1)
+        _registry[name] = self
+
+    # ----- hooks (cheap; called from the reader loop) -----
+
+    def attempt(self) -> None:
+        self.state = "connecting"
+        self._attempt_at = time.monotonic()
+
+    def connected(self) -> None:
+        now = time.monotonic()
+        self.state = "connected"
+        self.connects += 1
+        self.backoff = 0.0
+        if self._attempt_at is not None:
+            self.time_to_connect = round(now - self._attempt_at, 3)
+        self._connected_at = now
+        self.time_to_first_event = None
+
+    def chunk(self, nbytes: int, nevents: int) -> None:
+        now = time.monotonic()
+        self.bytes += nbytes
+        self._last_bytes_at = now
+        if nevents:
+            self.events += nevents
+            self._last_event_at = now
+            if self.time_to_first_event is None and self._connected_at is not None:
+                self.time_to_first_event = round(now - self._connected_at, 3)
+        sec = int(now)
+        b = self._buckets
+        if b and b[-1][0] == sec:
+            _, e0, n0 = b[-1]
+            b[-1] = (sec, e0 + nevents, n0 + nbytes)
+        else:
+            b.append((sec, nevents, nbytes))
+
+    def disconnected(self, reason: str) -> None:
+        self.state = "reconnecting"
+        self.reconnects += 1
+        self.reasons[reason] += 1
+        self.last_reason = reason
+
+    def backing_off(self, secs: float) -> None:
+        self.state = "backoff"
+        self.backoff = round(float(secs), 2)
+
+    def closed(self) -> None:
+        self.state = "closed"
+        if _registry.get(self.name) is self:
+            _registry.pop(self.name, None)
+
+    # ----- snapshot -----
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        horizon = int(now) - _RATE_WINDOW_SECS
+        ev = nb = 0
+        for sec, e, n in self._buckets:
+            if sec > horizon:
+                ev += e
+                nb += n
+        return {
+            "state": self.state,
+            "events": self.events,
+            "bytes": self.bytes,
+            "events_per_sec": round(ev / _RATE_WINDOW_SECS, 2),
+            "bytes_per_sec": round(nb / _RATE_WINDOW_SECS, 1),
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "reconnect_reasons": dict(self.reasons),
+            "last_reason": self.last_reason,
+            "time_to_connect": self.time_to_connect,
+            "time_to_first_event": self.time_to_first_event,
+            "secs_since_heartbeat": round(now - self._last_bytes_at, 1) if self._last_bytes_at is not None else None,
+            "secs_since_event": round(now - self._last_event_at, 1) if self._last_event_at is not None else None,
+            "connected_for": round(now - self._connected_at, 1) if self._connected_at is not None and self.state == "connected" else None,
+            "backoff": self.backoff,
+        }
+
+
+def telemetry_stats() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of all live SSE connections keyed by name."""
+    return {name: t.stats() for name, t in list(_registry.items())}
+
+
+# (snapshot key, module, stats function); imported per section so one failing
+# source only blanks its own entry
+_SNAPSHOT_SECTIONS = [
+    ("dispatchers", "awfl.consumer.dispatch", "dispatcher_stats"),
+    ("committers", "awfl.consumer.cursor_committer", "committer_stats"),
+    ("lanes", "awfl.consumer.lanes", "lanes_stats"),
+    ("cursor_journals", "awfl.consumer.cursor_journal", "journal_stats"),
+    ("ledgers", "awfl.response_handler.ledger", "ledger_stats"),
+    ("latency_ms", "awfl.events.latency", "latency_summary"),
+    ("commands", "awfl.response_handler.commands", "command_stats"),
+    ("tools", "awfl.response_handler.executor", "tool_stats"),
+    ("reads", "awfl.response_handler.file_reader", "reader_stats"),
+    ("writes", "awfl.response_handler.file_writer", "writer_stats"),
+    ("read_cache", "awfl.response_handler.read_cache", "read_cache_stats"),
+    ("http", "awfl.utils.http", "http_stats"),
+]
+
+
+def status_snapshot() -> Dict[str, Any]:
+    """Everything `status` prints about the consumer, as one JSON-able dict.
+
+    A section whose stats cannot be collected is recorded as
+    {"unavailable": "<error>"} instead of being dropped.
+    """
+    snap: Dict[str, Any] = {"time": time.time(), "connections": telemetry_stats()}
+    for key, module, fn in _SNAPSHOT_SECTIONS:
+        try:
+            snap[key] = getattr(importlib.import_module(module), fn)()
+        except Exception as e:
+            snap[key] = {"unavailable": str(e) or type(e).__name__}
+    return snap
+
+
+def snapshot_path() -> str:
+    return os.path.expanduser(
+        os.getenv("AWFL_STATUS_SNAPSHOT_PATH") or f"~/.awfl/status{_get_workflow_env_suffix()}.json"
+    )
+
+
+def write_status_snapshot(path: Optional[str] = None) -> str:
+    path = path or snapshot_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status_snapshot(), f, indent=2, default=str)
+    os.replace(tmp, path)
+    return path
+
+
+async def run_snapshot_writer(interval_secs: float = 5.0) -> None:
+    """Rewrite the status snapshot file periodically (headless mode)."""
+    path = snapshot_path()
+    log_unique(f"📊 Writing consumer status snapshots to {path} every {interval_secs:g}s")
+    while True:
+        try:
+            await asyncio.to_thread(write_status_snapshot, path)
+        except Exception as e:
+            log_unique(f"⚠️ Failed to write status snapshot: {e}")
+        await asyncio.sleep(max(0.5, interval_secs))
+
+
+__all__ = [
+    "ConnectionTelemetry",
+    "telemetry_stats",
+    "status_snapshot",
+    "write_status_snapshot",
+    "run_snapshot_writer",
+]
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from awfl.consumer import routing
+from awfl.consumer.capture import KIND_CONNECT, KIND_DATA, CaptureWriter, read_capture
+from awfl.consumer.replay import replay_capture
+
+
+def _frame(evt_id: int, obj: dict) -> bytes:
+    return f"id: {evt_id}\ndata: {json.dumps(obj)}\n\n".encode("utf-8")
+
+
+def _tool(name: str, args: str) -> dict:
+    return {"callback_id": f"cb-{name}", "tool_call": {"function": {"name": name, "arguments": args}}}
+
+
+class TestCaptureReplay(unittest.TestCase):
+    def _write(self, fmt: str) -> str:
+        td = tempfile.TemporaryDirectory()
+        self.addCleanup(td.cleanup)
+        path = os.path.join(td.name, f"cap.{fmt}")
+        w = CaptureWriter(path, fmt=fmt, scope="project")
+        w.connect(ws_id="ws1", resume_id=None)
+        stream = _frame(1, _tool("read_file", '{"filepath": "a"}')) + _frame(2, {"content": "hi"})
+        # Split mid-frame so replay has to reassemble across chunks
+        w.data(stream[:17])
+        w.data(stream[17:])
+        w.data(b": heartbeat\n\n")
+        w.connect(ws_id="ws1", resume_id="2")
+        w.data(b"data: {\"partial")  # torn by the reconnect; must be dropped
+        w.connect(ws_id="ws1", resume_id="2")
+        w.data(_frame(3, _tool("run_command", "{not json")))
+        w.close()
+        return path
+
+    def test_round_trip_both_formats(self):
+        for fmt in ("ndjson", "bin"):
+            with self.subTest(fmt=fmt):
+                recs = list(read_capture(self._write(fmt)))
+                self.assertEqual([k for _, k, _ in recs].count(KIND_CONNECT), 3)
+                data = b"".join(p for _, k, p in recs if k == KIND_DATA)
+                self.assertIn(b"id: 3", data)
+                self.assertTrue(all(t >= 0 for t, _, _ in recs))
+
+    def test_dry_run_counts_tools_without_executing(self):
+        for fmt in ("ndjson", "bin"):
+            with self.subTest(fmt=fmt):
+                real = mock.AsyncMock()
+                with mock.patch.object(routing, "handle_response", real):
+                    report = asyncio.run(replay_capture(self._write(fmt), speed=0, mode="execute"))
+                    self.assertIs(routing.handle_response, real)  # stub removed afterwards
+                real.assert_not_called()
+                self.assertEqual(report["events"], 3)
+                self.assertEqual(report["connections"], 3)
+                self.assertEqual(report["parse_errors"], 0)
+                self.assertEqual(report["tool_calls"], {"READ_FILE": 1, "RUN_COMMAND": 1})
+                self.assertEqual(report["bad_args"], 1)
+                self.assertGreater(report["events_per_sec"], 0)
+
+    def test_dry_run_leaves_live_routing_alone(self):
+        # Replays started from the prompt share the loop with the live consumers
+        real = mock.AsyncMock()
+        seen = []
+
+        def _log(ev):
+            seen.append(routing.handle_response is real)
+
+        with mock.patch.object(routing, "handle_response", real), mock.patch.object(routing, "process_event", _log):
+            asyncio.run(replay_capture(self._write("ndjson"), speed=0, mode="both"))
+            asyncio.run(routing.forward_event({"content": "live"}, mode="both"))
+            real.assert_awaited_once()
+        self.assertEqual(seen, [True] * 4)
+        quiet = []
+        with mock.patch.object(routing, "handle_response", real), mock.patch.object(routing, "process_event", quiet.append):
+            asyncio.run(replay_capture(self._write("ndjson"), speed=0, mode="both", quiet=True))
+        self.assertEqual(quiet, [])
+
+    def test_live_mode_forwards_to_handler(self):
+        real = mock.AsyncMock()
+        with mock.patch.object(routing, "handle_response", real):
+            report = asyncio.run(replay_capture(self._write("ndjson"), speed=0, mode="execute", dry_run=False))
+        self.assertEqual(real.await_count, 3)
+        self.assertNotIn("tool_calls", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from awfl.consumer import cursor_committer
+from awfl.consumer.cursor_committer import CursorCommitter
+from awfl.consumer.cursor_journal import CursorJournal
+
+
+class TestCursorCommitter(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.posts = []
+        self.fail = False
+
+        async def fake_update_cursor(_http, **kw):
+            self.posts.append(kw)
+            return not self.fail
+
+        patches = [
+            mock.patch.object(cursor_committer, "update_cursor", fake_update_cursor),
+            mock.patch("awfl.auth.get_auth_headers", lambda: {"X-Skip-Auth": "1"}),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    async def test_coalesces_to_latest_id_per_scope(self):
+        c = CursorCommitter(None, interval_secs=60, max_pending=1000)
+        for i in range(500):
+            c.record(event_id=str(i), project_id="p", workspace_id="w", scope="project")
+        c.record(event_id="s1", project_id="p", session_id="s", workspace_id="w2", scope="session")
+        self.assertEqual(await c.flush(), 2)
+        ids = sorted(p["event_id"] for p in self.posts)
+        self.assertEqual(ids, ["499", "s1"])
+        # Auth headers are resolved once per flush and passed through
+        self.assertTrue(all(p["headers"].get("X-Skip-Auth") == "1" for p in self.posts))
+        st = c.stats()
+        self.assertEqual(st["flushes"], 1)
+        self.assertEqual(st["commits"], 2)
+        self.assertEqual(st["pending"], 0)
+
+    async def test_failed_commit_is_retried_unless_superseded(self):
+        c = CursorCommitter(None, interval_secs=60)
+        c.record(event_id="1", project_id="p", scope="project")
+        self.fail = True
+        self.assertEqual(await c.flush(), 0)
+        self.assertEqual(c.pending, 1)
+        self.fail = False
+        c.record(event_id="2", project_id="p", scope="project")
+        await c.flush()
+        self.assertEqual(self.posts[-1]["event_id"], "2")
+        self.assertEqual(c.pending, 0)
+
+    async def test_count_threshold_and_close_flush(self):
+        c = CursorCommitter(None, interval_secs=60, max_pending=3)
+        c.start()
+        for i in range(3):
+            c.record(event_id=str(i), project_id="p", scope="project")
+        # Background task wakes on the count threshold
+        for _ in range(20):
+            if self.posts:
+                break
+            await cursor_committer.asyncio.sleep(0.01)
+        self.assertEqual([p["event_id"] for p in self.posts], ["2"])
+        c.record(event_id="3", project_id="p", scope="project")
+        await c.close()
+        self.assertEqual(self.posts[-1]["event_id"], "3")
+
+    async def test_flush_appends_to_journal(self):
+        with tempfile.TemporaryDirectory() as d:
+            journal = CursorJournal(os.path.join(d, "cursors.jsonl"))
+            c = CursorCommitter(None, interval_secs=60, journal=journal)
+            c.record(event_id="3", project_id="p", scope="project")
+            c.record(event_id="4", project_id="p", session_id="s", scope="session")
+            await c.flush()
+            self.assertEqual(journal.fsyncs, 1)
+            self.assertEqual(journal.get("p"), "3")
+            self.assertEqual(journal.get("p", "s"), "4")
+
+
+if __name__ == "__main__":
+    unittest.main()
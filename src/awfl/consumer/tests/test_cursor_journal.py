@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import unittest
+
+from awfl.consumer import cursor_journal
+from awfl.consumer.cursor_journal import CursorJournal
+
+
+class TestCursorJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "cursors.jsonl")
+
+    def test_append_and_reload(self):
+        j = CursorJournal(self.path)
+        self.assertEqual(j.append_many([("p", None, "5"), ("p", "s1", "7")]), 2)
+        self.assertEqual(j.fsyncs, 1)
+        # Torn trailing line from a crash mid-append is ignored
+        with open(self.path, "a") as f:
+            f.write('{"p": "p", "s": "", "e"')
+        fresh = CursorJournal(self.path)
+        self.assertEqual(fresh.get("p"), "5")
+        self.assertEqual(fresh.get("p", "s1"), "7")
+        self.assertIsNone(fresh.get("p", "other"))
+
+    def test_reload_never_moves_ordered_cursor_backwards(self):
+        with open(self.path, "w") as f:
+            for e in ("10", "12", "11"):
+                f.write(json.dumps({"p": "p", "s": "", "e": e}) + "\n")
+        self.assertEqual(CursorJournal(self.path).get("p"), "12")
+
+    def test_observe_remote_takes_max(self):
+        j = CursorJournal(self.path)
+        j.append_many([("p", None, "1700-5")])
+        self.assertEqual(j.observe_remote("p", None, "1700-3"), "1700-5")
+        self.assertEqual(j.observe_remote("p", None, "1700-9"), "1700-9")
+        self.assertEqual(CursorJournal(self.path).get("p"), "1700-9")
+        # Opaque ids cannot be ordered: the local position is kept
+        j.append_many([("q", None, "abc")])
+        self.assertEqual(j.observe_remote("q", None, "xyz"), "abc")
+
+    def test_compaction_keeps_latest(self):
+        old = cursor_journal._COMPACT_MIN_LINES
+        cursor_journal._COMPACT_MIN_LINES = 10
+        self.addCleanup(setattr, cursor_journal, "_COMPACT_MIN_LINES", old)
+        j = CursorJournal(self.path)
+        for i in range(25):
+            j.append_many([("p", None, str(i))])
+        self.assertGreaterEqual(j.compactions, 1)
+        with open(self.path) as f:
+            self.assertLess(len(f.readlines()), 10)
+        self.assertEqual(CursorJournal(self.path).get("p"), "24")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+from awfl.consumer.cursors import earliest_event_id, event_id_key
+
+
+class TestEventIdOrdering(unittest.TestCase):
+    def test_event_id_key(self):
+        self.assertEqual(event_id_key("42"), (42,))
+        self.assertEqual(event_id_key("1700000000000-3"), (1700000000000, 3))
+        self.assertIsNone(event_id_key(None))
+        self.assertIsNone(event_id_key("abc"))
+        self.assertLess(event_id_key("9"), event_id_key("10"))
+
+    def test_earliest_event_id(self):
+        self.assertEqual(earliest_event_id("1700-2", "1700-10", "1699-99"), "1699-99")
+        # Missing or opaque ids cannot be ordered
+        self.assertIsNone(earliest_event_id("5", None))
+        self.assertIsNone(earliest_event_id("5", "evt_abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import unittest
+
+from awfl.consumer.dispatch import EventDispatcher, dispatcher_stats
+
+
+class TestEventDispatcher(unittest.IsolatedAsyncioTestCase):
+    async def test_dispatches_in_order(self):
+        seen = []
+
+        async def handler(item):
+            await asyncio.sleep(0)
+            seen.append(item)
+
+        d = EventDispatcher(handler, maxsize=4, name="test-order")
+        d.start()
+        for i in range(10):
+            await d.put(i)
+        await d.join()
+        await d.close()
+        self.assertEqual(seen, list(range(10)))
+        self.assertEqual(d.dispatched, 10)
+
+    async def test_backpressure_blocks_reader_when_full(self):
+        gate = asyncio.Event()
+
+        async def handler(item):
+            await gate.wait()
+
+        d = EventDispatcher(handler, maxsize=2, name="test-bp")
+        d.start()
+        # First item is taken by the worker, next two fill the queue
+        await d.put(0)
+        await asyncio.sleep(0)
+        await d.put(1)
+        await d.put(2)
+        blocked = asyncio.create_task(d.put(3))
+        await asyncio.sleep(0.01)
+        self.assertFalse(blocked.done())
+        self.assertTrue(d.backpressured)
+        self.assertIn("test-bp", dispatcher_stats())
+
+        gate.set()
+        await blocked
+        await d.join()
+        st = d.stats()
+        self.assertEqual(st["depth"], 0)
+        self.assertEqual(st["high_water"], 2)
+        self.assertEqual(st["blocked_puts"], 1)
+        await d.close()
+        self.assertNotIn("test-bp", dispatcher_stats())
+
+    async def test_handler_errors_do_not_stop_worker(self):
+        seen = []
+
+        async def handler(item):
+            if item == 1:
+                raise ValueError("boom")
+            seen.append(item)
+
+        d = EventDispatcher(handler, maxsize=8, name="test-err")
+        d.start()
+        for i in range(3):
+            await d.put(i)
+        await d.join()
+        await d.close()
+        self.assertEqual(seen, [0, 2])
+        self.assertEqual(d.errors, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import asyncio
+import unittest
+
+from awfl.consumer.lanes import SessionLanes
+
+
+class TestSessionLanes(unittest.IsolatedAsyncioTestCase):
+    async def test_order_within_lane_and_concurrency_across_lanes(self):
+        seen = []
+        gate = asyncio.Event()
+
+        async def handler(item):
+            key, n = item
+            if key == "slow":
+                await gate.wait()
+            seen.append(item)
+
+        lanes = SessionLanes(handler, max_concurrency=4)
+        await lanes.submit("slow", ("slow", 0))
+        for n in range(3):
+            await lanes.submit("fast", ("fast", n))
+        # The fast lane finishes while the slow one is still blocked
+        for _ in range(50):
+            if len(seen) == 3:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(seen, [("fast", 0), ("fast", 1), ("fast", 2)])
+        gate.set()
+        await lanes.join()
+        self.assertEqual(seen[-1], ("slow", 0))
+        await lanes.close()
+
+    async def test_global_concurrency_cap(self):
+        async def handler(_item):
+            await asyncio.sleep(0.01)
+
+        lanes = SessionLanes(handler, max_concurrency=2)
+        for i in range(6):
+            await lanes.submit(f"s{i}", i)
+        await lanes.join()
+        st = lanes.stats()
+        self.assertEqual(st["completed"], 6)
+        self.assertLessEqual(st["peak_running"], 2)
+        await lanes.close()
+
+    async def test_watermark_waits_for_earlier_events(self):
+        advanced = []
+        gate = asyncio.Event()
+
+        async def handler(item):
+            if item == "a1":
+                await gate.wait()
+
+        lanes = SessionLanes(handler, on_advance=advanced.append)
+        await lanes.submit("a", "a1")
+        await lanes.submit("b", "b1")
+        await lanes.submit("b", "b2")
+        await asyncio.sleep(0.05)
+        # b1/b2 are done but a1 is not: the cursor must not move past it
+        self.assertEqual(advanced, [])
+        self.assertEqual(lanes.stats()["waiting_for_order"], 2)
+        gate.set()
+        await lanes.join()
+        self.assertEqual(advanced, ["b2"])
+        await lanes.close()
+
+    async def test_blocked_lane_keeps_order_state_compact(self):
+        advanced = []
+        gate = asyncio.Event()
+
+        async def handler(item):
+            if item == "slow":
+                await gate.wait()
+
+        lanes = SessionLanes(handler, on_advance=advanced.append, max_concurrency=4)
+        await lanes.submit("a", "slow")
+        for i in range(2000):
+            await lanes.submit(f"s{i % 50}", i)
+        while lanes.stats()["completed"] < 2000:
+            await asyncio.sleep(0.01)
+        st = lanes.stats()
+        self.assertEqual(st["waiting_for_order"], 2000)
+        # One run behind the blocked event, not 2000 held items
+        self.assertEqual(st["order_runs"], 1)
+        self.assertEqual(advanced, [])
+        gate.set()
+        await lanes.join()
+        self.assertEqual(advanced, [1999])
+        self.assertEqual((lanes.stats()["waiting_for_order"], lanes.stats()["order_runs"]), (0, 0))
+        await lanes.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+
+from awfl.consumer.sse_parser import SSEByteParser, SSEParser, read_spilled_data
+
+
+def _feed_in_chunks(stream: bytes, size: int, **kw) -> list:
+    parser = SSEByteParser(**kw)
+    out = []
+    for i in range(0, len(stream), size):
+        out.extend(parser.feed(stream[i : i + size]))
+    return out
+
+
+class TestSSEByteParser(unittest.TestCase):
+    STREAM = (
+        b"\xef\xbb\xbf: heartbeat\r\n"
+        b"id: 1\r\nevent: tool\r\ndata: {\"a\":\r\ndata:  1}\r\nretry: 10\r\n\r\n"
+        b"data:no-space\n\n"
+        b":comment\rdata\r\r"
+        b"id: 2\ndata: \xc3\xa9\n\n"
+        b"retry: soon\nid: bad\x00id\ndata: x\n\n"
+    )
+
+    def test_line_endings_and_fields_independent_of_chunking(self):
+        expected = [
+            {"id": "1", "event": "tool", "data": '{"a":\n 1}', "retry": 10},
+            {"id": "1", "event": "message", "data": "no-space", "retry": None},
+            {"id": "1", "event": "message", "data": "", "retry": None},
+            {"id": "2", "event": "message", "data": "é", "retry": None},
+            {"id": "2", "event": "message", "data": "x", "retry": None},
+        ]
+        for size in range(1, len(self.STREAM) + 1):
+            self.assertEqual(_feed_in_chunks(self.STREAM, size, initial_capacity=16), expected, size)
+
+    def test_events_without_data_are_not_dispatched(self):
+        parser = SSEByteParser()
+        self.assertEqual(parser.feed(b"id: 7\nevent: ping\n\n"), [])
+        self.assertEqual(parser.last_event_id, "7")
+
+    def test_large_data_line_spanning_many_chunks(self):
+        payload = b"y" * 300_000
+        stream = b"id: big\ndata: " + payload + b"\n\n"
+        out = _feed_in_chunks(stream, 4096, initial_capacity=1024, max_retained=2048)
+        self.assertEqual(len(out), 1)
+        self.assertEqual(out[0]["data"], payload.decode())
+
+    def test_matches_line_parser_for_typical_stream(self):
+        stream = "".join(f"id: {i}\ndata: {{\"n\": {i}}}\n\n" for i in range(50)).encode()
+        legacy = SSEParser()
+        expected = []
+        for line in stream.decode().splitlines(True):
+            evt = legacy.feed_line(line)
+            if evt is not None:
+                expected.append(evt)
+        got = _feed_in_chunks(stream, 37)
+        # The line parser keeps the trailing newline in data; payloads are otherwise identical
+        self.assertEqual([(e["id"], json.loads(e["data"])) for e in got], [(e["id"], json.loads(e["data"])) for e in expected])
+
+    def test_oversized_event_spills_to_file(self):
+        with tempfile.TemporaryDirectory() as d:
+            payload = json.dumps({"content": "z" * 50_000})
+            stream = ("id: 9\ndata: " + payload + "\ndata: tail\n\ndata: small\n\n").encode()
+            out = _feed_in_chunks(stream, 1000, initial_capacity=64, spill_threshold=10_000, spill_dir=d)
+            self.assertEqual(len(out), 2)
+            big, small = out
+            self.assertIsNone(big["data"])
+            self.assertEqual(big["data_size"], len(payload) + len("\ntail"))
+            self.assertEqual(read_spilled_data(big["data_file"]), payload + "\ntail")
+            self.assertFalse(os.path.exists(big["data_file"]))
+            self.assertEqual(small["data"], "small")
+            self.assertEqual(os.listdir(d), [])
+
+    def test_reset_discards_partial_spill(self):
+        with tempfile.TemporaryDirectory() as d:
+            parser = SSEByteParser(initial_capacity=64, spill_threshold=100, spill_dir=d)
+            parser.feed(b"data: " + b"q" * 500)
+            self.assertEqual(len(os.listdir(d)), 1)
+            parser.close()
+            self.assertEqual(os.listdir(d), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
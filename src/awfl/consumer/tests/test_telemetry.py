@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from awfl.consumer import telemetry
+from awfl.consumer.telemetry import ConnectionTelemetry, telemetry_stats, write_status_snapshot
+
+
+class TestConnectionTelemetry(unittest.TestCase):
+    def test_counters_rates_and_timings(self):
+        now = [1000.0]
+        with mock.patch.object(telemetry.time, "monotonic", lambda: now[0]):
+            t = ConnectionTelemetry("sse-test")
+            self.addCleanup(t.closed)
+            t.attempt()
+            now[0] += 0.25
+            t.connected()
+            now[0] += 0.5
+            t.chunk(100, 0)  # heartbeat only
+            now[0] += 0.5
+            t.chunk(400, 3)
+            now[0] += 2
+            st = t.stats()
+            self.assertEqual(st["time_to_connect"], 0.25)
+            self.assertEqual(st["time_to_first_event"], 1.0)
+            self.assertEqual(st["events"], 3)
+            self.assertEqual(st["bytes_per_sec"], 50.0)
+            self.assertEqual(st["secs_since_heartbeat"], 2.0)
+            t.disconnected("idle-stall")
+            t.backing_off(4)
+            st = t.stats()
+            self.assertEqual((st["state"], st["reconnects"], st["backoff"]), ("backoff", 1, 4.0))
+            self.assertEqual(st["reconnect_reasons"], {"idle-stall": 1})
+            self.assertIn("sse-test", telemetry_stats())
+
+    def test_snapshot_file(self):
+        t = ConnectionTelemetry("sse-snap")
+        self.addCleanup(t.closed)
+        with tempfile.TemporaryDirectory() as d:
+            path = write_status_snapshot(os.path.join(d, "status.json"))
+            with open(path) as f:
+                snap = json.load(f)
+        self.assertIn("sse-snap", snap["connections"])
+        self.assertIn("dispatchers", snap)
+
+    def test_failing_section_is_recorded_not_dropped(self):
+        from awfl.consumer import dispatch
+
+        with mock.patch.object(dispatch, "dispatcher_stats", side_effect=RuntimeError("boom")):
+            snap = telemetry.status_snapshot()
+        self.assertEqual(snap["dispatchers"], {"unavailable": "boom"})
+        # Sections after the failing one are still collected
+        self.assertIn("hits", snap["read_cache"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,5 @@
+# Local stand-in for the AWFL relay/API (python -m awfl.devrelay) for offline load testing
+from .server import RelayState, ProjectLog, make_app
+from .synthetic import SyntheticLoad
+
+__all__ = ["RelayState", "ProjectLog", "make_app", "SyntheticLoad"]
@@ -0,0 +1,67 @@
+import argparse
+
+from aiohttp import web
+
+from .server import RelayState, make_app, STATE_KEY
+from .synthetic import SyntheticLoad, DEFAULT_TOOLS
+
+# python -m awfl.devrelay [--port 8787] [--rate 50 --project-id loadtest ...]
+#
+# Point the CLI at it with:
+#   API_ORIGIN=http://127.0.0.1:8787 SKIP_AUTH=1 AWFL_PROJECT_ID=loadtest awfl
+
+
+def _parse(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(prog="python -m awfl.devrelay", description="Local stand-in relay for load testing")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8787)
+    p.add_argument("--prefix", default="", help='path prefix before /workflows (e.g. "/api")')
+    p.add_argument("--retention", type=int, default=50000, help="events kept per project for Last-Event-ID replay")
+    p.add_argument("--heartbeat", type=float, default=15.0, help="seconds between SSE keep-alive comments")
+    p.add_argument("--execute-delay", type=float, default=0.0, help="seconds /workflows/execute takes to answer")
+    p.add_argument("--lease-ms", type=int, default=45000, help="default consumer-lock lease")
+    p.add_argument("--project-id", default="loadtest", help="project receiving synthetic load")
+    p.add_argument("--rate", type=float, default=0.0, help="synthetic events per second (0 = none)")
+    p.add_argument("--sessions", type=int, default=1)
+    p.add_argument("--tools", default=",".join(DEFAULT_TOOLS), help="comma-separated tool mix")
+    p.add_argument("--tool-ratio", type=float, default=0.5, help="fraction of events that are tool calls")
+    p.add_argument("--payload-bytes", type=int, default=256)
+    p.add_argument("--duration", type=float, default=None, help="stop generating after N seconds")
+    p.add_argument("--total", type=int, default=None, help="stop generating after N events")
+    p.add_argument("--read-path", default="README.md")
+    p.add_argument("--write-dir", default=".awfl-loadtest")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    ns = _parse(argv)
+    state = RelayState(retention=ns.retention, heartbeat_secs=ns.heartbeat, default_lease_ms=ns.lease_ms, execute_delay_secs=ns.execute_delay)
+    state.ensure_project(ns.project_id)
+    app = make_app(state, prefix=ns.prefix)
+
+    if ns.rate > 0:
+        async def _start_load(app: web.Application) -> None:
+            st = app[STATE_KEY]
+            st.load = SyntheticLoad(
+                st,
+                ns.project_id,
+                rate=ns.rate,
+                sessions=ns.sessions,
+                tools=[t for t in ns.tools.split(",") if t.strip()],
+                tool_ratio=ns.tool_ratio,
+                payload_bytes=ns.payload_bytes,
+                duration_secs=ns.duration,
+                total=ns.total,
+                read_path=ns.read_path,
+                write_dir=ns.write_dir,
+            )
+            st.load.start()
+
+        app.on_startup.append(_start_load)
+
+    print(f"devrelay listening on http://{ns.host}:{ns.port}{ns.prefix} (stats: /_relay/stats)")
+    web.run_app(app, host=ns.host, port=ns.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
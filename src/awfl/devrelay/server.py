@@ -0,0 +1,515 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from awfl.events.latency import LatencyHistogram
+
+# In-process stand-in for the AWFL relay/API, for offline load testing.
+#
+# Implements the contracts the CLI talks to under get_api_origin():
+#   GET/POST /workflows/projects
+#   GET  /workflows/workspace/resolve      POST /workflows/workspace/register
+#   GET  /workflows/events/stream          (SSE, Last-Event-ID replay, heartbeats)
+#   GET/POST /workflows/events/cursors
+#   POST /workflows/projects/:id/consumer-lock/acquire|release   (leases)
+#   POST /workflows/callbacks/:id
+#   POST /workflows/execute                POST /workflows/exec/stop
+#   GET  /workflows/list
+# plus a small control surface under /_relay (stats, emit, load; see routes below).
+#
+# Everything lives in memory. Event ids are per-project integers, so the CLI's
+# cursor ordering (event_id_key) applies. Each project keeps the newest
+# `retention` frames, pre-encoded once, for Last-Event-ID replay; streams are
+# plain readers over that log woken on append, so catch-up and live tail
+# are the same code path. Auth headers are accepted and ignored.
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _json(data: Any, status: int = 200) -> web.Response:
+    return web.json_response(data, status=status)
+
+
+async def _body(request: web.Request) -> Dict[str, Any]:
+    try:
+        data = await request.json()
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+class ProjectLog:
+    """Bounded, id-addressable event log for one project."""
+
+    def __init__(self, retention: int):
+        # (event_id, session_id, frame bytes)
+        self.frames: Deque[Tuple[int, Optional[str], bytes]] = deque(maxlen=max(1, retention))
+        self.next_id = 1
+        # Replaced on every append; a reader grabs it before reading, then waits on it
+        self.changed = asyncio.Event()
+
+    def first_id(self) -> int:
+        return self.frames[0][0] if self.frames else self.next_id
+
+    def append(self, session_id: Optional[str], payload: Dict[str, Any]) -> int:
+        eid = self.next_id
+        self.next_id += 1
+        data = json.dumps(payload, separators=(",", ":"))
+        self.frames.append((eid, session_id, f"id: {eid}\ndata: {data}\n\n".encode("utf-8")))
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+        return eid
+
+    def read_after(self, last_id: int, session_id: Optional[str], limit: int = 512) -> Tuple[List[bytes], int]:
+        """Frames with id > last_id (optionally for one session) and the new high-water id."""
+        if not self.frames or last_id >= self.next_id - 1:
+            return [], last_id
+        start = max(0, last_id + 1 - self.first_id())
+        out: List[bytes] = []
+        hw = last_id
+        for i in range(start, len(self.frames)):
+            eid, sid, frame = self.frames[i]
+            hw = eid
+            if session_id is None or sid == session_id:
+                out.append(frame)
+                if len(out) >= limit:
+                    break
+        return out, hw
+
+
+class RelayState:
+    def __init__(
+        self,
+        *,
+        retention: int = 50000,
+        heartbeat_secs: float = 15.0,
+        default_lease_ms: int = 45000,
+        execute_delay_secs: float = 0.0,
+    ):
+        self.retention = retention
+        self.heartbeat_secs = heartbeat_secs
+        self.default_lease_ms = default_lease_ms
+        # The real execute call is synchronous server-side; simulate its latency
+        self.execute_delay_secs = execute_delay_secs
+        self.projects: Dict[str, Dict[str, Any]] = {}
+        self.workspaces: Dict[str, Dict[str, Any]] = {}
+        self.logs: Dict[str, ProjectLog] = {}
+        # cursors[(project_id, session_id or None)] = {"eventId", "timestamp"}
+        self.cursors: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+        self.locks: Dict[str, Dict[str, Any]] = {}
+        # callback_id -> emit time (monotonic) for outstanding tool calls
+        self.pending_callbacks: Dict[str, Tuple[float, str]] = {}
+        self.callback_latency = LatencyHistogram()
+        self.callbacks_by_tool: Counter = Counter()
+        self.callback_errors = 0
+        self.unknown_callbacks = 0
+        self.progress_callbacks = 0
+        self.events_emitted = 0
+        self.streams_open = 0
+        self.streams_total = 0
+        self.lock_conflicts = 0
+        self.executions: Dict[str, Dict[str, Any]] = {}
+        self.load = None  # SyntheticLoad, when running
+        # Bumped by drop_streams(); open streams end when it no longer matches theirs
+        self.stream_generation = 0
+
+    # ----- projects / workspaces -----
+
+    def ensure_project(self, project_id: str, **fields) -> Dict[str, Any]:
+        proj = self.projects.get(project_id)
+        if proj is None:
+            proj = {"id": project_id, "name": fields.get("name") or project_id, "remote": fields.get("remote") or "", "live": bool(fields.get("live"))}
+            self.projects[project_id] = proj
+        return proj
+
+    def log_for(self, project_id: str) -> ProjectLog:
+        log = self.logs.get(project_id)
+        if log is None:
+            self.ensure_project(project_id)
+            log = self.logs[project_id] = ProjectLog(self.retention)
+        return log
+
+    def register_workspace(self, project_id: str, session_id: Optional[str]) -> Dict[str, Any]:
+        self.ensure_project(project_id)
+        for ws in self.workspaces.values():
+            if ws["projectId"] == project_id and ws.get("sessionId") == session_id:
+                return ws
+        ws = {"id": f"ws-{uuid.uuid4().hex[:12]}", "projectId": project_id, "sessionId": session_id}
+        self.workspaces[ws["id"]] = ws
+        return ws
+
+    # ----- events -----
+
+    def emit(self, project_id: str, session_id: Optional[str], payload: Dict[str, Any]) -> int:
+        """Append one event and wake the project's streams."""
+        payload = dict(payload)
+        payload.setdefault("create_time", _now_iso())
+        if session_id:
+            attrs = dict(payload.get("attributes") or {})
+            attrs.setdefault("sessionId", session_id)
+            payload["attributes"] = attrs
+        cb = payload.get("callback_id")
+        if cb and payload.get("tool_call"):
+            fn = (payload["tool_call"] or {}).get("function") or {}
+            self.pending_callbacks[str(cb)] = (time.monotonic(), str(fn.get("name") or "").upper())
+        log = self.log_for(project_id)
+        eid = log.append(session_id, payload)
+        self.events_emitted += 1
+        return eid
+
+    def drop_streams(self) -> None:
+        """End every open event stream (clients see a clean EOF and reconnect)."""
+        self.stream_generation += 1
+        for log in self.logs.values():
+            changed, log.changed = log.changed, asyncio.Event()
+            changed.set()
+
+    # ----- leases -----
+
+    def acquire(self, project_id: str, consumer_id: str, consumer_type: str, lease_ms: int, token: Optional[str]) -> Tuple[int, Dict[str, Any]]:
+        now = time.time() * 1000
+        lock = self.locks.get(project_id)
+        if lock and lock["expiresAt"] > now:
+            same = lock["consumerId"] == consumer_id or (token and token == lock["token"])
+            if not same:
+                self.lock_conflicts += 1
+                holder = {k: lock[k] for k in ("consumerId", "consumerType", "expiresAt")}
+                return 409, {"ok": False, "conflict": True, "holder": holder, "msRemaining": int(lock["expiresAt"] - now)}
+            lock["expiresAt"] = now + lease_ms
+            lock["leaseMs"] = lease_ms
+            return 200, {"ok": True, "refreshed": True, "lock": dict(lock)}
+        lock = {
+            "id": f"lock-{uuid.uuid4().hex[:12]}",
+            "projectId": project_id,
+            "consumerId": consumer_id,
+            "consumerType": consumer_type,
+            "token": token or uuid.uuid4().hex,
+            "acquiredAt": now,
+            "expiresAt": now + lease_ms,
+            "leaseMs": lease_ms,
+        }
+        self.locks[project_id] = lock
+        return 200, {"ok": True, "lock": dict(lock)}
+
+    def release(self, project_id: str, consumer_id: str, force: bool, token: Optional[str]) -> Tuple[int, Dict[str, Any]]:
+        now = time.time() * 1000
+        lock = self.locks.get(project_id)
+        if not lock or lock["expiresAt"] <= now:
+            self.locks.pop(project_id, None)
+            return 200, {"ok": True, "released": False}
+        if force or lock["consumerId"] == consumer_id or (token and token == lock["token"]):
+            self.locks.pop(project_id, None)
+            return 200, {"ok": True, "released": True}
+        self.lock_conflicts += 1
+        return 409, {"ok": False, "conflict": True, "holder": {"consumerId": lock["consumerId"]}}
+
+    # ----- stats -----
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time() * 1000
+        return {
+            "projects": len(self.projects),
+            "workspaces": len(self.workspaces),
+            "events_emitted": self.events_emitted,
+            "streams_open": self.streams_open,
+            "streams_total": self.streams_total,
+            "callbacks": self.callback_latency.n,
+            "callbacks_by_tool": dict(self.callbacks_by_tool),
+            "callback_errors": self.callback_errors,
+            "unknown_callbacks": self.unknown_callbacks,
+            "progress_callbacks": self.progress_callbacks,
+            "pending_callbacks": len(self.pending_callbacks),
+            "callback_latency_ms": self.callback_latency.summary(),
+            "locks": {pid: {"consumerId": l["consumerId"], "msRemaining": int(l["expiresAt"] - now)} for pid, l in self.locks.items() if l["expiresAt"] > now},
+            "lock_conflicts": self.lock_conflicts,
+            "cursors": {f"{p}:{s or '*'}": c.get("eventId") for (p, s), c in self.cursors.items()},
+            "executions": len(self.executions),
+            "load": self.load.stats() if self.load is not None else None,
+        }
+
+
+# ----- handlers -----
+
+STATE_KEY = web.AppKey("relay_state", RelayState) if hasattr(web, "AppKey") else "relay_state"
+
+
+def _state(request: web.Request) -> RelayState:
+    return request.app[STATE_KEY]
+
+
+async def list_projects(request: web.Request) -> web.Response:
+    return _json({"projects": list(_state(request).projects.values())})
+
+
+async def create_project(request: web.Request) -> web.Response:
+    body = await _body(request)
+    pid = f"proj-{uuid.uuid4().hex[:10]}"
+    proj = _state(request).ensure_project(pid, name=body.get("name"), remote=body.get("remote"), live=body.get("live"))
+    return _json({"project": proj}, status=201)
+
+
+async def resolve_workspace(request: web.Request) -> web.Response:
+    st = _state(request)
+    pid = request.query.get("projectId")
+    sid = request.query.get("sessionId") or None
+    if not pid:
+        return _json({"error": "projectId required"}, status=400)
+    project_ws = None
+    for ws in st.workspaces.values():
+        if ws["projectId"] != pid:
+            continue
+        if sid and ws.get("sessionId") == sid:
+            return _json({"workspace": ws})
+        if not ws.get("sessionId"):
+            project_ws = ws
+    if project_ws is not None:
+        return _json({"workspace": project_ws})
+    return _json({"error": "not found"}, status=404)
+
+
+async def register_workspace(request: web.Request) -> web.Response:
+    body = await _body(request)
+    pid = body.get("projectId")
+    if not pid:
+        return _json({"error": "projectId required"}, status=400)
+    ws = _state(request).register_workspace(str(pid), body.get("sessionId") or None)
+    return _json({"workspace": ws})
+
+
+async def get_cursors(request: web.Request) -> web.Response:
+    st = _state(request)
+    pid = request.query.get("projectId")
+    sid = request.query.get("sessionId") or None
+    ws = st.workspaces.get(request.query.get("workspaceId") or "")
+    if not pid and ws:
+        pid = ws["projectId"]
+        sid = sid or ws.get("sessionId")
+    if not pid:
+        return _json({"error": "projectId or workspaceId required"}, status=400)
+    return _json(
+        {
+            "projectId": pid,
+            "sessionId": sid,
+            "project": st.cursors.get((pid, None)),
+            "session": st.cursors.get((pid, sid)) if sid else None,
+        }
+    )
+
+
+async def post_cursor(request: web.Request) -> web.Response:
+    st = _state(request)
+    body = await _body(request)
+    eid = body.get("eventId")
+    pid = body.get("projectId")
+    sid = body.get("sessionId") or None
+    ws = st.workspaces.get(body.get("workspaceId") or "")
+    if not pid and ws:
+        pid = ws["projectId"]
+        sid = sid or ws.get("sessionId")
+    if not eid or not pid:
+        return _json({"error": "eventId and projectId/workspaceId required"}, status=400)
+    target = body.get("target") or ("session" if sid else "project")
+    doc = {"eventId": str(eid), "timestamp": body.get("timestamp")}
+    if target in ("project", "both"):
+        st.cursors[(pid, None)] = doc
+    if target in ("session", "both") and sid:
+        st.cursors[(pid, sid)] = doc
+    return _json({"ok": True})
+
+
+def _consumer(request: web.Request, body: Dict[str, Any]) -> Tuple[str, str, Optional[str]]:
+    cid = body.get("consumerId") or request.headers.get("x-consumer-id") or "anonymous"
+    ctype = body.get("consumerType") or request.headers.get("x-consumer-type") or "LOCAL"
+    token = body.get("lockToken") or request.headers.get("x-lock-token")
+    return str(cid), str(ctype), token
+
+
+async def acquire_lock(request: web.Request) -> web.Response:
+    st = _state(request)
+    body = await _body(request)
+    cid, ctype, token = _consumer(request, body)
+    try:
+        lease_ms = int(body.get("leaseMs") or request.headers.get("x-lock-lease-ms") or st.default_lease_ms)
+    except Exception:
+        lease_ms = st.default_lease_ms
+    status, data = st.acquire(request.match_info["project_id"], cid, ctype, max(1000, lease_ms), token)
+    return _json(data, status=status)
+
+
+async def release_lock(request: web.Request) -> web.Response:
+    st = _state(request)
+    body = await _body(request)
+    cid, _, token = _consumer(request, body)
+    force = bool(body.get("force")) or request.headers.get("x-lock-force") == "1"
+    status, data = st.release(request.match_info["project_id"], cid, force, token)
+    return _json(data, status=status)
+
+
+async def post_callback(request: web.Request) -> web.Response:
+    st = _state(request)
+    cb = request.match_info["callback_id"]
+    body = await _body(request)
+    if body.get("progress"):
+        # Streaming RUN_COMMAND updates; the final result follows on the same id
+        st.progress_callbacks += 1
+        return _json({"ok": True})
+    pending = st.pending_callbacks.pop(cb, None)
+    if pending is None:
+        st.unknown_callbacks += 1
+    else:
+        emitted, tool = pending
+        st.callback_latency.record((time.monotonic() - emitted) * 1000.0)
+        st.callbacks_by_tool[tool or "-"] += 1
+    if body.get("error"):
+        st.callback_errors += 1
+    return _json({"ok": True})
+
+
+async def execute(request: web.Request) -> web.Response:
+    st = _state(request)
+    body = await _body(request)
+    params = body.get("params") if isinstance(body.get("params"), dict) else {}
+    wf = str(body.get("workflowName") or "workflow")
+    exec_id = uuid.uuid4().hex
+    name = f"projects/devrelay/locations/local/workflows/{wf}/executions/{exec_id}"
+    st.executions[exec_id] = {"name": name, "workflow": wf, "params": params, "stopped": False}
+    if st.execute_delay_secs > 0:
+        await asyncio.sleep(st.execute_delay_secs)
+    pid = request.headers.get("x-project-id")
+    sid = params.get("sessionId")
+    if pid and sid:
+        # A minimal synthetic turn so the interactive CLI sees a reply
+        query = str(params.get("query") or "")
+        st.emit(pid, sid, {"content": "Workflow status: Running"})
+        st.emit(pid, sid, {"content": f"(devrelay) {query[:200]}"})
+        st.emit(pid, sid, {"content": "Workflow status: Done"})
+    return _json({"executionName": name})
+
+
+async def stop_execution(request: web.Request) -> web.Response:
+    st = _state(request)
+    body = await _body(request)
+    ex = st.executions.get(str(body.get("execId") or ""))
+    if ex is not None:
+        ex["stopped"] = True
+    return _json({"ok": True, "stopped": ex is not None})
+
+
+async def list_workflows(request: web.Request) -> web.Response:
+    return _json({"workflows": []})
+
+
+async def event_stream(request: web.Request) -> web.StreamResponse:
+    st = _state(request)
+    ws = st.workspaces.get(request.query.get("workspaceId") or "")
+    if ws is None:
+        return _json({"error": "unknown workspace"}, status=404)
+    log = st.log_for(ws["projectId"])
+    session_id = ws.get("sessionId")
+    try:
+        last_id = int(request.headers.get("Last-Event-ID") or 0)
+    except ValueError:
+        last_id = 0
+
+    resp = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await resp.prepare(request)
+    st.streams_open += 1
+    st.streams_total += 1
+    generation = st.stream_generation
+    try:
+        while generation == st.stream_generation:
+            changed = log.changed
+            frames, last_id = log.read_after(last_id, session_id)
+            if frames:
+                await resp.write(b"".join(frames))
+                continue
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=st.heartbeat_secs)
+            except asyncio.TimeoutError:
+                await resp.write(b": ping\n\n")
+    except (ConnectionResetError, asyncio.CancelledError):
+        pass
+    finally:
+        st.streams_open -= 1
+    return resp
+
+
+# ----- control surface -----
+
+async def relay_stats(request: web.Request) -> web.Response:
+    return _json(_state(request).stats())
+
+
+async def relay_emit(request: web.Request) -> web.Response:
+    """POST /_relay/emit {projectId, sessionId?, event: {...}} -> {id}"""
+    body = await _body(request)
+    pid = body.get("projectId")
+    evt = body.get("event")
+    if not pid or not isinstance(evt, dict):
+        return _json({"error": "projectId and event required"}, status=400)
+    eid = _state(request).emit(str(pid), body.get("sessionId") or None, evt)
+    return _json({"id": eid})
+
+
+async def relay_load(request: web.Request) -> web.Response:
+    """POST /_relay/load {projectId, rate, sessions, ...} starts (rate 0 stops) synthetic load."""
+    from .synthetic import SyntheticLoad
+
+    st = _state(request)
+    body = await _body(request)
+    if st.load is not None:
+        await st.load.stop()
+        st.load = None
+    rate = float(body.get("rate") or 0)
+    if rate > 0:
+        if not body.get("projectId"):
+            return _json({"error": "projectId required"}, status=400)
+        st.load = SyntheticLoad.from_options(st, body)
+        st.load.start()
+    return _json({"ok": True, "load": st.load.stats() if st.load is not None else None})
+
+
+def make_app(state: Optional[RelayState] = None, *, prefix: str = "") -> web.Application:
+    """aiohttp app serving the relay contracts under {prefix}/workflows/... (prefix e.g. "/api")."""
+    app = web.Application()
+    app[STATE_KEY] = state or RelayState()
+    p = prefix.rstrip("/")
+    app.add_routes(
+        [
+            web.get(f"{p}/workflows/projects", list_projects),
+            web.post(f"{p}/workflows/projects", create_project),
+            web.get(f"{p}/workflows/workspace/resolve", resolve_workspace),
+            web.post(f"{p}/workflows/workspace/register", register_workspace),
+            web.get(f"{p}/workflows/events/stream", event_stream),
+            web.get(f"{p}/workflows/events/cursors", get_cursors),
+            web.post(f"{p}/workflows/events/cursors", post_cursor),
+            web.post(f"{p}/workflows/projects/{{project_id}}/consumer-lock/acquire", acquire_lock),
+            web.post(f"{p}/workflows/projects/{{project_id}}/consumer-lock/release", release_lock),
+            web.post(f"{p}/workflows/callbacks/{{callback_id}}", post_callback),
+            web.post(f"{p}/workflows/execute", execute),
+            web.post(f"{p}/workflows/exec/stop", stop_execution),
+            web.get(f"{p}/workflows/list", list_workflows),
+            web.get("/_relay/stats", relay_stats),
+            web.post("/_relay/emit", relay_emit),
+            web.post("/_relay/load", relay_load),
+        ]
+    )
+
+    async def _stop_load(app: web.Application) -> None:
+        st = app[STATE_KEY]
+        if st.load is not None:
+            await st.load.stop()
+
+    app.on_shutdown.append(_stop_load)
+    return app
+
+
+__all__ = ["RelayState", "ProjectLog", "make_app", "STATE_KEY"]
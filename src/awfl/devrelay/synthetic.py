@@ -0,0 +1,175 @@
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+# Synthetic event streams for the stand-in relay.
+#
+# Emits a mix of tool calls and plain content events into one project at a
+# steady rate, spread round-robin over N sessions. Tool calls default to cheap,
+# read-only work (READ_FILE of an existing file, RUN_COMMAND echo) so a load run
+# does not modify the checkout; UPDATE_FILE only ever targets files under
+# `write_dir` (default .awfl-loadtest/). Content events carry `payload_bytes`
+# of filler so frame size can be swept independently of rate.
+#
+# Pacing is a simple token bucket ticked every 10ms, so rates of several
+# thousand events/s are emitted in batches instead of one sleep per event.
+
+DEFAULT_TOOLS = ("READ_FILE", "RUN_COMMAND")
+_TICK_SECS = 0.01
+
+
+def _tool_args(tool: str, n: int, *, read_path: str, write_dir: str, payload_bytes: int) -> Dict[str, Any]:
+    if tool == "READ_FILE":
+        return {"filepath": read_path}
+    if tool == "RUN_COMMAND":
+        return {"command": f"echo devrelay-{n}"}
+    if tool == "UPDATE_FILE":
+        return {"filepath": f"{write_dir.rstrip('/')}/file-{n % 64}.txt", "content": "x" * max(1, payload_bytes) + "\n"}
+    return {}
+
+
+class SyntheticLoad:
+    def __init__(
+        self,
+        state,
+        project_id: str,
+        *,
+        rate: float,
+        sessions: int = 1,
+        tools: Sequence[str] = DEFAULT_TOOLS,
+        tool_ratio: float = 0.5,
+        payload_bytes: int = 256,
+        duration_secs: Optional[float] = None,
+        total: Optional[int] = None,
+        read_path: str = "README.md",
+        write_dir: str = ".awfl-loadtest",
+        seed: Optional[int] = None,
+    ):
+        self.state = state
+        self.project_id = project_id
+        self.rate = max(0.0, float(rate))
+        self.session_ids: List[str] = [f"load-{i}" for i in range(max(1, int(sessions)))]
+        self.tools = [t.upper() for t in tools] or list(DEFAULT_TOOLS)
+        self.tool_ratio = min(1.0, max(0.0, float(tool_ratio)))
+        self.payload_bytes = max(0, int(payload_bytes))
+        self.duration_secs = duration_secs
+        self.total = total
+        self.read_path = read_path
+        self.write_dir = write_dir
+        self._rng = random.Random(seed)
+        self._filler = "x" * self.payload_bytes
+        self._task: Optional[asyncio.Task] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._tool_seq = 0
+        self.emitted = 0
+        self.by_tool: Counter = Counter()
+
+    @classmethod
+    def from_options(cls, state, opts: Dict[str, Any]) -> "SyntheticLoad":
+        tools = opts.get("tools") or DEFAULT_TOOLS
+        if isinstance(tools, str):
+            tools = [t for t in tools.split(",") if t.strip()]
+        return cls(
+            state,
+            str(opts["projectId"]),
+            rate=float(opts.get("rate") or 0),
+            sessions=int(opts.get("sessions") or 1),
+            tools=tools,
+            tool_ratio=float(opts.get("toolRatio", 0.5)),
+            payload_bytes=int(opts.get("payloadBytes", 256)),
+            duration_secs=float(opts["durationSecs"]) if opts.get("durationSecs") else None,
+            total=int(opts["total"]) if opts.get("total") else None,
+            read_path=str(opts.get("readPath") or "README.md"),
+            write_dir=str(opts.get("writeDir") or ".awfl-loadtest"),
+            seed=opts.get("seed"),
+        )
+
+    def event(self, n: int) -> Dict[str, Any]:
+        """The n-th synthetic event payload (without session attributes)."""
+        if self.tools and self._rng.random() < self.tool_ratio:
+            tool = self.tools[self._tool_seq % len(self.tools)]
+            self._tool_seq += 1
+            args = _tool_args(tool, n, read_path=self.read_path, write_dir=self.write_dir, payload_bytes=self.payload_bytes)
+            return {
+                "callback_id": f"cb-{uuid.uuid4().hex}",
+                "tool_call": {
+                    "id": f"call-{n}",
+                    "type": "function",
+                    "function": {"name": tool.lower(), "arguments": json.dumps(args)},
+                },
+                "background": False,
+            }
+        return {"content": f"synthetic #{n} {self._filler}", "background": False}
+
+    def emit_one(self) -> None:
+        n = self.emitted
+        sid = self.session_ids[n % len(self.session_ids)]
+        payload = self.event(n)
+        self.state.emit(self.project_id, sid, payload)
+        self.emitted += 1
+        self.by_tool[(payload.get("tool_call") or {}).get("function", {}).get("name", "").upper() or "content"] += 1
+
+    async def run(self) -> None:
+        self._started_at = time.monotonic()
+        try:
+            await self._run()
+        finally:
+            self._finished_at = time.monotonic()
+
+    async def _run(self) -> None:
+        budget = 0.0
+        last = self._started_at
+        while True:
+            now = time.monotonic()
+            if self.duration_secs is not None and now - self._started_at >= self.duration_secs:
+                break
+            budget += (now - last) * self.rate
+            last = now
+            while budget >= 1.0:
+                if self.total is not None and self.emitted >= self.total:
+                    return
+                self.emit_one()
+                budget -= 1.0
+            if self.total is not None and self.emitted >= self.total:
+                return
+            await asyncio.sleep(_TICK_SECS)
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run(), name="devrelay-load")
+        return self._task
+
+    async def stop(self) -> None:
+        t = self._task
+        if t is not None and not t.done():
+            t.cancel()
+            try:
+                await t
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def done(self) -> bool:
+        return self._task is not None and self._task.done()
+
+    def stats(self) -> Dict[str, Any]:
+        end = self._finished_at if self._finished_at is not None else time.monotonic()
+        elapsed = end - self._started_at if self._started_at is not None else 0.0
+        return {
+            "project_id": self.project_id,
+            "rate": self.rate,
+            "sessions": len(self.session_ids),
+            "emitted": self.emitted,
+            "by_tool": dict(self.by_tool),
+            "elapsed_secs": round(elapsed, 2),
+            "actual_rate": round(self.emitted / elapsed, 1) if elapsed > 0 else None,
+            "running": self._task is not None and not self._task.done(),
+        }
+
+
+__all__ = ["SyntheticLoad", "DEFAULT_TOOLS"]
@@ -0,0 +1,191 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+import aiohttp
+from aiohttp.test_utils import TestServer
+
+from awfl.consumer.cursors import get_resume_event_id, update_cursor
+from awfl.consumer.leader_lock import acquire_lock, release_lock
+from awfl.consumer.sse_parser import SSEByteParser
+from awfl.devrelay import RelayState, SyntheticLoad, make_app
+from awfl.events.workspace import get_or_create_workspace
+from awfl.utils.http import close_http_session
+
+
+class TestDevRelay(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.state = RelayState(heartbeat_secs=0.2)
+        self.server = TestServer(make_app(self.state))
+        await self.server.start_server()
+        origin = str(self.server.make_url("")).rstrip("/")
+        env = mock.patch.dict(os.environ, {"API_ORIGIN": origin, "SKIP_AUTH": "1"})
+        env.start()
+        self.addCleanup(env.stop)
+        self.http = aiohttp.ClientSession()
+
+    async def asyncTearDown(self):
+        await self.http.close()
+        await close_http_session()
+        await self.server.close()
+
+    async def _read_events(self, ws_id: str, n: int, last_id=None):
+        headers = {"Last-Event-ID": str(last_id)} if last_id else {}
+        parser = SSEByteParser()
+        out = []
+        async with self.http.get(self.server.make_url("/workflows/events/stream"), params={"workspaceId": ws_id}, headers=headers) as resp:
+            self.assertEqual(resp.status, 200)
+            async for chunk in resp.content.iter_chunked(4096):
+                out.extend(parser.feed(chunk))
+                if len(out) >= n:
+                    break
+        return out
+
+    async def test_workspaces_cursors_and_replay(self):
+        proj_ws = await get_or_create_workspace(self.http, "p1")
+        sess_ws = await get_or_create_workspace(self.http, "p1", session_id="s1")
+        self.assertNotEqual(proj_ws, sess_ws)
+        self.assertEqual(await get_or_create_workspace(self.http, "p1"), proj_ws)
+
+        for i in range(4):
+            self.state.emit("p1", "s1" if i % 2 else "s2", {"content": f"m{i}"})
+        evts = await self._read_events(proj_ws, 4)
+        self.assertEqual([e["id"] for e in evts], ["1", "2", "3", "4"])
+        # Session workspaces only see their session; Last-Event-ID resumes after the cursor
+        evts = await self._read_events(sess_ws, 1, last_id=2)
+        self.assertEqual([e["id"] for e in evts], ["4"])
+
+        self.assertTrue(await update_cursor(self.http, event_id="3", project_id="p1", scope="project"))
+        self.assertTrue(await update_cursor(self.http, event_id="2", project_id="p1", session_id="s1", scope="session"))
+        self.assertEqual(await get_resume_event_id(self.http, project_id="p1"), "3")
+        self.assertEqual(await get_resume_event_id(self.http, project_id="p1", session_id="s1"), "2")
+        self.assertEqual(await get_resume_event_id(self.http, workspace_id=proj_ws), "3")
+
+    async def test_stream_wakes_on_emit_and_sends_heartbeats(self):
+        ws = await get_or_create_workspace(self.http, "p1")
+        reader = asyncio.create_task(self._read_events(ws, 1))
+        await asyncio.sleep(0.5)  # at least one heartbeat first
+        self.state.emit("p1", None, {"content": "late"})
+        evts = await asyncio.wait_for(reader, 5)
+        self.assertIn("late", evts[0]["data"])
+
+    async def test_lease_semantics(self):
+        acquired, refreshed, conflict, data = await acquire_lock(self.http, project_id="p1", consumer_id="a", lease_ms=5000)
+        self.assertEqual((acquired, refreshed, conflict), (True, False, False))
+        token = data["lock"]["token"]
+        self.assertEqual((await acquire_lock(self.http, project_id="p1", consumer_id="a"))[:3], (False, True, False))
+        acquired, _, conflict, data = await acquire_lock(self.http, project_id="p1", consumer_id="b")
+        self.assertEqual((acquired, conflict), (False, True))
+        self.assertGreater(data["msRemaining"], 0)
+        # A pre-acquired token lets another consumer id take over the lease
+        with mock.patch.dict(os.environ, {"AWFL_PROJECT_LOCK_TOKEN": token}):
+            self.assertEqual((await acquire_lock(self.http, project_id="p1", consumer_id="c"))[:3], (False, True, False))
+        self.assertEqual((await release_lock(self.http, project_id="p1", consumer_id="b"))[:3], (False, False, True))
+        self.assertEqual((await release_lock(self.http, project_id="p1", consumer_id="a"))[:2], (True, True))
+        self.assertEqual((await release_lock(self.http, project_id="p1", consumer_id="a"))[:2], (True, False))
+        # Expired leases are free to take
+        self.state.acquire("p2", "a", "LOCAL", 1000, None)
+        self.state.locks["p2"]["expiresAt"] = 0
+        self.assertTrue((await acquire_lock(self.http, project_id="p2", consumer_id="b"))[0])
+
+    async def test_synthetic_load_and_callback_latency(self):
+        load = SyntheticLoad(self.state, "p1", rate=2000, sessions=3, tool_ratio=1.0, total=50, seed=1)
+        await asyncio.wait_for(load.start(), 5)
+        self.assertEqual(load.emitted, 50)
+        self.assertEqual(self.state.events_emitted, 50)
+        self.assertEqual(len(self.state.pending_callbacks), 50)
+        cb = next(iter(self.state.pending_callbacks))
+        async with self.http.post(self.server.make_url(f"/workflows/callbacks/{cb}"), json={"result": "ok"}) as resp:
+            self.assertEqual(resp.status, 200)
+        stats = self.state.stats()
+        self.assertEqual(stats["callbacks"], 1)
+        self.assertEqual(stats["pending_callbacks"], 49)
+        self.assertEqual(sum(load.stats()["by_tool"].values()), 50)
+
+    async def test_cli_consumer_end_to_end(self):
+        from awfl.consumer import consume_events_sse
+
+        env = {
+            "AWFL_PROJECT_ID": "p1",
+            "AWFL_LEDGER": "0",
+            "AWFL_CURSOR_JOURNAL": "0",
+            "AWFL_CURSOR_FLUSH_SECS": "0.05",
+        }
+        with mock.patch.dict(os.environ, env):
+            load = SyntheticLoad(self.state, "p1", rate=500, tools=["RUN_COMMAND"], tool_ratio=1.0, total=10)
+            consumer = asyncio.create_task(consume_events_sse(scope="project"))
+            try:
+                await asyncio.wait_for(load.start(), 5)
+                for _ in range(200):
+                    if self.state.callback_latency.n >= 10 and self.state.cursors.get(("p1", None), {}).get("eventId") == "10":
+                        break
+                    await asyncio.sleep(0.05)
+            finally:
+                consumer.cancel()
+                await asyncio.gather(consumer, return_exceptions=True)
+        stats = self.state.stats()
+        self.assertEqual(stats["callbacks_by_tool"], {"RUN_COMMAND": 10})
+        self.assertEqual(stats["cursors"]["p1:*"], "10")
+        self.assertEqual(stats["locks"], {})  # released on cancel
+
+    async def _consumer_with_long_command(self, env: dict, secs: int):
+        from awfl.consumer import consume_events_sse
+
+        env = {"AWFL_PROJECT_ID": "p1", "AWFL_LEDGER": "0", "AWFL_CURSOR_JOURNAL": "0", "AWFL_CURSOR_FLUSH_SECS": "0.05", **env}
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        consumer = asyncio.create_task(consume_events_sse(scope="project"))
+        self.state.emit("p1", "s-long", _tool_event("cb-long", "RUN_COMMAND", {"command": f"sleep {secs}"}))
+        for _ in range(100):
+            if self.state.stats()["streams_total"] and self.state.events_emitted and self.state.stats()["locks"]:
+                break
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.3)  # the command is running now
+        return consumer
+
+    async def test_cancel_during_reconnect_still_releases_lock(self):
+        consumer = await self._consumer_with_long_command({}, 3)
+        self.state.drop_streams()
+        await asyncio.sleep(0.5)  # consumer is between connections
+        consumer.cancel()
+        result = (await asyncio.gather(consumer, return_exceptions=True))[0]
+        self.assertEqual(result, "cancelled")
+        self.assertEqual(self.state.stats()["locks"], {})
+
+    async def test_reconnect_does_not_wait_for_running_lanes(self):
+        consumer = await self._consumer_with_long_command({}, 1)
+        try:
+            self.state.drop_streams()
+            self.state.emit("p1", "s-other", _tool_event("cb-read", "READ_FILE", {"filepath": __file__}))
+            for _ in range(30):
+                if self.state.callbacks_by_tool["READ_FILE"]:
+                    break
+                await asyncio.sleep(0.05)
+            # The other session ran while the long command was still going
+            self.assertEqual(self.state.callbacks_by_tool["READ_FILE"], 1)
+            self.assertIn("cb-long", self.state.pending_callbacks)
+            for _ in range(100):
+                if self.state.callbacks_by_tool["RUN_COMMAND"]:
+                    break
+                await asyncio.sleep(0.05)
+            # Long enough for a redelivered copy to run (and call back) if it were executed
+            await asyncio.sleep(1.5)
+        finally:
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+        # Redelivered after the reconnect but not executed twice (ledger is off here)
+        self.assertEqual(self.state.stats()["callbacks_by_tool"], {"READ_FILE": 1, "RUN_COMMAND": 1})
+        self.assertEqual(self.state.unknown_callbacks, 0)
+        self.assertGreaterEqual(self.state.streams_total, 2)
+
+
+def _tool_event(callback_id: str, name: str, args: dict) -> dict:
+    import json
+
+    return {"callback_id": callback_id, "tool_call": {"function": {"name": name, "arguments": json.dumps(args)}}}
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,2 +1,3 @@
 # events package for workspace-related helpers
 # Provides workspace resolution/registration utilities used by the SSE consumer.
+# Also hosts the parse-once Event model shared by the logger and executor (events.model).
@@ -0,0 +1,123 @@
+import math
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+# Same parser as the response handler's ts_to_ms; re-exported under the event-facing name
+from awfl.utils.timestamps import parse_timestamp as parse_create_time
+
+# End-to-end event latency spans.
+#
+# Stages, all in milliseconds:
+# - relay:    create_time (server emission) -> frame received by the SSE reader
+# - queue:    received -> handler start (dispatcher queue + session lane wait)
+# - tool:     handler start -> tool result ready
+# - callback: post_internal_callback duration
+# - total:    create_time -> callback delivered
+#
+# Each (stage, tool) pair owns a fixed log-scale histogram backed by an
+# array('L') of counts, so recording is one log() and one increment with no
+# per-sample allocation. Percentiles are read from the cumulative counts and are
+# accurate to one bucket (~10%). `perf events` prints them.
+
+STAGES = ("relay", "queue", "tool", "callback", "total")
+
+_MIN_MS = 0.1
+_GROWTH = 1.1
+_BUCKETS = 180  # 0.1ms * 1.1**179 ~= 2.5h; larger values land in the last bucket
+_LOG_GROWTH = math.log(_GROWTH)
+
+
+def _bucket(ms: float) -> int:
+    if ms <= _MIN_MS:
+        return 0
+    return min(_BUCKETS - 1, int(math.log(ms / _MIN_MS) / _LOG_GROWTH) + 1)
+
+
+def _upper_bound(idx: int) -> float:
+    return _MIN_MS * (_GROWTH ** idx)
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "n", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = array("L", bytes(array("L").itemsize * _BUCKETS))
+        self.n = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        if ms < 0:
+            ms = 0.0  # clock skew between server and client
+        self.counts[_bucket(ms)] += 1
+        self.n += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.n:
+            return None
+        target = max(1, math.ceil(self.n * p / 100.0))
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(_upper_bound(idx), self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        def r(v):
+            return round(v, 1) if v is not None else None
+
+        return {
+            "count": self.n,
+            "p50": r(self.percentile(50)),
+            "p95": r(self.percentile(95)),
+            "p99": r(self.percentile(99)),
+            "max": r(self.max_ms) if self.n else None,
+            "mean": r(self.total_ms / self.n) if self.n else None,
+        }
+
+
+_histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+
+
+def record_latency(stage: str, ms: float, tool: Optional[str] = None) -> None:
+    key = (stage, tool or "-")
+    h = _histograms.get(key)
+    if h is None:
+        h = _histograms[key] = LatencyHistogram()
+    h.record(ms)
+
+
+def since_ms(start_wall: Optional[float], end_wall: Optional[float] = None) -> Optional[float]:
+    """Milliseconds between two time.time() values (end defaults to now)."""
+    if start_wall is None:
+        return None
+    return ((end_wall if end_wall is not None else time.time()) - start_wall) * 1000.0
+
+
+def latency_summary() -> List[Dict[str, object]]:
+    """Rows of {stage, tool, count, p50, p95, p99, max, mean} in stage order."""
+    order = {s: i for i, s in enumerate(STAGES)}
+    rows = []
+    for (stage, tool), h in sorted(_histograms.items(), key=lambda kv: (order.get(kv[0][0], 99), kv[0][1])):
+        rows.append({"stage": stage, "tool": tool, **h.summary()})
+    return rows
+
+
+def reset_latency() -> None:
+    _histograms.clear()
+
+
+__all__ = [
+    "STAGES",
+    "LatencyHistogram",
+    "record_latency",
+    "since_ms",
+    "parse_create_time",
+    "latency_summary",
+    "reset_latency",
+]
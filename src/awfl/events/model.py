@@ -0,0 +1,123 @@
+from typing import Any, Dict, Optional
+
+from awfl.utils import json_loads
+
+from .latency import parse_create_time
+
+# Parse-once event model.
+#
+# The SSE consumer decodes each event payload once into an Event. The logger
+# (process_event) and the executor (handle_response) both read the same
+# instance, so the hot fields are looked up once and tool-call arguments are
+# decoded lazily, at most once, however many sinks look at them.
+
+_UNSET = object()
+
+
+def session_id_of(data: Dict[str, Any]) -> Optional[str]:
+    """Session an event belongs to: attributes.sessionId, payload.sessionId, then callback_session."""
+    try:
+        attrs = data.get("attributes") or {}
+        sid = attrs.get("sessionId") if isinstance(attrs, dict) else None
+        if sid:
+            return str(sid)
+        payload = data.get("payload") or {}
+        sid = payload.get("sessionId") if isinstance(payload, dict) else None
+        if sid:
+            return str(sid)
+        cb = data.get("callback_session") or data.get("callbackSession")
+        if cb:
+            return str(cb)
+    except Exception:
+        pass
+    return None
+
+
+class Event:
+    __slots__ = (
+        "raw",
+        "event_id",
+        "callback_id",
+        "create_time",
+        "workdir",
+        "tool_call",
+        "tool_name",
+        "args_raw",
+        "_args",
+        "_args_error",
+        "_session_id",
+        "received_at",
+        "_created_at",
+    )
+
+    def __init__(self, raw: Dict[str, Any], event_id: Optional[str] = None, received_at: Optional[float] = None):
+        self.raw = raw
+        self.event_id = event_id  # SSE frame id, when decoded by the consumer
+        self.received_at = received_at  # time.time() when the SSE reader completed the frame
+        get = raw.get
+        self.callback_id = get("callback_id")
+        self.create_time = get("create_time")
+        self.workdir = get("workdir")
+        tc = get("tool_call")
+        self.tool_call = tc
+        if tc:
+            fn = (tc if isinstance(tc, dict) else {}).get("function", {}) or {}
+            self.tool_name = (fn.get("name") or "").upper()
+            self.args_raw = fn.get("arguments") or "{}"
+        else:
+            self.tool_name = ""
+            self.args_raw = None
+        self._args = _UNSET
+        self._args_error: Optional[Exception] = None
+        self._session_id = _UNSET
+        self._created_at = _UNSET
+
+    @classmethod
+    def coerce(cls, data: Any) -> "Event":
+        """Return data as an Event; plain dicts (older callers, tests) are wrapped."""
+        if isinstance(data, Event):
+            return data
+        return cls(data if isinstance(data, dict) else {})
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.raw.get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.raw
+
+    @property
+    def session_id(self) -> Optional[str]:
+        if self._session_id is _UNSET:
+            self._session_id = session_id_of(self.raw)
+        return self._session_id
+
+    @property
+    def created_at(self) -> Optional[float]:
+        """create_time as epoch seconds (None when absent or unparseable)."""
+        if self._created_at is _UNSET:
+            self._created_at = parse_create_time(self.create_time)
+        return self._created_at
+
+    @property
+    def args(self) -> Dict[str, Any]:
+        """Tool-call arguments, decoded on first access; {} when they are not valid JSON."""
+        if self._args is _UNSET:
+            raw = self.args_raw
+            try:
+                self._args = json_loads(raw) if isinstance(raw, str) else (raw or {})
+            except Exception as e:
+                self._args_error = e
+                self._args = {}
+        return self._args
+
+    @property
+    def args_error(self) -> Optional[Exception]:
+        """Decode error for the tool-call arguments, if any (forces decoding)."""
+        self.args
+        return self._args_error
+
+    def __repr__(self) -> str:
+        return f"Event(callback_id={self.callback_id!r}, tool={self.tool_name or None!r})"
+
+
+__all__ = ["Event", "session_id_of"]
@@ -0,0 +1,40 @@
+import unittest
+
+from awfl.events import latency
+from awfl.events.latency import LatencyHistogram, parse_create_time
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_within_one_bucket(self):
+        h = LatencyHistogram()
+        for ms in range(1, 1001):
+            h.record(float(ms))
+        s = h.summary()
+        self.assertEqual(s["count"], 1000)
+        self.assertAlmostEqual(s["p50"], 500, delta=55)
+        self.assertAlmostEqual(s["p99"], 990, delta=100)
+        self.assertEqual(s["max"], 1000)
+
+    def test_negative_and_huge_values_are_clamped(self):
+        h = LatencyHistogram()
+        h.record(-5)
+        h.record(1e12)
+        self.assertEqual(h.n, 2)
+        self.assertEqual(h.percentile(50), 0.1)
+
+    def test_summary_rows_by_stage_and_tool(self):
+        latency.reset_latency()
+        self.addCleanup(latency.reset_latency)
+        latency.record_latency("tool", 5, "RUN_COMMAND")
+        latency.record_latency("relay", 2)
+        rows = latency.latency_summary()
+        self.assertEqual([(r["stage"], r["tool"]) for r in rows], [("relay", "-"), ("tool", "RUN_COMMAND")])
+
+    def test_parse_create_time(self):
+        self.assertEqual(parse_create_time("1970-01-01T00:00:10Z"), 10.0)
+        self.assertEqual(parse_create_time("12.5"), 12.5)
+        self.assertIsNone(parse_create_time("soon"))
+
+
+if __name__ == "__main__":
+    unittest.main()
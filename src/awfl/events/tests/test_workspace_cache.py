@@ -0,0 +1,33 @@
+import unittest
+from unittest import mock
+
+from awfl.events import workspace
+from awfl.events.workspace import WorkspaceResolutionCache
+
+
+class TestWorkspaceResolutionCache(unittest.TestCase):
+    def test_hit_until_ttl_expires(self):
+        now = [100.0]
+        with mock.patch.object(workspace.time, "monotonic", lambda: now[0]):
+            cache = WorkspaceResolutionCache(ttl_secs=60)
+            self.assertIsNone(cache.get("s1"))
+            cache.put("s1", "p", "ws")
+            self.assertEqual(cache.get("s1"), ("p", "ws"))
+            self.assertIsNone(cache.get("s2"))
+            now[0] += 61
+            self.assertIsNone(cache.get("s1"))
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_invalidate_and_disabled(self):
+        cache = WorkspaceResolutionCache(ttl_secs=60)
+        cache.put(None, "p", "ws")
+        cache.invalidate()
+        self.assertIsNone(cache.get(None))
+        self.assertEqual(cache.invalidations, 1)
+        off = WorkspaceResolutionCache(ttl_secs=0)
+        off.put(None, "p", "ws")
+        self.assertIsNone(off.get(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,14 @@
 import json
 import os
 import subprocess
+import time
 from typing import Optional, Dict, Any
 
 import aiohttp
 
-from awfl.auth import get_auth_headers, set_project_id
+from awfl.auth import set_project_id
 from awfl.utils import get_api_origin, log_unique, _get_workflow_env_suffix
+from awfl.utils.http import auth_headers_async
 
 # Local cache to avoid race/consistency issues when coordinating multiple consumers
 # Cache is keyed by derived project name (org/repo) so HTTPS/SSH remotes map to the same entry
@@ -124,11 +126,7 @@ def _save_project_cache(obj: Dict[str, Any]) -> None:
 async def fetch_projects(session: aiohttp.ClientSession) -> list[dict]:
     origin = get_api_origin()
     url = f"{origin}/workflows/projects"
-    headers = {}
-    try:
-        headers.update(get_auth_headers())
-    except Exception:
-        pass
+    headers = await auth_headers_async()
     try:
         async with session.get(url, headers=headers, timeout=20) as resp:
             if resp.status != 200:
@@ -160,11 +158,7 @@ async def create_project(
     """
     origin = get_api_origin()
     url = f"{origin}/workflows/projects"
-    headers = {"Content-Type": "application/json"}
-    try:
-        headers.update(get_auth_headers())
-    except Exception:
-        pass
+    headers = await auth_headers_async({"Content-Type": "application/json"})
 
     payload: Dict[str, Any] = {"remote": remote}
     if name:
@@ -289,11 +283,7 @@ async def resolve_workspace(
     if ttl_ms is not None:
         params["ttlMs"] = str(ttl_ms)
 
-    headers = {}
-    try:
-        headers.update(get_auth_headers())
-    except Exception:
-        pass
+    headers = await auth_headers_async()
 
     try:
         async with session.get(url, headers=headers, params=params, timeout=20) as resp:
@@ -319,11 +309,7 @@ async def register_workspace(
     origin = get_api_origin()
     url = f"{origin}/workflows/workspace/register"
 
-    headers = {"Content-Type": "application/json"}
-    try:
-        headers.update(get_auth_headers())
-    except Exception:
-        pass
+    headers = await auth_headers_async({"Content-Type": "application/json"})
     payload: Dict[str, Any] = {"projectId": project_id}
     if session_id:
         payload["sessionId"] = session_id
@@ -377,3 +363,44 @@ async def get_or_create_workspace(
         return ws.get("id")
     # Register new
     return await register_workspace(session, project_id, session_id=session_id)
+
+
+class WorkspaceResolutionCache:
+    """Remember (project_id, workspace_id) per session across SSE reconnects.
+
+    Resolution costs git subprocesses, a cache-file read and one to three API calls;
+    a reconnect after a network blip should not repeat that. Entries live for ttl_secs
+    and are dropped explicitly when the stream rejects the workspace (401/404/410) or
+    the session changes.
+    """
+
+    def __init__(self, ttl_secs: float = 600.0):
+        self._ttl = max(0.0, float(ttl_secs))
+        self._entries: Dict[Optional[str], tuple] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, session_id: Optional[str]) -> Optional[tuple]:
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            project_id, ws_id, at = entry
+            if self._ttl > 0 and time.monotonic() - at < self._ttl:
+                self.hits += 1
+                return project_id, ws_id
+            self._entries.pop(session_id, None)
+        self.misses += 1
+        return None
+
+    def put(self, session_id: Optional[str], project_id: str, ws_id: str) -> None:
+        if self._ttl <= 0:
+            return
+        # One consumer follows one session at a time; keep only the current entry
+        self._entries = {session_id: (project_id, ws_id, time.monotonic())}
+
+    def invalidate(self, reason: str = "") -> None:
+        if self._entries:
+            self.invalidations += 1
+            self._entries.clear()
+            if reason:
+                log_unique(f"♻️ Workspace cache invalidated ({reason}); resolving again")
@@ -10,9 +10,10 @@ import shlex
 import awfl.utils as wf_utils
 from awfl.auth import ensure_active_account
 from awfl.response_handler import set_session, get_latest_status
-from awfl.utils import log_lines, log_unique, trigger_workflow
+from awfl.utils import log_lines, log_unique, submit_workflow
 from awfl.commands import handle_command
 from awfl.consumer import consume_events_sse
+from awfl.consumer.telemetry import run_snapshot_writer
 from awfl.state import set_workflow_env_suffix, get_active_workflow, normalize_workflow, DEFAULT_WORKFLOW
 
 
@@ -198,6 +199,10 @@ def _attach_crash_on_consumer_exit(task: asyncio.Task, name: str, evt: asyncio.E
             evt.set()
             return
 
+        # Multiplexed consumer: a cancelled return is shutdown; anything else (incl. lost-lock) is fatal
+        if name == "multiplex" and status == "cancelled":
+            return
+
         # Session consumer: any normal completion is fatal; we rely on it for logs
         if fatal:
             wf_utils.log_unique(f"❌ {name} SSE consumer ended (status={status!r}).")
@@ -222,6 +227,11 @@ def _should_prompt_login() -> bool:
     return True
 
 
+def _is_multiplexed() -> bool:
+    """Serve project execution and session logging from one upstream SSE connection."""
+    return os.getenv("AWFL_SSE_MULTIPLEX") == "1"
+
+
 def _is_headless() -> bool:
     if os.getenv("AWFL_NO_REPL") == "1":
         return True
@@ -252,13 +262,20 @@ async def main():
     if _should_prompt_login():
         ensure_active_account(prompt_login=True)
 
-    # Start one project-wide SSE consumer (guarded by a local leader lock) and one session-scoped consumer
     consumer_shutdown_evt = asyncio.Event()
-    project_consumer = asyncio.create_task(consume_events_sse(scope="project"), name="sse-project")
-    session_consumer = asyncio.create_task(consume_events_sse(scope="session"), name="sse-session")
-    # Treat both consumers as fatal sources; project consumer will still classify skipped-lock/cancel as benign internally
-    _attach_crash_on_consumer_exit(project_consumer, "project", consumer_shutdown_evt, fatal=True)
-    _attach_crash_on_consumer_exit(session_consumer, "session", consumer_shutdown_evt, fatal=True)
+    if _is_multiplexed():
+        # One upstream connection fans out to the execute (project) and log (session) sinks
+        multiplex_consumer = asyncio.create_task(consume_events_sse(scope="both"), name="sse-multiplex")
+        _attach_crash_on_consumer_exit(multiplex_consumer, "multiplex", consumer_shutdown_evt, fatal=True)
+        consumers = (multiplex_consumer,)
+    else:
+        # Start one project-wide SSE consumer (guarded by a local leader lock) and one session-scoped consumer
+        project_consumer = asyncio.create_task(consume_events_sse(scope="project"), name="sse-project")
+        session_consumer = asyncio.create_task(consume_events_sse(scope="session"), name="sse-session")
+        # Treat both consumers as fatal sources; project consumer will still classify skipped-lock/cancel as benign internally
+        _attach_crash_on_consumer_exit(project_consumer, "project", consumer_shutdown_evt, fatal=True)
+        _attach_crash_on_consumer_exit(session_consumer, "session", consumer_shutdown_evt, fatal=True)
+        consumers = (project_consumer, session_consumer)
 
     # If a long-running startup command was provided, execute it without hopping threads,
     # so any dev watcher can create asyncio tasks on this event loop safely.
@@ -276,11 +293,19 @@ async def main():
     # Headless mode: no interactive REPL; just run the SSE consumers and wait
     if _is_headless():
         log_unique("🧪 Running in headless mode (no REPL): SSE consumers active.")
+        snapshot_task = None
+        try:
+            snapshot_secs = float(os.getenv("AWFL_STATUS_SNAPSHOT_SECS", "5"))
+        except Exception:
+            snapshot_secs = 5.0
+        if snapshot_secs > 0:
+            # No REPL to type `status` into: expose consumer health as a JSON file instead
+            snapshot_task = asyncio.create_task(run_snapshot_writer(snapshot_secs), name="status-snapshot")
         try:
             await consumer_shutdown_evt.wait()
             log_unique("❌ Event stream consumer stopped. Exiting CLI so your supervisor can restart it.")
             # Best-effort cancel the other consumer (if still running)
-            for t in (project_consumer, session_consumer):
+            for t in consumers:
                 if not t.done():
                     t.cancel()
             await asyncio.sleep(0.05)
@@ -288,7 +313,7 @@ async def main():
         except KeyboardInterrupt:
             pass
         finally:
-            for t in (project_consumer, session_consumer):
+            for t in (*consumers, snapshot_task):
                 if t and not t.done():
                     t.cancel()
                 with contextlib.suppress(asyncio.CancelledError):
@@ -335,7 +360,7 @@ async def main():
                             await prompt_task
                     log_unique("❌ Event stream consumer stopped. Exiting CLI so you can restart.")
                     # Best-effort cancel the other consumer (if still running)
-                    for t in (project_consumer, session_consumer):
+                    for t in consumers:
                         if not t.done():
                             t.cancel()
                     await asyncio.sleep(0.05)
@@ -362,8 +387,9 @@ async def main():
                 session_id = _compute_session_workflow_name()
                 # Log base workflow name; utils.trigger_workflow will handle env suffixing per mode
                 log_unique(f"🚀 {session_id} > {text}")
-                # Pass base workflow name; env suffixing handled centrally in utils.trigger_workflow
-                trigger_workflow(workflow, {
+                # Pass base workflow name; env suffixing handled centrally in utils.trigger_workflow.
+                # Submitted in the background so the prompt and SSE consumers keep running.
+                submit_workflow(workflow, {
                     "sessionId": session_id,
                     "query": text
                 })
@@ -371,12 +397,18 @@ async def main():
         pass
     finally:
         # Cleanup: cancel background tasks and suppress CancelledError to avoid noisy tracebacks
-        for t in (project_consumer, session_consumer, consumer_waiter, refresh_task):
+        for t in (*consumers, consumer_waiter, refresh_task):
             if t and not t.done():
                 t.cancel()
             with contextlib.suppress(asyncio.CancelledError):
                 if t:
                     await t
+        with contextlib.suppress(Exception):
+            from awfl.utils.http import close_http_session
+            await close_http_session()
+        with contextlib.suppress(Exception):
+            from awfl.response_handler.read_cache import get_read_cache
+            get_read_cache().stop_watching()
 
 
 if __name__ == "__main__":
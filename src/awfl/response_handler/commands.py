@@ -0,0 +1,245 @@
+import asyncio
+import codecs
+import os
+import signal
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .output_capture import BoundedCapture
+
+# RUN_COMMAND execution on asyncio subprocesses.
+#
+# The shell runs in its own process group with stdout/stderr drained by
+# reader tasks, so a long build never blocks the event loop (SSE reading,
+# lease refresh, prompt redraws keep going) and several commands can run at
+# once. On timeout or cancellation the whole group is terminated, then killed
+# after AWFL_COMMAND_KILL_GRACE_SECS, and whatever output was read so far is
+# kept. Output is captured head+tail bounded (see output_capture), so memory
+# per command does not grow with how much it prints.
+#
+# Streaming (opt-in per event via `stream_output`): a ProgressStreamer receives
+# every chunk as it is read and posts rate-limited progress callbacks
+# ({"progress": true, "seq", "elapsedSecs", "stdoutDelta", "stderrDelta"}) while
+# the command runs; the usual result follows as the final callback.
+
+_READ_CHUNK = 64 * 1024
+
+_stats: Dict[str, int] = {
+    "running": 0,
+    "started": 0,
+    "completed": 0,
+    "timed_out": 0,
+    "cancelled": 0,
+}
+
+
+def _kill_grace_secs() -> float:
+    try:
+        return max(0.0, float(os.getenv("AWFL_COMMAND_KILL_GRACE_SECS", "2")))
+    except Exception:
+        return 2.0
+
+
+OutputHook = Callable[[str, bytes], None]
+
+
+async def _drain(stream: Optional[asyncio.StreamReader], cap: BoundedCapture, on_output: Optional[OutputHook]) -> None:
+    if stream is None:
+        return
+    while True:
+        chunk = await stream.read(_READ_CHUNK)
+        if not chunk:
+            return
+        cap.feed(chunk)
+        if on_output is not None:
+            on_output(cap.name, chunk)
+
+
+def _signal_group(proc: asyncio.subprocess.Process, sig: int) -> None:
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, sig)
+        elif sig == signal.SIGTERM:
+            proc.terminate()
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _terminate(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is not None:
+        return
+    _signal_group(proc, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(proc.wait(), _kill_grace_secs())
+    except asyncio.TimeoutError:
+        _signal_group(proc, getattr(signal, "SIGKILL", signal.SIGTERM))
+        await proc.wait()
+
+
+async def run_command(
+    command: str,
+    *,
+    cwd: Optional[str] = None,
+    timeout: Optional[float] = None,
+    on_output: Optional[OutputHook] = None,
+    spill: bool = False,
+) -> Dict[str, Any]:
+    """Run a shell command without blocking the event loop.
+
+    Returns {"stdout", "stderr", "exit_code", "timed_out", "stdout_info",
+    "stderr_info"}: stdout/stderr are head+tail bounded text, the *_info dicts
+    carry total bytes/lines, truncation and the spill file path when one was
+    written. exit_code is None on timeout. Cancelling the awaiting task
+    terminates the process group. on_output("stdout" | "stderr", chunk) sees
+    each chunk as it is read.
+    """
+    prefix = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    stdout = BoundedCapture("stdout", spill=spill, spill_prefix=prefix)
+    stderr = BoundedCapture("stderr", spill=spill, spill_prefix=prefix)
+    proc = await asyncio.create_subprocess_shell(
+        command,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        start_new_session=(os.name == "posix"),
+    )
+    _stats["running"] += 1
+    _stats["started"] += 1
+    readers = [
+        asyncio.ensure_future(_drain(proc.stdout, stdout, on_output)),
+        asyncio.ensure_future(_drain(proc.stderr, stderr, on_output)),
+    ]
+    timed_out = False
+    try:
+        try:
+            await asyncio.wait_for(proc.wait(), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            _stats["timed_out"] += 1
+            await _terminate(proc)
+        # Pipes close once the group is gone; background children holding them are not waited on forever
+        # (floored: a zero grace would make asyncio.wait wait forever)
+        await asyncio.wait(readers, timeout=max(_kill_grace_secs(), 0.1))
+    except asyncio.CancelledError:
+        _stats["cancelled"] += 1
+        await asyncio.shield(_terminate(proc))
+        raise
+    finally:
+        for r in readers:
+            r.cancel()
+        _stats["running"] -= 1
+        # Spill files are flushed off the loop before the result points at them
+        await asyncio.gather(stdout.aclose(), stderr.aclose())
+    if not timed_out:
+        _stats["completed"] += 1
+    return {
+        "stdout": stdout.text(),
+        "stderr": stderr.text(),
+        "exit_code": None if timed_out else proc.returncode,
+        "timed_out": timed_out,
+        "stdout_info": stdout.summary(),
+        "stderr_info": stderr.summary(),
+    }
+
+
+def stream_options(value: Any) -> Optional[Dict[str, float]]:
+    """Normalize an event's `stream_output` (true or {"interval_secs", "max_delta_chars"}); None when off."""
+    if not value:
+        return None
+    try:
+        interval = float(os.getenv("AWFL_STREAM_INTERVAL_SECS", "2"))
+    except Exception:
+        interval = 2.0
+    try:
+        max_chars = int(os.getenv("AWFL_STREAM_MAX_DELTA_CHARS", "8000"))
+    except Exception:
+        max_chars = 8000
+    if isinstance(value, dict):
+        try:
+            interval = float(value.get("interval_secs", interval))
+            max_chars = int(value.get("max_delta_chars", max_chars))
+        except Exception:
+            pass
+    # Floor on the interval: progress callbacks must not flood the server
+    return {"interval_secs": max(0.25, interval), "max_delta_chars": max(256, max_chars)}
+
+
+class ProgressStreamer:
+    """Posts output deltas for a running command at most once per interval.
+
+    Each delta keeps the most recent max_delta_chars of a stream; anything older
+    produced within the same interval is dropped and counted in "skippedChars"
+    (the final result still carries the full output). A tick with no new output
+    is still sent so long commands do not look hung.
+    """
+
+    def __init__(self, send: Callable[[Dict[str, Any]], Awaitable[Any]], *, interval_secs: float = 2.0, max_delta_chars: int = 8000):
+        self._send = send
+        self.interval_secs = interval_secs
+        self.max_delta_chars = max_delta_chars
+        self._decoders = {n: codecs.getincrementaldecoder("utf-8")(errors="replace") for n in ("stdout", "stderr")}
+        self._pending: Dict[str, str] = {"stdout": "", "stderr": ""}
+        self._skipped = 0
+        self._started = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._stop = asyncio.Event()
+        self.sent = 0
+        self.failed = 0
+
+    def feed(self, name: str, chunk: bytes) -> None:
+        text = self._pending[name] + self._decoders[name].decode(chunk)
+        over = len(text) - self.max_delta_chars
+        if over > 0:
+            self._skipped += over
+            text = text[over:]
+        self._pending[name] = text
+
+    def start(self) -> None:
+        self._started = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="command-progress")
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.interval_secs)
+                return
+            except asyncio.TimeoutError:
+                await self._post()
+
+    async def _post(self) -> None:
+        payload = {
+            "progress": True,
+            "seq": self.sent + self.failed + 1,
+            "elapsedSecs": round(time.monotonic() - self._started, 2),
+            "stdoutDelta": self._pending["stdout"],
+            "stderrDelta": self._pending["stderr"],
+        }
+        if self._skipped:
+            payload["skippedChars"] = self._skipped
+        self._pending = {"stdout": "", "stderr": ""}
+        self._skipped = 0
+        try:
+            await self._send(payload)
+            self.sent += 1
+        except Exception:
+            # Progress is advisory; the final result is what matters
+            self.failed += 1
+
+    async def close(self) -> None:
+        """Stop ticking; an in-flight progress post finishes first so the final result comes last."""
+        t = self._task
+        self._task = None
+        self._stop.set()
+        if t is not None:
+            await asyncio.gather(t, return_exceptions=True)
+
+
+def command_stats() -> Dict[str, int]:
+    return dict(_stats)
+
+
+__all__ = ["run_command", "command_stats", "stream_options", "ProgressStreamer"]
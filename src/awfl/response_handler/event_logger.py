@@ -1,6 +1,7 @@
 import json
 from typing import Optional, Dict, Any
 
+from awfl.events.model import Event
 from awfl.utils import log_unique
 from .session_state import _update_status
 from .rh_utils import ts_to_ms, is_background_from_payload
@@ -100,44 +101,40 @@ def log_run_command_sanitized(command: str, reason: Optional[str]) -> None:
     log_unique(f"[RUN_COMMAND] sanitized ({reason}): {short_cmd}")
 
 
-def process_event(data: Dict[str, Any]) -> None:
+def process_event(data: Dict[str, Any] | Event) -> None:
     """Aggregate all non-error status updates and logging for a response event.
 
     This is intentionally side-effect free with respect to tool execution: it only updates
     the prompt status and writes logs. Callers can choose to invoke this, the handler, or both.
+    Accepts a raw payload dict or a pre-decoded Event (shared with the handler).
     """
+    ev = Event.coerce(data)
+    get = ev.raw.get
+
     # Timestamps and mode
-    updated_at = data.get("create_time")
+    updated_at = ev.create_time
     ts_ms = ts_to_ms(updated_at) if updated_at else 0
-    is_background = is_background_from_payload(data)
+    is_background = is_background_from_payload(ev.raw)
 
     # Status update first
-    apply_status(data.get("status"), data.get("error"), is_background=is_background, ts_ms=ts_ms)
+    error = get("error")
+    apply_status(get("status"), error, is_background=is_background, ts_ms=ts_ms)
 
     # Error line (if present)
-    if "error" in data and data.get("error"):
-        log_error_if_present(data.get("error"), is_background=is_background)
+    if error:
+        log_error_if_present(error, is_background=is_background)
 
     # Cost line (non-error)
-    if "cost" in data:
-        log_cost_if_changed(data.get("cost"))
+    if "cost" in ev.raw:
+        log_cost_if_changed(get("cost"))
 
     # User-facing content
-    user_msg = data.get("content")
+    user_msg = get("content")
     if isinstance(user_msg, str) and user_msg.strip().lower() == "null":
         user_msg = None
-    log_user_message(user_msg, error=data.get("error"), is_background=is_background, ts_ms=ts_ms)
-
-    # Tool call logging (concise)
-    tc = data.get("tool_call")
-    if tc:
-        fn = (tc or {}).get("function", {}) or {}
-        name = (fn.get("name") or "").upper()
-        args_raw = fn.get("arguments") or "{}"
-        args: Dict[str, Any]
-        try:
-            args = json.loads(args_raw) if isinstance(args_raw, str) else (args_raw or {})
-        except Exception:
-            # Do not emit error logs from logger; fallback silently
-            args = {}
-        log_tool_call(name, args, is_background=is_background)
+    log_user_message(user_msg, error=error, is_background=is_background, ts_ms=ts_ms)
+
+    # Tool call logging (concise); arguments are decoded once and shared with the handler.
+    # Undecodable arguments fall back to {} silently: the handler reports them.
+    if ev.tool_call:
+        log_tool_call(ev.tool_name, ev.args, is_background=is_background)
@@ -0,0 +1,286 @@
+import asyncio
+import os
+import time
+import weakref
+from collections import Counter
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from awfl.events.model import Event
+from awfl.utils import log_unique
+
+# Tool executor: registry + per-pool concurrency + cancellation.
+#
+# Each tool name maps to a ToolSpec (handler coroutine, pool, timeout). Tools
+# in the same pool share a concurrency limit (AWFL_TOOL_CONCURRENCY_<POOL>,
+# e.g. 2 commands, 16 file ops across sessions) and an optional timeout
+# (AWFL_TOOL_TIMEOUT_<POOL>; None leaves the policy to the tool itself, as
+# RUN_COMMAND does with timeout_seconds).
+#
+# Every call runs as its own task tracked per session, so `stop` can cancel
+# the in-flight (or still queued) tools of a session; the server then gets a
+# {"cancelled": true} result instead of waiting on a callback that never comes.
+#
+# Tools registered with cancellable=False (the file tools: their work runs in
+# asyncio.to_thread, which cannot be interrupted) get neither the pool timeout
+# nor `stop`: reporting "timed out"/"cancelled" while the write still lands
+# would be false, and the ledger would replay that false result. `stop` only
+# cancels them while they are still queued behind the pool limit.
+
+ToolHandler = Callable[["ToolContext"], Awaitable[None]]
+
+DEFAULT_POOL_LIMITS = {"command": 2, "file": 16}
+DEFAULT_POOL_TIMEOUTS: Dict[str, Optional[float]] = {"command": None, "file": 60.0}
+
+
+class ToolContext:
+    """What a tool handler gets: the event, decoded args and the result sender."""
+
+    __slots__ = ("ev", "args", "workdir", "session_id", "updated_at", "send_result", "send_progress")
+
+    def __init__(
+        self,
+        ev: Event,
+        args: Dict[str, Any],
+        *,
+        session_id: str,
+        send_result: Callable[[dict], Awaitable[None]],
+        send_progress: Optional[Callable[[dict], Awaitable[None]]] = None,
+    ):
+        self.ev = ev
+        self.args = args
+        self.workdir = ev.workdir
+        self.session_id = session_id
+        self.updated_at = ev.create_time
+        self.send_result = send_result
+        self.send_progress = send_progress
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return self.ev.raw
+
+    def timestamp(self) -> str:
+        return self.updated_at or datetime.utcnow().isoformat() + "Z"
+
+
+class ToolSpec:
+    __slots__ = ("name", "handler", "pool", "timeout_secs", "cancellable")
+
+    def __init__(
+        self,
+        name: str,
+        handler: ToolHandler,
+        *,
+        pool: str,
+        timeout_secs: Optional[float] = None,
+        cancellable: bool = True,
+    ):
+        self.name = name
+        self.handler = handler
+        self.pool = pool
+        self.timeout_secs = timeout_secs
+        self.cancellable = cancellable
+
+
+class ToolCall:
+    """One in-flight tool execution; cancel() is its cancellation token."""
+
+    __slots__ = ("tool", "session_id", "callback_id", "task", "queued_at", "started_at", "cancel_reason", "cancellable")
+
+    def __init__(self, tool: str, session_id: Optional[str], callback_id: Optional[str], *, cancellable: bool = True):
+        self.tool = tool
+        self.cancellable = cancellable
+        self.session_id = session_id
+        self.callback_id = callback_id
+        self.task: Optional[asyncio.Task] = None
+        self.queued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.cancel_reason: Optional[str] = None
+
+    def cancel(self, reason: str) -> bool:
+        if self.task is None or self.task.done():
+            return False
+        if not self.cancellable and self.started_at is not None:
+            # Running in a worker thread; its real result is still coming
+            return False
+        self.cancel_reason = reason
+        return self.task.cancel()
+
+
+def _env_pool(prefix: str, pool: str, default: Any, cast) -> Any:
+    raw = os.getenv(f"{prefix}_{pool.upper()}")
+    if raw is None:
+        return default
+    if raw.strip().lower() in ("", "none", "0") and cast is float:
+        return None
+    try:
+        return cast(raw)
+    except Exception:
+        return default
+
+
+class ToolExecutor:
+    def __init__(self):
+        self._specs: Dict[str, ToolSpec] = {}
+        # loop -> pool -> semaphore; asyncio primitives are bound to one loop, and
+        # entries go away with their loop (tests and asyncio.run create many)
+        self._sems: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+        self._inflight: Dict[Optional[str], Set[ToolCall]] = {}
+        self.counts: Counter = Counter()
+
+    # ----- registry -----
+
+    def register(
+        self,
+        name: str,
+        handler: ToolHandler,
+        *,
+        pool: str = "default",
+        timeout_secs: Optional[float] = None,
+        cancellable: bool = True,
+    ) -> ToolSpec:
+        spec = ToolSpec(name.upper(), handler, pool=pool, timeout_secs=timeout_secs, cancellable=cancellable)
+        self._specs[spec.name] = spec
+        return spec
+
+    def get(self, name: str) -> Optional[ToolSpec]:
+        return self._specs.get((name or "").upper())
+
+    def tools(self) -> Dict[str, ToolSpec]:
+        return dict(self._specs)
+
+    def pool_limit(self, pool: str) -> int:
+        return max(1, _env_pool("AWFL_TOOL_CONCURRENCY", pool, DEFAULT_POOL_LIMITS.get(pool, 8), int))
+
+    def pool_timeout(self, spec: ToolSpec) -> Optional[float]:
+        if not spec.cancellable:
+            return None
+        default = spec.timeout_secs if spec.timeout_secs is not None else DEFAULT_POOL_TIMEOUTS.get(spec.pool)
+        return _env_pool("AWFL_TOOL_TIMEOUT", spec.pool, default, float)
+
+    def _sem(self, pool: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sems = self._sems.get(loop)
+        if sems is None:
+            sems = self._sems[loop] = {}
+        sem = sems.get(pool)
+        if sem is None:
+            sem = sems[pool] = asyncio.Semaphore(self.pool_limit(pool))
+        return sem
+
+    # ----- execution -----
+
+    async def execute(self, ctx: ToolContext) -> bool:
+        """Run ctx's tool under its pool's limit; False when no tool is registered under that name."""
+        spec = self.get(ctx.ev.tool_name)
+        if spec is None:
+            return False
+        call = ToolCall(spec.name, ctx.ev.session_id or ctx.session_id, ctx.ev.callback_id, cancellable=spec.cancellable)
+        timeout = self.pool_timeout(spec)
+        sem = self._sem(spec.pool)
+
+        async def _run():
+            async with sem:
+                call.started_at = time.monotonic()
+                self.counts[f"{spec.pool}.running"] += 1
+                try:
+                    if timeout:
+                        await asyncio.wait_for(spec.handler(ctx), timeout)
+                    else:
+                        await spec.handler(ctx)
+                finally:
+                    self.counts[f"{spec.pool}.running"] -= 1
+
+        call.task = asyncio.get_running_loop().create_task(_run(), name=f"tool-{spec.name}")
+        calls = self._inflight.setdefault(call.session_id, set())
+        calls.add(call)
+        try:
+            # Cancelling the caller (shutdown) cancels the tool task too
+            await call.task
+            self.counts["completed"] += 1
+        except asyncio.CancelledError:
+            if call.cancel_reason is None:
+                raise
+            self.counts["cancelled"] += 1
+            log_unique(f"🛑 {spec.name} cancelled: {call.cancel_reason}")
+            await ctx.send_result({
+                "sessionId": ctx.session_id,
+                "error": f"Cancelled: {call.cancel_reason}",
+                "cancelled": True,
+                "timestamp": ctx.timestamp(),
+            })
+        except asyncio.TimeoutError:
+            self.counts["timed_out"] += 1
+            log_unique(f"{spec.name} timed out after {timeout}s")
+            await ctx.send_result({
+                "sessionId": ctx.session_id,
+                "error": f"{spec.name} timed out after {timeout}s",
+                "timed_out": True,
+                "timestamp": ctx.timestamp(),
+            })
+        finally:
+            calls.discard(call)
+            if not calls:
+                self._inflight.pop(call.session_id, None)
+        return True
+
+    def cancel_session(self, session_id: Optional[str], reason: str = "stopped by user") -> int:
+        """Cancel queued and running tools for a session (all sessions when None)."""
+        if session_id is None:
+            targets = [c for calls in self._inflight.values() for c in calls]
+        else:
+            targets = list(self._inflight.get(session_id, ()))
+        return sum(1 for c in targets if c.cancel(reason))
+
+    def stats(self) -> Dict[str, Any]:
+        pools: Dict[str, Dict[str, Any]] = {}
+        for spec in self._specs.values():
+            pools.setdefault(spec.pool, {"limit": self.pool_limit(spec.pool), "running": self.counts[f"{spec.pool}.running"], "tools": []})
+            pools[spec.pool]["tools"].append(spec.name)
+        inflight = sum(len(c) for c in self._inflight.values())
+        for p in pools.values():
+            p["tools"].sort()
+        return {
+            "pools": pools,
+            "inflight": inflight,
+            "completed": self.counts["completed"],
+            "cancelled": self.counts["cancelled"],
+            "timed_out": self.counts["timed_out"],
+        }
+
+
+_executor = ToolExecutor()
+
+
+def get_executor() -> ToolExecutor:
+    return _executor
+
+
+def register_tool(
+    name: str,
+    handler: ToolHandler,
+    *,
+    pool: str = "default",
+    timeout_secs: Optional[float] = None,
+    cancellable: bool = True,
+) -> ToolSpec:
+    return _executor.register(name, handler, pool=pool, timeout_secs=timeout_secs, cancellable=cancellable)
+
+
+def cancel_session_tools(session_id: Optional[str], reason: str = "stopped by user") -> int:
+    return _executor.cancel_session(session_id, reason)
+
+
+def tool_stats() -> Dict[str, Any]:
+    return _executor.stats()
+
+
+__all__ = [
+    "ToolContext",
+    "ToolSpec",
+    "ToolExecutor",
+    "get_executor",
+    "register_tool",
+    "cancel_session_tools",
+    "tool_stats",
+]
@@ -0,0 +1,218 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from .read_cache import get_read_cache, identity
+
+# Ranged, bounded file reads for READ_FILE.
+#
+# Only the requested window is read from disk (seek + read of at most
+# max_bytes), so the first 200KB of a 2GB log costs 200KB. Line ranges go
+# through a LineIndex: one pass over the file in BLOCK_SIZE reads records how
+# many newlines precede each block (a few KB of ints even for multi-GB files).
+# Finding line N is then a binary search over blocks plus a scan of one block.
+# Indexes are built lazily on the first line-range request and cached per
+# path, keyed on (size, mtime), so paging through a file indexes it once.
+# Returned pages go through the READ_FILE cache (read_cache) so re-reading an
+# unchanged file costs a stat.
+
+BLOCK_SIZE = 256 * 1024
+_INDEX_CACHE_ENTRIES = 32
+
+
+class LineIndex:
+    __slots__ = ("size", "mtime_ns", "block_size", "starts", "newlines", "last_byte")
+
+    def __init__(self, size: int, mtime_ns: int, block_size: int, starts: List[int], newlines: int, last_byte: bytes):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.block_size = block_size
+        # starts[i] = newlines before block i
+        self.starts = starts
+        self.newlines = newlines
+        self.last_byte = last_byte
+
+    @classmethod
+    def build(cls, f: BinaryIO, size: int, mtime_ns: int, block_size: Optional[int] = None) -> "LineIndex":
+        block_size = block_size or BLOCK_SIZE
+        starts: List[int] = []
+        n = 0
+        last = b""
+        f.seek(0)
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            starts.append(n)
+            n += block.count(b"\n")
+            last = block[-1:]
+        return cls(size, mtime_ns, block_size, starts, n, last)
+
+    @property
+    def total_lines(self) -> int:
+        # A final line without a trailing newline still counts
+        return self.newlines + (1 if self.size and self.last_byte != b"\n" else 0)
+
+    def line_offset(self, f: BinaryIO, line: int) -> int:
+        """Byte offset where 0-based `line` starts (size when past the end)."""
+        if line <= 0:
+            return 0
+        if line > self.newlines:
+            return self.size
+        # Last block whose preceding newline count is < line: the line-th newline is inside it
+        lo, hi = 0, len(self.starts) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.starts[mid] < line:
+                lo = mid
+            else:
+                hi = mid - 1
+        base = lo * self.block_size
+        f.seek(base)
+        block = f.read(self.block_size)
+        pos = -1
+        for _ in range(line - self.starts[lo]):
+            pos = block.find(b"\n", pos + 1)
+        return base + pos + 1
+
+
+_cache: "OrderedDict[str, LineIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {"index_builds": 0, "index_hits": 0, "reads": 0, "bytes_read": 0}
+
+
+def _line_index(path: str, f: BinaryIO, st: os.stat_result) -> LineIndex:
+    key = os.path.realpath(path)
+    with _cache_lock:
+        idx = _cache.get(key)
+        if idx is not None and idx.size == st.st_size and idx.mtime_ns == st.st_mtime_ns:
+            _cache.move_to_end(key)
+            _stats["index_hits"] += 1
+            return idx
+    idx = LineIndex.build(f, st.st_size, st.st_mtime_ns)
+    with _cache_lock:
+        _stats["index_builds"] += 1
+        _cache[key] = idx
+        _cache.move_to_end(key)
+        while len(_cache) > _INDEX_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return idx
+
+
+def cached_line_count(path: str, st: Optional[os.stat_result] = None) -> Optional[int]:
+    """Total lines when an up-to-date index is already cached (never builds one)."""
+    try:
+        st = st or os.stat(path)
+    except OSError:
+        return None
+    with _cache_lock:
+        idx = _cache.get(os.path.realpath(path))
+    if idx is not None and idx.size == st.st_size and idx.mtime_ns == st.st_mtime_ns:
+        return idx.total_lines
+    return None
+
+
+def _trim_partial_utf8(b: bytes) -> bytes:
+    # Cut at a character boundary so the next page starts where this one ends
+    for i in range(1, min(4, len(b)) + 1):
+        c = b[-i]
+        if c & 0xC0 == 0x80:
+            continue
+        if c & 0x80 == 0:
+            return b
+        need = 2 if c & 0xE0 == 0xC0 else 3 if c & 0xF0 == 0xE0 else 4
+        return b if i >= need else b[:-i]
+    return b
+
+
+def _opt_int(args: Dict[str, Any], key: str) -> Optional[int]:
+    v = args.get(key)
+    if v is None or v == "":
+        return None
+    n = int(v)
+    if n < 0:
+        raise ValueError(f"{key} must be >= 0")
+    return n
+
+
+def read_range(path: str, args: Dict[str, Any], *, max_bytes: int) -> Dict[str, Any]:
+    """Read one window of a file as text plus paging metadata.
+
+    args (all optional): offset/length in bytes, or start_line/end_line
+    (1-based, inclusive). At most max_bytes are read; "truncated" is set when
+    the window (or, without range args, the file) has more than was returned.
+    """
+    offset = _opt_int(args, "offset")
+    length = _opt_int(args, "length")
+    start_line = _opt_int(args, "start_line")
+    end_line = _opt_int(args, "end_line")
+    line_mode = start_line is not None or end_line is not None
+    if line_mode and (offset is not None or length is not None):
+        raise ValueError("use either offset/length or start_line/end_line, not both")
+
+    cache = get_read_cache()
+    window = (offset, length, start_line, end_line, max_bytes)
+    ident = None
+    if cache.enabled:
+        ident = identity(path, os.stat(path))
+        page = cache.get(ident, window)
+        if page is not None:
+            return page
+
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        size = st.st_size
+        meta: Dict[str, Any] = {"size": size}
+        if line_mode:
+            idx = _line_index(path, f, st)
+            first = max(1, start_line or 1)
+            last = end_line if end_line is not None else idx.total_lines
+            start = idx.line_offset(f, first - 1)
+            end = idx.line_offset(f, last) if last >= first else start
+            meta.update({"totalLines": idx.total_lines, "startLine": first})
+        else:
+            start = min(offset or 0, size)
+            end = size if length is None else min(size, start + length)
+            total = cached_line_count(path, st)
+            if total is not None:
+                meta["totalLines"] = total
+
+        want = max(0, end - start)
+        f.seek(start)
+        data = f.read(min(want, max_bytes))
+    truncated = len(data) < want
+    # Line pages end on a line boundary; a line cut off by max_bytes is left whole for the next page
+    nl = data.rfind(b"\n") if line_mode and truncated else -1
+    if nl >= 0:
+        data = data[: nl + 1]
+    elif truncated:
+        data = _trim_partial_utf8(data)
+    _stats["reads"] += 1
+    _stats["bytes_read"] += len(data)
+
+    text = data.decode("utf-8", errors="ignore")
+    meta.update({"offset": start, "length": len(data), "truncated": truncated})
+    if start + len(data) < size:
+        meta["nextOffset"] = start + len(data)
+    if line_mode:
+        if nl >= 0:
+            meta["endLine"] = first - 1 + data.count(b"\n")
+        elif not truncated:
+            meta["endLine"] = min(last, idx.total_lines) if data else first - 1
+        # else: one line longer than max_bytes; only nextOffset pages through it
+        if "endLine" in meta and meta["endLine"] < idx.total_lines:
+            meta["nextLine"] = meta["endLine"] + 1
+    page = {"content": text, **meta}
+    # Only cache what was read from the version that was stat'ed
+    if ident is not None and identity(path, st) == ident:
+        cache.put(ident, window, page)
+    return page
+
+
+def reader_stats() -> Dict[str, int]:
+    with _cache_lock:
+        return {**_stats, "cached_indexes": len(_cache)}
+
+
+__all__ = ["LineIndex", "read_range", "cached_line_count", "reader_stats"]
@@ -0,0 +1,283 @@
+import hashlib
+import os
+import re
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+# UPDATE_FILE edits and atomic writes.
+#
+# Besides full `content`, UPDATE_FILE accepts a unified diff (`patch`) or a
+# list of line-range `edits`, applied here against the file on disk, so a
+# one-line change to a large file no longer ships the whole file through the
+# relay. An optional `base_hash` (sha256 of the file the edit was computed
+# against) turns a concurrent modification into a conflict instead of a
+# silently mangled file. Every write goes to a temp file in the same
+# directory, is fsynced and then os.replace'd over the target, so a crash
+# leaves either the old or the new file, never half of one. A result identical
+# to the file on disk is not written at all: rewriting would bump the mtime
+# and set off watchers (e.g. `awfl dev` regenerating and deploying workflows).
+#
+# Text round-trips through surrogateescape: bytes that are not valid UTF-8
+# are written back exactly as they were read.
+
+_stats: Dict[str, int] = {"written": 0, "unchanged": 0, "conflicts": 0}
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(ValueError):
+    """The edit cannot be applied; nothing was written."""
+
+
+class PatchConflict(PatchError):
+    """The file is not the version the edit was made against."""
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="surrogateescape")
+
+
+def _encode(text: str) -> bytes:
+    return text.encode("utf-8", errors="surrogateescape")
+
+
+def _eol(lines: List[str]) -> str:
+    return "\r\n" if lines and lines[0].endswith("\r\n") else "\n"
+
+
+def _bare(line: str) -> str:
+    return line.rstrip("\r\n")
+
+
+def _parse_hunks(patch: str) -> List[Tuple[int, int, List[Tuple[str, str]], bool]]:
+    """[(old_start, old_count, [(op, text)], new_has_no_eol)] from a single-file unified diff."""
+    hunks: List[Tuple[int, int, List[Tuple[str, str]], bool]] = []
+    # Header of the hunk being collected; cur is None until the first @@ line
+    start = count = 0
+    cur: Optional[List[Tuple[str, str]]] = None
+    no_eol = False
+    for raw in patch.splitlines():
+        m = _HUNK_RE.match(raw)
+        if m:
+            if cur is not None:
+                hunks.append((start, count, cur, no_eol))
+            start = int(m.group(1))
+            count = int(m.group(2)) if m.group(2) is not None else 1
+            cur, no_eol = [], False
+            continue
+        if cur is None:
+            # Headers (diff --git, index, ---, +++) before the first hunk
+            continue
+        if raw.startswith("\\"):
+            # "\ No newline at end of file" applies to the line before it
+            if cur and cur[-1][0] == "+":
+                no_eol = True
+            continue
+        op, text = (raw[:1], raw[1:]) if raw else (" ", "")
+        if op not in (" ", "-", "+"):
+            raise PatchError(f"Unexpected line in hunk: {raw[:80]!r}")
+        cur.append((op, text))
+    if cur is not None:
+        hunks.append((start, count, cur, no_eol))
+    if not hunks:
+        raise PatchError("Patch contains no hunks")
+    return hunks
+
+
+def _find_hunk(orig: List[str], old: List[str], expected: int, lo: int) -> int:
+    """Index where `old` matches orig (comparing without line endings), nearest to `expected`."""
+    n = len(old)
+    last = len(orig) - n
+    if last < lo:
+        return -1
+    expected = min(max(expected, lo), last)
+    for delta in range(0, max(expected - lo, last - expected) + 1):
+        for i in (expected - delta, expected + delta):
+            if lo <= i <= last and all(_bare(orig[i + k]) == old[k] for k in range(n)):
+                return i
+    return -1
+
+
+def _append(out: List[str], line: str, eol: str) -> None:
+    if out and not out[-1].endswith("\n"):
+        out[-1] += eol
+    out.append(line)
+
+
+def apply_unified_diff(text: str, patch: str) -> str:
+    orig = text.splitlines(keepends=True)
+    eol = _eol(orig)
+    out: List[str] = []
+    cursor = 0
+    for n, (start, count, lines, no_eol) in enumerate(_parse_hunks(patch), 1):
+        old = [t for op, t in lines if op != "+"]
+        if len(old) != count:
+            raise PatchError(f"Hunk {n}: header says {count} old lines, body has {len(old)}")
+        # For pure insertions the header names the line to insert after
+        expected = start if count == 0 else start - 1
+        i = _find_hunk(orig, old, expected, cursor)
+        if i < 0:
+            raise PatchConflict(f"Hunk {n} (line {start}) does not match the file")
+        for line in orig[cursor:i]:
+            _append(out, line, eol)
+        j = i
+        for op, t in lines:
+            if op == " ":
+                _append(out, orig[j], eol)
+                j += 1
+            elif op == "-":
+                j += 1
+            else:
+                _append(out, t + eol, eol)
+        if no_eol and out and lines[-1][0] == "+":
+            out[-1] = _bare(out[-1])
+        cursor = j
+    for line in orig[cursor:]:
+        _append(out, line, eol)
+    return "".join(out)
+
+
+def apply_line_edits(text: str, edits: List[Dict[str, Any]]) -> str:
+    """Replace 1-based inclusive [start_line, end_line] ranges; end_line = start_line - 1 inserts."""
+    if not isinstance(edits, list) or not edits:
+        raise PatchError("edits must be a non-empty list")
+    orig = text.splitlines(keepends=True)
+    eol = _eol(orig)
+    spans = []
+    for e in edits:
+        try:
+            start = int(e["start_line"])
+            end = int(e.get("end_line", start))
+            new = e.get("content") or ""
+        except Exception:
+            raise PatchError(f"Invalid edit: {e!r}")
+        if not (1 <= start <= len(orig) + 1 and start - 1 <= end <= len(orig)):
+            raise PatchConflict(f"Edit {start}-{end} is outside the file ({len(orig)} lines)")
+        spans.append((start, end, str(new)))
+    spans.sort(key=lambda s: (s[0], s[1]))
+    for (s1, e1, _), (s2, _e2, _) in zip(spans, spans[1:]):
+        if s2 <= e1:
+            raise PatchError(f"Edits {s1}-{e1} and starting at {s2} overlap")
+    # Bottom-up so earlier line numbers stay valid
+    for start, end, new in reversed(spans):
+        repl = new.splitlines(keepends=True)
+        if repl and not repl[-1].endswith("\n") and end < len(orig):
+            repl[-1] += eol
+        if start > 1 and start - 2 < len(orig) and not orig[start - 2].endswith("\n") and repl:
+            orig[start - 2] += eol
+        orig[start - 1:end] = repl
+    return "".join(orig)
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Write via temp file + fsync + os.replace; keeps the mode of an existing file."""
+    target = os.path.realpath(path)
+    directory = os.path.dirname(target) or "."
+    tmp = os.path.join(directory, f".{os.path.basename(target)}.{uuid.uuid4().hex[:8]}.tmp")
+    # 0o666 through open() so a new file gets the usual umask-derived mode
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, os.stat(target).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    if os.name == "posix":
+        # Persist the rename itself
+        try:
+            dfd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dfd)
+            finally:
+                os.close(dfd)
+        except OSError:
+            pass
+
+
+def _read_current(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _same_as_disk(path: str, data: bytes) -> bool:
+    # Size first: a differing length settles it without reading the file
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+    except OSError:
+        return False
+    return _read_current(path) == data
+
+
+def update_file_sync(path: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply one UPDATE_FILE request (content | patch | edits) to path.
+
+    Returns {"hash", "bytes", "mode"} for the written file, plus
+    "unchanged": True when the result equals the file on disk and nothing was
+    written (the mtime stays, so file watchers do not fire). Raises
+    PatchError (PatchConflict on base_hash or context mismatch) without
+    touching the file.
+    """
+    base_hash = args.get("base_hash")
+    # Full content without base_hash only needs the file for the no-op check, by size first
+    needs_current = bool(base_hash) or args.get("content") is None
+    current = _read_current(path) if needs_current else None
+    try:
+        if base_hash and (current is None or content_hash(current) != str(base_hash).lower()):
+            raise PatchConflict("File changed since base_hash" if current is not None else "File does not exist (base_hash given)")
+
+        if args.get("content") is not None:
+            mode, new_text = "content", str(args["content"])
+        elif args.get("patch"):
+            mode, new_text = "patch", apply_unified_diff(_decode(current or b""), str(args["patch"]))
+        elif args.get("edits") is not None:
+            mode, new_text = "edits", apply_line_edits(_decode(current or b""), args["edits"])
+        else:
+            raise PatchError("UPDATE_FILE needs content, patch or edits")
+    except PatchConflict:
+        _stats["conflicts"] += 1
+        raise
+
+    data = _encode(new_text)
+    out: Dict[str, Any] = {"hash": content_hash(data), "bytes": len(data), "mode": mode}
+    if (current == data) if needs_current else _same_as_disk(path, data):
+        _stats["unchanged"] += 1
+        out["unchanged"] = True
+        return out
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    atomic_write(path, data)
+    _stats["written"] += 1
+    return out
+
+
+def writer_stats() -> Dict[str, int]:
+    return dict(_stats)
+
+
+__all__ = [
+    "PatchError",
+    "PatchConflict",
+    "content_hash",
+    "apply_unified_diff",
+    "apply_line_edits",
+    "atomic_write",
+    "update_file_sync",
+    "writer_stats",
+]
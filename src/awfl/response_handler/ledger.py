@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from awfl.utils import _get_workflow_env_suffix, log_unique
+
+# Execution ledger: makes replayed tool calls idempotent.
+#
+# Resume via Last-Event-ID is at-least-once, so after a reconnect or crash the
+# project consumer can see an event it already executed. Before running a
+# side-effecting tool the handler asks the ledger for the result it sent last
+# time (keyed by callback_id, else by SSE event id) and re-sends that instead of
+# executing again.
+#
+# Storage is two-level and bounded:
+# - an in-memory LRU of recent results (AWFL_LEDGER_MEMORY_ENTRIES, default 256)
+# - an append-only JSON-lines file (~/.awfl/ledger{env}.jsonl) with a compact
+#   in-memory index of key -> (offset, length); payloads are read back on demand.
+#   Past AWFL_LEDGER_MAX_ENTRIES (default 5000) the file is rewritten keeping the
+#   newest half.
+# Only the memory LRU holds full payloads. On disk, string fields longer than
+# AWFL_LEDGER_FIELD_BYTES (default 4096; RUN_COMMAND output mostly) keep their
+# head and tail around a marker with the full value's length and sha256, and
+# the record lists them under "ledger_truncated". A replay served from disk
+# therefore says its output was cut. Without this the file would grow to
+# hundreds of MB and be rewritten on every compaction.
+#
+# The index is a dict, so a miss (the common case: a new event) costs one hash
+# lookup and never touches the disk. AWFL_LEDGER=0 disables the ledger.
+
+LedgerKey = str
+
+
+def _field_limit() -> int:
+    try:
+        return max(256, int(os.getenv("AWFL_LEDGER_FIELD_BYTES", "4096")))
+    except Exception:
+        return 4096
+
+
+def _for_disk(result: Dict[str, Any], limit: int) -> Dict[str, Any]:
+    """result with oversized top-level string fields cut to head + marker + tail."""
+    cut = [k for k, v in result.items() if isinstance(v, str) and len(v) > limit]
+    if not cut:
+        return result
+    out = dict(result)
+    half = limit // 2
+    for k in cut:
+        v = out[k]
+        digest = hashlib.sha256(v.encode("utf-8", errors="surrogatepass")).hexdigest()
+        out[k] = f"{v[:half]}\n... [{len(v) - 2 * half} chars omitted from the ledger copy; {len(v)} chars, sha256 {digest}] ...\n{v[-half:]}"
+    out["ledger_truncated"] = cut
+    return out
+
+
+def ledger_key(callback_id: Optional[str], event_id: Optional[str] = None) -> Optional[LedgerKey]:
+    if callback_id:
+        return f"cb:{callback_id}"
+    if event_id:
+        return f"evt:{event_id}"
+    return None
+
+
+class ExecutionLedger:
+    def __init__(self, path: str, *, memory_entries: int = 256, max_entries: int = 5000):
+        self.path = path
+        self._memory_entries = max(1, int(memory_entries))
+        self._max_entries = max(10, int(max_entries))
+        self._lru: "OrderedDict[LedgerKey, Dict[str, Any]]" = OrderedDict()
+        self._index: "OrderedDict[LedgerKey, Tuple[int, int]]" = OrderedDict()
+        self._loaded = False
+        self._mutex = threading.RLock()
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.records = 0
+        self.compactions = 0
+
+    # ----- index -----
+
+    def load(self) -> None:
+        """Build the key -> (offset, length) index by scanning the file once."""
+        with self._mutex:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                with open(self.path, "rb") as f:
+                    offset = 0
+                    for line in f:
+                        length = len(line)
+                        if line.endswith(b"\n"):
+                            try:
+                                key = json.loads(line)["k"]
+                                self._index.pop(key, None)
+                                self._index[key] = (offset, length)
+                            except Exception:
+                                pass  # torn line from a crash mid-append
+                        offset += length
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                log_unique(f"⚠️ Could not read execution ledger {self.path}: {e}")
+
+    # ----- lookups -----
+
+    def get(self, key: Optional[LedgerKey]) -> Optional[Dict[str, Any]]:
+        """Result previously sent for key, or None. Blocking (may read one line from disk)."""
+        if not key:
+            return None
+        with self._mutex:
+            hit = self._lru.get(key)
+            if hit is not None:
+                self._lru.move_to_end(key)
+                self.hits_memory += 1
+                return hit
+            if not self._loaded:
+                self.load()
+            loc = self._index.get(key)
+            if loc is None:
+                self.misses += 1
+                return None
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(loc[0])
+                    rec = json.loads(f.read(loc[1]))
+                # Offsets go stale if another process compacted the file; never trust a foreign line
+                result = rec.get("r") if rec.get("k") == key else None
+            except Exception:
+                self.misses += 1
+                return None
+            if not isinstance(result, dict):
+                self.misses += 1
+                return None
+            self.hits_disk += 1
+            self._remember(key, result)
+            return result
+
+    def put(self, key: Optional[LedgerKey], result: Dict[str, Any], *, tool: str = "") -> None:
+        """Record the result sent for key. Blocking (one append + fsync).
+
+        The memory LRU keeps result as is; the disk copy has large fields cut (see _for_disk).
+        """
+        if not key:
+            return
+        with self._mutex:
+            if not self._loaded:
+                self.load()
+            self._remember(key, result)
+            disk = _for_disk(result, _field_limit())
+            line = (json.dumps({"k": key, "t": round(time.time(), 3), "tool": tool, "r": disk}) + "\n").encode("utf-8")
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "ab") as f:
+                    offset = f.tell()
+                    f.write(line)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._index.pop(key, None)
+                self._index[key] = (offset, len(line))
+                self.records += 1
+                if len(self._index) > self._max_entries:
+                    self._compact_locked()
+            except Exception as e:
+                log_unique(f"⚠️ Could not record execution in ledger {self.path}: {e}")
+
+    def _remember(self, key: LedgerKey, result: Dict[str, Any]) -> None:
+        self._lru[key] = result
+        self._lru.move_to_end(key)
+        while len(self._lru) > self._memory_entries:
+            self._lru.popitem(last=False)
+
+    def _compact_locked(self) -> None:
+        keep = list(self._index.items())[-(self._max_entries // 2):]
+        tmp = f"{self.path}.tmp-{os.getpid()}"
+        new_index: "OrderedDict[LedgerKey, Tuple[int, int]]" = OrderedDict()
+        with open(self.path, "rb") as src, open(tmp, "wb") as dst:
+            for key, (offset, length) in keep:
+                src.seek(offset)
+                data = src.read(length)
+                new_index[key] = (dst.tell(), len(data))
+                dst.write(data)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp, self.path)
+        self._index = new_index
+        self.compactions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "entries": len(self._index),
+            "memory": len(self._lru),
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "records": self.records,
+            "compactions": self.compactions,
+        }
+
+
+_ledgers: Dict[str, ExecutionLedger] = {}
+
+
+def get_ledger() -> Optional[ExecutionLedger]:
+    """Process-wide ledger for the current environment, or None when disabled."""
+    if os.getenv("AWFL_LEDGER", "1") == "0":
+        return None
+    path = os.path.expanduser(os.getenv("AWFL_LEDGER_PATH") or f"~/.awfl/ledger{_get_workflow_env_suffix()}.jsonl")
+    ledger = _ledgers.get(path)
+    if ledger is None:
+        try:
+            memory_entries = int(os.getenv("AWFL_LEDGER_MEMORY_ENTRIES", "256"))
+        except Exception:
+            memory_entries = 256
+        try:
+            max_entries = int(os.getenv("AWFL_LEDGER_MAX_ENTRIES", "5000"))
+        except Exception:
+            max_entries = 5000
+        ledger = ExecutionLedger(path, memory_entries=memory_entries, max_entries=max_entries)
+        _ledgers[path] = ledger
+    return ledger
+
+
+def ledger_stats() -> Dict[str, Dict[str, Any]]:
+    return {path: l.stats() for path, l in list(_ledgers.items())}
+
+
+__all__ = ["ExecutionLedger", "get_ledger", "ledger_key", "ledger_stats"]
@@ -0,0 +1,209 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from awfl.utils import log_unique, _get_workflow_env_suffix
+
+# Bounded capture of a command's stdout/stderr.
+#
+# Each stream keeps the first `head_bytes` and the last `tail_bytes` in memory
+# and only counts the rest, so a chatty command costs at most
+# head + 2 * tail + one read chunk per stream. When the output outgrows that
+# window and spilling is on (opt-in), the full stream is written to a file
+# under ~/.awfl/command-output{suffix}/ (opened lazily, so commands with short
+# output never touch disk); the path goes back in the tool result and the agent
+# can page through it with READ_FILE. Only the newest AWFL_COMMAND_SPILL_KEEP
+# files are kept. feed() runs on the event loop, so the file is written by a
+# per-stream writer thread that feed() only hands chunks to.
+#
+# Env: AWFL_COMMAND_HEAD_BYTES (25000), AWFL_COMMAND_TAIL_BYTES (25000),
+# AWFL_COMMAND_SPILL (0), AWFL_COMMAND_SPILL_MAX_BYTES (100 MiB per stream),
+# AWFL_COMMAND_SPILL_KEEP (20), AWFL_COMMAND_SPILL_DIR.
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def spill_dir() -> str:
+    return os.path.expanduser(
+        os.getenv("AWFL_COMMAND_SPILL_DIR") or f"~/.awfl/command-output{_get_workflow_env_suffix()}"
+    )
+
+
+def spill_enabled(event_value: Any = None) -> bool:
+    """Event `spill_output` wins when present; otherwise AWFL_COMMAND_SPILL (off by default)."""
+    if event_value is not None:
+        return bool(event_value)
+    return os.getenv("AWFL_COMMAND_SPILL", "0") not in ("", "0")
+
+
+def _prune(directory: str, keep: int) -> None:
+    try:
+        names = [n for n in os.listdir(directory) if n.endswith(".log")]
+    except OSError:
+        return
+    if len(names) <= keep:
+        return
+    paths = sorted((os.path.join(directory, n) for n in names), key=lambda p: os.path.getmtime(p))
+    for p in paths[: len(paths) - keep]:
+        try:
+            os.remove(p)
+        except OSError:
+            pass
+
+
+def _skip_continuation(b: bytes) -> bytes:
+    # A cut tail may start inside a UTF-8 sequence; drop the orphaned continuation bytes
+    i = 0
+    while i < len(b) and i < 3 and (b[i] & 0xC0) == 0x80:
+        i += 1
+    return b[i:]
+
+
+class BoundedCapture:
+    def __init__(
+        self,
+        name: str,
+        *,
+        head_bytes: Optional[int] = None,
+        tail_bytes: Optional[int] = None,
+        spill: bool = False,
+        spill_prefix: Optional[str] = None,
+    ):
+        self.name = name
+        self.head_bytes = max(0, head_bytes if head_bytes is not None else _env_int("AWFL_COMMAND_HEAD_BYTES", 25000))
+        self.tail_bytes = max(0, tail_bytes if tail_bytes is not None else _env_int("AWFL_COMMAND_TAIL_BYTES", 25000))
+        self._head = bytearray()
+        self._tail = bytearray()
+        self.total_bytes = 0
+        self.lines = 0
+        self._last_byte = b""
+        self._spill_wanted = spill
+        self._spill_prefix = spill_prefix or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self._spill_max = _env_int("AWFL_COMMAND_SPILL_MAX_BYTES", 100 * 2**20)
+        self._spill_queue: "Optional[queue.SimpleQueue[Optional[bytes]]]" = None
+        self._spill_thread: Optional[threading.Thread] = None
+        self._spill_failed = False
+        # Queued counts what feed() handed over (bounded by _spill_max); written what reached the file
+        self._spill_queued = 0
+        self._spill_written = 0
+        self.spill_path: Optional[str] = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.total_bytes > self.head_bytes + self.tail_bytes
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.total_bytes += len(chunk)
+        self.lines += chunk.count(b"\n")
+        self._last_byte = chunk[-1:]
+        room = self.head_bytes - len(self._head)
+        if room > 0:
+            self._head.extend(chunk[:room])
+            chunk = chunk[room:]
+        if not chunk:
+            return
+        self._tail.extend(chunk)
+        if self._spill_thread is not None:
+            self._write_spill(chunk)
+        elif self._spill_wanted and self.truncated:
+            # Nothing has been dropped yet: head + tail still hold the whole stream
+            self._open_spill()
+        # Trim in batches so the ring costs amortized O(1) per byte
+        if len(self._tail) > 2 * self.tail_bytes:
+            del self._tail[: len(self._tail) - self.tail_bytes]
+
+    def _open_spill(self) -> None:
+        self._spill_wanted = False
+        d = spill_dir()
+        self.spill_path = os.path.join(d, f"{self._spill_prefix}.{self.name}.log")
+        self._spill_queue = queue.SimpleQueue()
+        self._spill_thread = threading.Thread(target=self._spill_loop, args=(d,), name=f"spill-{self.name}", daemon=True)
+        self._spill_thread.start()
+        self._write_spill(bytes(self._head))
+        self._write_spill(bytes(self._tail))
+
+    def _write_spill(self, data: bytes) -> None:
+        # Only queues: the writer thread does the file I/O
+        if self._spill_queue is None or self._spill_failed or not data:
+            return
+        room = self._spill_max - self._spill_queued
+        if room <= 0:
+            return
+        self._spill_queue.put(data[:room])
+        self._spill_queued += min(len(data), room)
+
+    def _spill_loop(self, directory: str) -> None:
+        q = self._spill_queue
+        f = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            f = open(self.spill_path, "wb")
+            _prune(directory, max(1, _env_int("AWFL_COMMAND_SPILL_KEEP", 20)))
+        except Exception as e:
+            log_unique(f"⚠️ Could not spill command output to disk: {e}")
+            self._spill_failed = True
+            self.spill_path = None
+        while True:
+            data = q.get()
+            if data is None:
+                break
+            if f is None or self._spill_failed:
+                continue
+            try:
+                f.write(data)
+                self._spill_written += len(data)
+            except Exception as e:
+                log_unique(f"⚠️ Command output spill failed: {e}")
+                self._spill_failed = True
+        if f is not None:
+            try:
+                f.close()
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        """Flush and close the spill file; blocks until the writer thread is done."""
+        t = self._spill_thread
+        self._spill_thread = None
+        if t is not None:
+            self._spill_queue.put(None)
+            t.join()
+
+    async def aclose(self) -> None:
+        if self._spill_thread is not None:
+            await asyncio.to_thread(self.close)
+
+    def text(self) -> str:
+        """Head and tail decoded; an elision marker stands in for what was not kept."""
+        if not self.truncated:
+            return (bytes(self._head) + bytes(self._tail)).decode("utf-8", errors="replace")
+        tail = bytes(self._tail[-self.tail_bytes:]) if self.tail_bytes else b""
+        omitted = self.total_bytes - len(self._head) - len(tail)
+        marker = f"\n... [{omitted} bytes omitted; {self.total_bytes} bytes, {self.line_count} lines total] ...\n"
+        return bytes(self._head).decode("utf-8", errors="replace") + marker + _skip_continuation(tail).decode("utf-8", errors="replace")
+
+    @property
+    def line_count(self) -> int:
+        # A final line without a trailing newline still counts
+        return self.lines + (1 if self.total_bytes and self._last_byte != b"\n" else 0)
+
+    def summary(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"bytes": self.total_bytes, "lines": self.line_count, "truncated": self.truncated}
+        if self.spill_path:
+            out["path"] = self.spill_path
+            out["spill_complete"] = self._spill_written >= self.total_bytes
+        return out
+
+
+__all__ = ["BoundedCapture", "spill_dir", "spill_enabled"]
@@ -0,0 +1,203 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from awfl.utils import log_unique
+
+# LRU cache of READ_FILE pages.
+#
+# Keys are (realpath, inode, size, mtime_ns, window), so an edit that changes
+# any part of the file's identity misses naturally. Two sources of explicit
+# invalidation cover edits the identity misses, e.g. a same-size rewrite in
+# the same mtime tick on filesystems with coarse timestamps:
+# - our own UPDATE_FILE writes (invalidate_path after each write);
+# - a watchdog observer on the directories of cached files, which also
+#   catches editors and builds.
+# Files modified within the last RACY_SECS are not cached at all (as git does
+# for "racily clean" index entries), so a rewrite within one timestamp tick
+# cannot hide behind an unchanged identity even before the watcher reports it.
+# Eviction is least-recently-used against a byte budget, counted by page size.
+#
+# Env: AWFL_READ_CACHE_BYTES (64 MiB; 0 disables), AWFL_READ_CACHE_WATCH (1),
+# AWFL_READ_CACHE_WATCH_DIRS (64 directories at most).
+
+Identity = Tuple[str, int, int, int]
+
+_ENTRY_OVERHEAD = 256
+RACY_SECS = 2.0
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def identity(path: str, st: os.stat_result) -> Identity:
+    return (os.path.realpath(path), st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class ReadCache:
+    def __init__(self, budget_bytes: Optional[int] = None, *, watch: Optional[bool] = None):
+        self.budget_bytes = budget_bytes if budget_bytes is not None else _env_int("AWFL_READ_CACHE_BYTES", 64 * 2**20)
+        self._watch_wanted = watch if watch is not None else os.getenv("AWFL_READ_CACHE_WATCH", "1") != "0"
+        self._entries: "OrderedDict[Tuple[Identity, Hashable], Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._by_path: Dict[str, Set[Tuple[Identity, Hashable]]] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.counts = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "racy_skips": 0}
+        # Separate from _lock: watchdog holds its own lock while dispatching to invalidate_path
+        self._watch_lock = threading.Lock()
+        self._observer = None
+        self._watched: Set[str] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_bytes > 0
+
+    def get(self, ident: Identity, window: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            hit = self._entries.get((ident, window))
+            if hit is None:
+                self.counts["misses"] += 1
+                return None
+            self._entries.move_to_end((ident, window))
+            self.counts["hits"] += 1
+            return dict(hit[0])
+
+    def put(self, ident: Identity, window: Hashable, page: Dict[str, Any]) -> None:
+        cost = len(page.get("content") or "") + _ENTRY_OVERHEAD
+        # One page may not take over the cache
+        if not self.enabled or cost > self.budget_bytes // 4:
+            return
+        if time.time_ns() - ident[3] < RACY_SECS * 1e9:
+            self.counts["racy_skips"] += 1
+            return
+        key = (ident, window)
+        path = ident[0]
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            # Pages from an older version of the file can never hit again
+            for stale in [k for k in self._by_path.get(path, ()) if k[0] != ident]:
+                self._drop(stale)
+            self._entries[key] = (dict(page), cost)
+            self._by_path.setdefault(path, set()).add(key)
+            self.bytes += cost
+            while self.bytes > self.budget_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+                self.counts["evictions"] += 1
+        self._watch_dir(os.path.dirname(path))
+
+    def _drop(self, key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+        keys = self._by_path.get(key[0][0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                self._by_path.pop(key[0][0], None)
+
+    def invalidate_path(self, path: str) -> int:
+        real = os.path.realpath(path)
+        with self._lock:
+            keys = list(self._by_path.get(real, ()))
+            for k in keys:
+                self._drop(k)
+            if keys:
+                self.counts["invalidations"] += 1
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_path.clear()
+            self.bytes = 0
+
+    # ----- file watcher -----
+
+    def _watch_dir(self, directory: str) -> None:
+        if not self._watch_wanted or directory in self._watched:
+            return
+        with self._watch_lock:
+            if directory in self._watched or len(self._watched) >= max(0, _env_int("AWFL_READ_CACHE_WATCH_DIRS", 64)):
+                return
+            try:
+                if self._observer is None:
+                    from watchdog.observers import Observer
+
+                    self._observer = Observer()
+                    self._observer.daemon = True
+                    self._observer.start()
+                self._observer.schedule(_Invalidator(self), directory, recursive=False)
+                self._watched.add(directory)
+            except Exception as e:
+                # Identity keys and UPDATE_FILE invalidation still apply
+                self._watch_wanted = False
+                log_unique(f"⚠️ READ_FILE cache watcher unavailable: {e}")
+
+    def stop_watching(self) -> None:
+        with self._watch_lock:
+            obs = self._observer
+            self._observer = None
+            self._watched.clear()
+        if obs is not None:
+            try:
+                obs.stop()
+                obs.join(timeout=2)
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counts["hits"] + self.counts["misses"]
+            return {
+                **self.counts,
+                "hit_rate": round(self.counts["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "budget_bytes": self.budget_bytes,
+                "watched_dirs": len(self._watched),
+            }
+
+
+_CHANGE_EVENTS = {"modified", "created", "deleted", "moved", "closed"}
+
+
+class _Invalidator:
+    """watchdog handler: any change under a watched directory drops the affected paths."""
+
+    def __init__(self, cache: ReadCache):
+        self._cache = cache
+
+    def dispatch(self, event) -> None:
+        # inotify also reports opens/closes, including our own reads
+        if getattr(event, "event_type", None) not in _CHANGE_EVENTS:
+            return
+        for attr in ("src_path", "dest_path"):
+            p = getattr(event, attr, None)
+            if p:
+                self._cache.invalidate_path(os.fsdecode(p))
+
+
+_cache = ReadCache()
+
+
+def get_read_cache() -> ReadCache:
+    return _cache
+
+
+def invalidate_path(path: str) -> int:
+    return _cache.invalidate_path(path)
+
+
+def read_cache_stats() -> Dict[str, Any]:
+    return _cache.stats()
+
+
+__all__ = ["ReadCache", "identity", "get_read_cache", "invalidate_path", "read_cache_stats"]
@@ -1,7 +1,8 @@
 import time
-from datetime import datetime
 from urllib.parse import urlparse
 
+from awfl.utils.timestamps import parse_timestamp
+
 
 def mask_headers(headers: dict) -> dict:
     masked = dict(headers)
@@ -11,21 +12,8 @@ def mask_headers(headers: dict) -> dict:
 
 
 def ts_to_ms(ts: str | None) -> int:
-    if not ts:
-        return 0
-    s = str(ts).strip()
-    try:
-        # Handle common ISO8601 with Z or offset
-        if s.endswith("Z"):
-            s = s[:-1] + "+00:00"
-        dt = datetime.fromisoformat(s)
-        return int(dt.timestamp() * 1000)
-    except Exception:
-        # Fallback: try numeric seconds
-        try:
-            return int(float(s) * 1000)
-        except Exception:
-            return 0
+    secs = parse_timestamp(ts)
+    return int(secs * 1000) if secs is not None else 0
 
 
 def is_background_from_payload(data: dict) -> bool:
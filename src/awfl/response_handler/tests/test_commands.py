@@ -0,0 +1,147 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from awfl.response_handler import commands, handler
+from awfl.response_handler.commands import ProgressStreamer, command_stats, run_command, stream_options
+
+
+class TestRunCommand(unittest.IsolatedAsyncioTestCase):
+    async def test_output_exit_code_and_cwd(self):
+        with tempfile.TemporaryDirectory() as d:
+            res = await run_command("pwd; echo oops >&2; exit 3", cwd=d)
+        self.assertEqual(res["stdout"].strip(), os.path.realpath(d))
+        self.assertEqual(res["stderr"].strip(), "oops")
+        self.assertEqual((res["exit_code"], res["timed_out"]), (3, False))
+
+    async def test_large_output_is_drained(self):
+        res = await run_command("head -c 3000000 /dev/zero | tr '\\0' x")
+        self.assertEqual(res["stdout_info"]["bytes"], 3_000_000)
+        self.assertTrue(res["stdout"].endswith("x" * 1000))
+
+    async def test_commands_run_concurrently_without_blocking_the_loop(self):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        t = asyncio.create_task(ticker())
+        t0 = time.monotonic()
+        try:
+            results = await asyncio.gather(*(run_command("sleep 0.4; echo done") for _ in range(4)))
+        finally:
+            t.cancel()
+        self.assertLess(time.monotonic() - t0, 1.2)
+        self.assertGreater(ticks, 20)
+        self.assertEqual([r["stdout"].strip() for r in results], ["done"] * 4)
+
+    async def test_timeout_kills_process_group_and_keeps_partial_output(self):
+        with mock.patch.dict(os.environ, {"AWFL_COMMAND_KILL_GRACE_SECS": "0.5"}):
+            t0 = time.monotonic()
+            res = await run_command("echo started; sleep 30 & sleep 30", timeout=0.3)
+        self.assertLess(time.monotonic() - t0, 3)
+        self.assertEqual((res["exit_code"], res["timed_out"]), (None, True))
+        self.assertEqual(res["stdout"].strip(), "started")
+
+    async def test_zero_grace_still_bounds_the_reader_wait(self):
+        timeouts = []
+        real_wait = asyncio.wait
+
+        async def spy_wait(fs, **kw):
+            timeouts.append(kw.get("timeout"))
+            return await real_wait(fs, **kw)
+
+        with mock.patch.dict(os.environ, {"AWFL_COMMAND_KILL_GRACE_SECS": "0"}), mock.patch.object(commands.asyncio, "wait", spy_wait):
+            res = await run_command("echo hi")
+        self.assertEqual(res["stdout"].strip(), "hi")
+        # timeout=None would wait forever on a background child holding the pipes
+        self.assertEqual(timeouts, [0.1])
+
+    async def test_cancel_terminates_command(self):
+        with tempfile.TemporaryDirectory() as d:
+            marker = os.path.join(d, "after")
+            task = asyncio.create_task(run_command(f"sleep 1 && touch {marker}"))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await asyncio.sleep(1.2)
+            self.assertFalse(os.path.exists(marker))
+        self.assertEqual(command_stats()["running"], 0)
+
+    async def test_handler_reports_timeout(self):
+        sent = []
+
+        async def fake_post(_cb, payload, **_kw):
+            sent.append(payload)
+
+        ev = {
+            "callback_id": "cb1",
+            "timeout_seconds": 0.2,
+            "tool_call": {"function": {"name": "run_command", "arguments": '{"command": "echo hi; sleep 5"}'}},
+        }
+        with mock.patch.object(handler, "post_internal_callback", fake_post), mock.patch.object(handler, "get_ledger", lambda: None):
+            await handler.handle_response(ev)
+        self.assertEqual(len(sent), 1)
+        self.assertTrue(sent[0]["timed_out"])
+        self.assertIsNone(sent[0]["exitCode"])
+        self.assertEqual(sent[0]["output"], "hi")
+
+    async def test_handler_streams_progress_before_final_result(self):
+        sent = []
+
+        async def fake_post(_cb, payload, **_kw):
+            sent.append(payload)
+
+        ev = {
+            "callback_id": "cb2",
+            "stream_output": {"interval_secs": 0.25},
+            "tool_call": {
+                "function": {"name": "run_command", "arguments": '{"command": "echo one; sleep 0.4; echo two; sleep 0.4"}'}
+            },
+        }
+        with mock.patch.object(handler, "post_internal_callback", fake_post), mock.patch.object(handler, "get_ledger", lambda: None):
+            await handler.handle_response(ev)
+        progress, final = sent[:-1], sent[-1]
+        self.assertGreaterEqual(len(progress), 2)
+        self.assertTrue(all(p["progress"] for p in progress))
+        self.assertEqual([p["seq"] for p in progress], list(range(1, len(progress) + 1)))
+        self.assertEqual("".join(p["stdoutDelta"] for p in progress), "one\ntwo\n")
+        self.assertNotIn("progress", final)
+        self.assertEqual(final["output"], "one\ntwo")
+        self.assertEqual((final["streamed"], final["progressUpdates"]), (True, len(progress)))
+
+
+class TestProgressStreamer(unittest.IsolatedAsyncioTestCase):
+    async def test_delta_cap_and_split_utf8(self):
+        posts = []
+
+        async def send(p):
+            posts.append(p)
+
+        s = ProgressStreamer(send, interval_secs=60, max_delta_chars=4)
+        s.feed("stdout", "é".encode()[:1])
+        s.feed("stdout", "é".encode()[1:] + b"abcdef")
+        await s._post()
+        self.assertEqual(posts[0]["stdoutDelta"], "cdef")
+        self.assertEqual(posts[0]["skippedChars"], 3)
+        await s._post()
+        self.assertEqual((posts[1]["stdoutDelta"], posts[1]["seq"]), ("", 2))
+        self.assertNotIn("skippedChars", posts[1])
+
+    def test_stream_options(self):
+        self.assertIsNone(stream_options(None))
+        self.assertIsNone(stream_options(False))
+        self.assertEqual(stream_options({"interval_secs": 0.01, "max_delta_chars": 10}), {"interval_secs": 0.25, "max_delta_chars": 256})
+        with mock.patch.dict(os.environ, {"AWFL_STREAM_INTERVAL_SECS": "5"}):
+            self.assertEqual(stream_options(True)["interval_secs"], 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
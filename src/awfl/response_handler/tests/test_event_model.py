@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from awfl.consumer.routing import event_session_id, forward_event
+from awfl.events import model
+from awfl.events.model import Event
+from awfl.response_handler import handler
+
+
+def _tool_event(name: str, arguments, **extra) -> dict:
+    return {"callback_id": "cb-1", "tool_call": {"function": {"name": name, "arguments": arguments}}, **extra}
+
+
+class TestEventModel(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.callbacks = []
+
+        async def fake_callback(callback_id, payload, correlation_id=None):
+            self.callbacks.append((callback_id, payload))
+
+        patches = [
+            mock.patch.object(handler, "post_internal_callback", fake_callback),
+            mock.patch.dict(os.environ, {"AWFL_LEDGER": "0"}),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_fields_and_session_id(self):
+        ev = Event(_tool_event("read_file", '{"filepath": "a.txt"}', attributes={"sessionId": "s-1"}))
+        self.assertEqual(ev.tool_name, "READ_FILE")
+        self.assertEqual(ev.args, {"filepath": "a.txt"})
+        self.assertEqual(event_session_id(ev), "s-1")
+        self.assertIs(Event.coerce(ev), ev)
+
+    async def test_arguments_decoded_once_for_log_and_execute(self):
+        with tempfile.TemporaryDirectory() as d:
+            args = json.dumps({"filepath": "out.txt", "content": "hi"})
+            calls = []
+            real = model.json_loads
+
+            def counting_loads(s):
+                calls.append(s)
+                return real(s)
+
+            with mock.patch.object(model, "json_loads", counting_loads):
+                await forward_event(_tool_event("UPDATE_FILE", args, workdir=d), mode="both")
+            self.assertEqual(calls, [args])
+            with open(os.path.join(d, "out.txt")) as f:
+                self.assertEqual(f.read(), "hi")
+            self.assertEqual(self.callbacks[0][1]["filepath"], "out.txt")
+
+    async def test_bad_arguments_reported_by_handler(self):
+        await handler.handle_response(_tool_event("READ_FILE", "{not json"))
+        self.assertIn("Failed to parse tool arguments", self.callbacks[0][1]["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
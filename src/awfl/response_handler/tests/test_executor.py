@@ -0,0 +1,157 @@
+import asyncio
+import gc
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from awfl.events.model import Event
+from awfl.response_handler import handler
+from awfl.response_handler.executor import ToolContext, ToolExecutor, cancel_session_tools
+
+
+def _ctx(tool: str, session: str, sent: list, args=None) -> ToolContext:
+    ev = Event({"callback_id": f"cb-{len(sent)}", "attributes": {"sessionId": session}, "tool_call": {"function": {"name": tool, "arguments": "{}"}}})
+
+    async def send(payload):
+        sent.append(payload)
+
+    return ToolContext(ev, args or {}, session_id=session, send_result=send)
+
+
+class TestToolExecutor(unittest.IsolatedAsyncioTestCase):
+    async def test_pool_limit_is_enforced(self):
+        ex = ToolExecutor()
+        running = peak = 0
+
+        async def slow(ctx):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+
+        ex.register("SLOW", slow, pool="command")
+        sent = []
+        with mock.patch.dict(os.environ, {"AWFL_TOOL_CONCURRENCY_COMMAND": "2"}):
+            results = await asyncio.gather(*(ex.execute(_ctx("SLOW", f"s{i}", sent)) for i in range(6)))
+        self.assertEqual(results, [True] * 6)
+        self.assertEqual(peak, 2)
+        self.assertEqual(ex.stats()["completed"], 6)
+        self.assertFalse(await ex.execute(_ctx("NOPE", "s", sent)))
+
+    async def test_cancel_session_reports_cancelled_results(self):
+        ex = ToolExecutor()
+
+        async def forever(ctx):
+            await asyncio.sleep(30)
+
+        ex.register("WAIT", forever, pool="command")
+        sent = []
+        with mock.patch.dict(os.environ, {"AWFL_TOOL_CONCURRENCY_COMMAND": "1"}):
+            tasks = [asyncio.create_task(ex.execute(_ctx("WAIT", "a", sent))) for _ in range(2)]
+            other = asyncio.create_task(ex.execute(_ctx("WAIT", "b", sent)))
+            await asyncio.sleep(0.05)
+            self.assertEqual(ex.stats()["inflight"], 3)
+            # One running, one still queued behind the limit: both are cancelled
+            self.assertEqual(ex.cancel_session("a"), 2)
+            await asyncio.gather(*tasks)
+        self.assertEqual(len(sent), 2)
+        self.assertTrue(all(p["cancelled"] for p in sent))
+        self.assertFalse(other.done())
+        self.assertEqual(ex.cancel_session(None), 1)
+        await other
+        self.assertEqual(ex.stats()["cancelled"], 3)
+        self.assertEqual(ex.stats()["inflight"], 0)
+
+    async def test_pool_timeout(self):
+        ex = ToolExecutor()
+
+        async def slow(ctx):
+            await asyncio.sleep(5)
+
+        ex.register("SLOW_FILE", slow, pool="file")
+        sent = []
+        with mock.patch.dict(os.environ, {"AWFL_TOOL_TIMEOUT_FILE": "0.05"}):
+            await ex.execute(_ctx("SLOW_FILE", "s", sent))
+        self.assertTrue(sent[0]["timed_out"])
+
+    async def test_thread_backed_tool_is_not_timed_out_or_stopped(self):
+        ex = ToolExecutor()
+        release = threading.Event()
+
+        async def write(ctx):
+            await asyncio.to_thread(release.wait, 5)
+            await ctx.send_result({"written": True})
+
+        ex.register("WRITE", write, pool="file", cancellable=False)
+        sent = []
+        with mock.patch.dict(os.environ, {"AWFL_TOOL_TIMEOUT_FILE": "0.05"}):
+            t = asyncio.create_task(ex.execute(_ctx("WRITE", "s", sent)))
+            await asyncio.sleep(0.15)
+            self.assertEqual(ex.cancel_session("s"), 0)
+            release.set()
+            await t
+        # Only the real result, never a false timed_out/cancelled one
+        self.assertEqual(sent, [{"written": True}])
+
+    async def test_caller_cancellation_propagates(self):
+        ex = ToolExecutor()
+        started = asyncio.Event()
+
+        async def forever(ctx):
+            started.set()
+            await asyncio.sleep(30)
+
+        ex.register("WAIT", forever)
+        sent = []
+        t = asyncio.create_task(ex.execute(_ctx("WAIT", "s", sent)))
+        await started.wait()
+        t.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await t
+        self.assertEqual(sent, [])
+
+
+class TestSemaphoresPerLoop(unittest.TestCase):
+    def test_semaphores_go_away_with_their_loop(self):
+        ex = ToolExecutor()
+
+        async def noop(ctx):
+            pass
+
+        ex.register("NOOP", noop)
+        for _ in range(3):
+            asyncio.run(ex.execute(_ctx("NOOP", "s", [])))
+        gc.collect()
+        self.assertEqual(len(ex._sems), 0)
+
+
+class TestStopCancelsRunCommand(unittest.IsolatedAsyncioTestCase):
+    async def test_stop_kills_session_command(self):
+        sent = []
+
+        async def fake_post(_cb, payload, **_kw):
+            sent.append(payload)
+
+        with tempfile.TemporaryDirectory() as d:
+            marker = os.path.join(d, "after")
+            ev = {
+                "callback_id": "cb-stop",
+                "attributes": {"sessionId": "sess-1"},
+                "tool_call": {"function": {"name": "run_command", "arguments": {"command": f"sleep 1 && touch {marker}"}}},
+            }
+            with mock.patch.object(handler, "post_internal_callback", fake_post), mock.patch.object(handler, "get_ledger", lambda: None):
+                t = asyncio.create_task(handler.handle_response(ev))
+                await asyncio.sleep(0.2)
+                self.assertEqual(cancel_session_tools("sess-1"), 1)
+                await t
+            await asyncio.sleep(1.1)
+            self.assertFalse(os.path.exists(marker))
+        self.assertEqual(len(sent), 1)
+        self.assertTrue(sent[0]["cancelled"])
+
+
+if __name__ == "__main__":
+    unittest.main()
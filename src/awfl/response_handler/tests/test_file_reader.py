@@ -0,0 +1,95 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from awfl.response_handler import file_reader
+from awfl.response_handler.file_reader import read_range
+
+
+class TestReadRange(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "big.log")
+        with open(self.path, "w") as f:
+            f.write("".join(f"line {i}\n" for i in range(1, 1001)))
+        self.size = os.path.getsize(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_default_reads_only_max_bytes(self):
+        page = read_range(self.path, {}, max_bytes=20)
+        self.assertEqual(page["content"], "line 1\nline 2\nline 3")
+        self.assertTrue(page["truncated"])
+        self.assertEqual((page["size"], page["offset"], page["length"], page["nextOffset"]), (self.size, 0, 20, 20))
+
+    def test_byte_window_pages_through_file(self):
+        pieces, offset = [], 0
+        while True:
+            page = read_range(self.path, {"offset": offset, "length": 4096}, max_bytes=1000)
+            pieces.append(page["content"])
+            if "nextOffset" not in page:
+                break
+            offset = page["nextOffset"]
+        with open(self.path) as f:
+            self.assertEqual("".join(pieces), f.read())
+
+    def test_line_range(self):
+        page = read_range(self.path, {"start_line": 10, "end_line": 12}, max_bytes=10000)
+        self.assertEqual(page["content"], "line 10\nline 11\nline 12\n")
+        self.assertEqual((page["totalLines"], page["startLine"], page["endLine"], page["nextLine"]), (1000, 10, 12, 13))
+        self.assertFalse(page["truncated"])
+
+    def test_line_range_cut_by_max_bytes_ends_on_whole_line(self):
+        page = read_range(self.path, {"start_line": 998}, max_bytes=12)
+        self.assertEqual(page["content"], "line 998\n")
+        self.assertTrue(page["truncated"])
+        self.assertEqual((page["endLine"], page["nextLine"], page["length"]), (998, 999, 9))
+        last = read_range(self.path, {"start_line": 1000, "end_line": 5000}, max_bytes=100)
+        self.assertEqual(last["content"], "line 1000\n")
+        self.assertNotIn("nextLine", last)
+
+    def test_line_longer_than_max_bytes_pages_by_offset(self):
+        with open(self.path, "w") as f:
+            f.write("short\n" + "x" * 50 + "\nend\n")
+        page = read_range(self.path, {"start_line": 2}, max_bytes=20)
+        self.assertEqual(page["content"], "x" * 20)
+        self.assertTrue(page["truncated"])
+        self.assertNotIn("nextLine", page)
+        self.assertNotIn("endLine", page)
+        rest = read_range(self.path, {"offset": page["nextOffset"]}, max_bytes=100)
+        self.assertEqual(rest["content"], "x" * 30 + "\nend\n")
+
+    def test_index_spans_blocks_and_is_cached_until_file_changes(self):
+        with mock.patch.object(file_reader, "BLOCK_SIZE", 64):
+            before = file_reader.reader_stats()["index_builds"]
+            for n in (1, 7, 333, 1000):
+                page = read_range(self.path, {"start_line": n, "end_line": n}, max_bytes=100)
+                self.assertEqual(page["content"], f"line {n}\n")
+            self.assertEqual(file_reader.reader_stats()["index_builds"], before + 1)
+            # Byte reads report the line count once an index exists
+            self.assertEqual(read_range(self.path, {"offset": 0, "length": 1}, max_bytes=100)["totalLines"], 1000)
+            with open(self.path, "a") as f:
+                f.write("tail without newline")
+            page = read_range(self.path, {"start_line": 1001}, max_bytes=100)
+            self.assertEqual(page["content"], "tail without newline")
+            self.assertEqual(page["totalLines"], 1001)
+            self.assertEqual(file_reader.reader_stats()["index_builds"], before + 2)
+
+    def test_cut_does_not_split_utf8(self):
+        path = os.path.join(self.tmp.name, "u.txt")
+        with open(path, "wb") as f:
+            f.write("aé€".encode())
+        page = read_range(path, {}, max_bytes=4)
+        self.assertEqual((page["content"], page["length"], page["nextOffset"]), ("aé", 3, 3))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            read_range(self.path, {"offset": -1}, max_bytes=10)
+        with self.assertRaises(ValueError):
+            read_range(self.path, {"offset": 0, "start_line": 1}, max_bytes=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import difflib
+import os
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+from awfl.response_handler import file_writer
+from awfl.response_handler.file_writer import (
+    PatchConflict,
+    PatchError,
+    apply_line_edits,
+    apply_unified_diff,
+    content_hash,
+    update_file_sync,
+)
+
+
+def _diff(a: str, b: str) -> str:
+    return "".join(difflib.unified_diff(a.splitlines(keepends=True), b.splitlines(keepends=True), "a/f", "b/f"))
+
+
+ORIGINAL = "".join(f"line {i}\n" for i in range(1, 5001))
+
+
+class TestApplyUnifiedDiff(unittest.TestCase):
+    def test_round_trips_difflib_output(self):
+        new = ORIGINAL.replace("line 2500\n", "line 2500 changed\n").replace("line 10\n", "").replace("line 4999\n", "line 4999\nextra\n")
+        patch = _diff(ORIGINAL, new)
+        self.assertLess(len(patch), len(new) // 100)
+        self.assertEqual(apply_unified_diff(ORIGINAL, patch), new)
+
+    def test_shifted_hunk_still_applies(self):
+        patch = _diff(ORIGINAL, ORIGINAL.replace("line 300\n", "line three hundred\n"))
+        shifted = "header\nheader\n" + ORIGINAL
+        self.assertEqual(apply_unified_diff(shifted, patch), "header\nheader\n" + ORIGINAL.replace("line 300\n", "line three hundred\n"))
+
+    def test_mismatched_context_is_a_conflict(self):
+        patch = _diff(ORIGINAL, ORIGINAL.replace("line 300\n", "x\n"))
+        with self.assertRaises(PatchConflict):
+            apply_unified_diff(ORIGINAL.replace("line 301\n", "edited elsewhere\n"), patch)
+
+    def test_no_newline_at_end_and_crlf(self):
+        patch = "@@ -1,2 +1,3 @@\n a\n-b\n\\ No newline at end of file\n+b\n+c\n\\ No newline at end of file\n"
+        self.assertEqual(apply_unified_diff("a\nb", patch), "a\nb\nc")
+        self.assertEqual(apply_unified_diff("a\r\nb\r\n", "@@ -1,2 +1,2 @@\n a\n-b\n+B\n"), "a\r\nB\r\n")
+
+    def test_new_file_from_diff(self):
+        self.assertEqual(apply_unified_diff("", _diff("", "x\ny\n")), "x\ny\n")
+
+    def test_garbage_is_rejected(self):
+        with self.assertRaises(PatchError):
+            apply_unified_diff("a\n", "not a diff")
+
+
+class TestApplyLineEdits(unittest.TestCase):
+    def test_replace_delete_insert(self):
+        text = "1\n2\n3\n4\n"
+        edits = [
+            {"start_line": 1, "end_line": 1, "content": "one\n"},
+            {"start_line": 3, "end_line": 3, "content": ""},
+            {"start_line": 5, "end_line": 4, "content": "5"},
+        ]
+        self.assertEqual(apply_line_edits(text, edits), "one\n2\n4\n5")
+
+    def test_overlap_and_out_of_range(self):
+        with self.assertRaises(PatchError):
+            apply_line_edits("1\n2\n3\n", [{"start_line": 1, "end_line": 2, "content": ""}, {"start_line": 2, "end_line": 3, "content": ""}])
+        with self.assertRaises(PatchConflict):
+            apply_line_edits("1\n", [{"start_line": 3, "end_line": 3, "content": "x"}])
+
+
+class TestUpdateFileSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "f.txt")
+        with open(self.path, "w") as f:
+            f.write(ORIGINAL)
+        os.chmod(self.path, 0o640)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self) -> str:
+        with open(self.path) as f:
+            return f.read()
+
+    def test_patch_with_base_hash_and_mode_kept(self):
+        base = content_hash(ORIGINAL.encode())
+        new = ORIGINAL.replace("line 7\n", "seven\n")
+        out = update_file_sync(self.path, {"patch": _diff(ORIGINAL, new), "base_hash": base})
+        self.assertEqual(self._read(), new)
+        self.assertEqual(out, {"hash": content_hash(new.encode()), "bytes": len(new), "mode": "patch"})
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o640)
+        self.assertEqual([n for n in os.listdir(self.tmp.name)], ["f.txt"])
+
+    def test_stale_base_hash_is_a_conflict_and_leaves_file(self):
+        with self.assertRaises(PatchConflict):
+            update_file_sync(self.path, {"content": "x", "base_hash": content_hash(b"other")})
+        self.assertEqual(self._read(), ORIGINAL)
+
+    def test_failed_write_keeps_old_file_and_removes_temp(self):
+        with mock.patch.object(file_writer.os, "replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                update_file_sync(self.path, {"content": "new"})
+        self.assertEqual(self._read(), ORIGINAL)
+        self.assertEqual(os.listdir(self.tmp.name), ["f.txt"])
+
+    def test_invalid_utf8_bytes_survive_an_edit(self):
+        with open(self.path, "wb") as f:
+            f.write(b"caf\xe9\nend\n")
+        update_file_sync(self.path, {"edits": [{"start_line": 2, "end_line": 2, "content": "END\n"}]})
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"caf\xe9\nEND\n")
+
+    def test_identical_content_is_not_rewritten(self):
+        past = os.stat(self.path).st_mtime_ns - 10**9
+        os.utime(self.path, ns=(past, past))
+        before = file_writer.writer_stats()["unchanged"]
+        with mock.patch.object(file_writer, "atomic_write") as write:
+            out = update_file_sync(self.path, {"content": ORIGINAL})
+            self.assertTrue(out["unchanged"])
+            self.assertEqual(out["hash"], content_hash(ORIGINAL.encode()))
+            # A patch that nets out to the same text is a no-op too
+            edits = [{"start_line": 3, "end_line": 3, "content": "line 3\n"}]
+            self.assertTrue(update_file_sync(self.path, {"edits": edits})["unchanged"])
+            write.assert_not_called()
+        self.assertEqual(os.stat(self.path).st_mtime_ns, past)
+        self.assertEqual(file_writer.writer_stats()["unchanged"], before + 2)
+        # Same size, different bytes is still written
+        out = update_file_sync(self.path, {"content": ORIGINAL.replace("line 1\n", "LINE 1\n")})
+        self.assertNotIn("unchanged", out)
+        self.assertTrue(self._read().startswith("LINE 1\n"))
+
+    def test_content_creates_parents(self):
+        path = os.path.join(self.tmp.name, "a", "b", "new.txt")
+        update_file_sync(path, {"content": "hi"})
+        with open(path) as f:
+            self.assertEqual(f.read(), "hi")
+
+
+if __name__ == "__main__":
+    unittest.main()
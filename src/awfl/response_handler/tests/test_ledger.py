@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from awfl.events.model import Event
+from awfl.response_handler import handler, ledger
+from awfl.response_handler.ledger import ExecutionLedger
+
+
+def _run_command_event(command: str, callback_id="cb-run", event_id="41") -> Event:
+    raw = {"callback_id": callback_id, "tool_call": {"function": {"name": "RUN_COMMAND", "arguments": {"command": command}}}}
+    return Event(raw, event_id=event_id)
+
+
+class TestExecutionLedger(unittest.TestCase):
+    def test_disk_index_survives_restart_and_compacts(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "ledger.jsonl")
+            l1 = ExecutionLedger(path, memory_entries=2, max_entries=10)
+            for i in range(11):
+                l1.put(f"cb:{i}", {"n": i})
+            self.assertEqual(l1.compactions, 1)
+            l2 = ExecutionLedger(path)
+            self.assertEqual(l2.get("cb:10"), {"n": 10})
+            self.assertEqual(l2.hits_disk, 1)
+            self.assertIsNone(l2.get("cb:0"))  # dropped by compaction
+            self.assertEqual(l2.get("cb:10"), {"n": 10})
+            self.assertEqual(l2.hits_memory, 1)
+
+    def test_large_output_is_cut_on_disk_only(self):
+        with tempfile.TemporaryDirectory() as d, mock.patch.dict(os.environ, {"AWFL_LEDGER_FIELD_BYTES": "1000"}):
+            path = os.path.join(d, "ledger.jsonl")
+            output = "".join(f"line {i}\n" for i in range(100000))
+            result = {"output": output, "exitCode": 0}
+            l1 = ExecutionLedger(path)
+            l1.put("cb:big", result)
+            self.assertEqual(l1.get("cb:big"), result)
+            self.assertLess(os.path.getsize(path), 2000)
+            replayed = ExecutionLedger(path).get("cb:big")
+            self.assertEqual(replayed["exitCode"], 0)
+            self.assertEqual(replayed["ledger_truncated"], ["output"])
+            self.assertTrue(replayed["output"].startswith("line 0\n"))
+            self.assertTrue(replayed["output"].endswith("line 99999\n"))
+            self.assertIn(f"{len(output)} chars, sha256", replayed["output"])
+
+    def test_key_prefers_callback_id(self):
+        self.assertEqual(ledger.ledger_key("cb", "7"), "cb:cb")
+        self.assertEqual(ledger.ledger_key(None, "7"), "evt:7")
+        self.assertIsNone(ledger.ledger_key(None, None))
+
+
+class TestReplayShortCircuit(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.callbacks = []
+
+        async def fake_callback(callback_id, payload, correlation_id=None):
+            self.callbacks.append((callback_id, payload))
+
+        patches = [
+            mock.patch.object(handler, "post_internal_callback", fake_callback),
+            mock.patch.dict(os.environ, {"AWFL_LEDGER_PATH": os.path.join(self.tmp.name, "ledger.jsonl")}),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    async def test_replayed_run_command_is_not_executed_again(self):
+        marker = os.path.join(self.tmp.name, "runs.txt")
+        cmd = f"echo run >> {marker} && echo done"
+        await handler.handle_response(_run_command_event(cmd))
+        await handler.handle_response(_run_command_event(cmd))
+        with open(marker) as f:
+            self.assertEqual(f.read().count("run"), 1)
+        self.assertEqual(len(self.callbacks), 2)
+        self.assertEqual(self.callbacks[0], self.callbacks[1])
+        self.assertEqual(self.callbacks[1][1]["output"], "done")
+
+    async def test_read_file_is_not_recorded(self):
+        path = os.path.join(self.tmp.name, "a.txt")
+        with open(path, "w") as f:
+            f.write("v1")
+        raw = {"callback_id": "cb-read", "tool_call": {"function": {"name": "READ_FILE", "arguments": {"filepath": path}}}}
+        await handler.handle_response(raw)
+        with open(path, "w") as f:
+            f.write("v2")
+        await handler.handle_response(raw)
+        self.assertEqual([c[1]["content"] for c in self.callbacks], ["v1", "v2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
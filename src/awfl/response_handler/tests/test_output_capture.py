@@ -0,0 +1,99 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from awfl.response_handler.commands import run_command
+from awfl.response_handler.output_capture import BoundedCapture, spill_enabled
+
+
+class TestBoundedCapture(unittest.TestCase):
+    def test_small_output_is_kept_whole(self):
+        cap = BoundedCapture("stdout", head_bytes=10, tail_bytes=10)
+        for part in (b"hello\n", b"world"):
+            cap.feed(part)
+        self.assertEqual(cap.text(), "hello\nworld")
+        self.assertEqual(cap.summary(), {"bytes": 11, "lines": 2, "truncated": False})
+
+    def test_head_and_tail_with_marker_and_bounded_memory(self):
+        cap = BoundedCapture("stdout", head_bytes=8, tail_bytes=8)
+        for i in range(10000):
+            cap.feed(f"line{i:05d}\n".encode())
+            self.assertLessEqual(len(cap._tail), 2 * 8 + 10)
+        text = cap.text()
+        self.assertTrue(text.startswith("line0000"))
+        self.assertTrue(text.endswith("e09999\n"))
+        self.assertIn("bytes omitted; 100000 bytes, 10000 lines total", text)
+        self.assertTrue(cap.summary()["truncated"])
+
+    def test_tail_does_not_start_mid_character(self):
+        cap = BoundedCapture("stdout", head_bytes=0, tail_bytes=5)
+        cap.feed("ééééé".encode())  # 10 bytes; the last 5 start on a continuation byte
+        self.assertTrue(cap.text().endswith("éé"))
+        self.assertNotIn("�", cap.text())
+
+    def test_spill_only_when_truncated_and_holds_everything(self):
+        with tempfile.TemporaryDirectory() as d, mock.patch.dict(os.environ, {"AWFL_COMMAND_SPILL_DIR": d}):
+            small = BoundedCapture("stdout", head_bytes=4, tail_bytes=4, spill=True)
+            small.feed(b"1234567")
+            small.close()
+            self.assertIsNone(small.spill_path)
+
+            cap = BoundedCapture("stdout", head_bytes=4, tail_bytes=4, spill=True)
+            data = b"".join(f"{i}\n".encode() for i in range(5000))
+            for i in range(0, len(data), 7):
+                cap.feed(data[i:i + 7])
+            cap.close()
+            with open(cap.summary()["path"], "rb") as f:
+                self.assertEqual(f.read(), data)
+            self.assertTrue(cap.summary()["spill_complete"])
+
+    def test_spill_is_opt_in_and_written_off_the_calling_thread(self):
+        with mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("AWFL_COMMAND_SPILL", None)
+            self.assertFalse(spill_enabled())
+            self.assertTrue(spill_enabled(True))
+        opened_on = []
+        real_open = open
+
+        def spy_open(*a, **kw):
+            opened_on.append(threading.current_thread())
+            return real_open(*a, **kw)
+
+        with tempfile.TemporaryDirectory() as d, mock.patch.dict(os.environ, {"AWFL_COMMAND_SPILL_DIR": d}):
+            cap = BoundedCapture("stdout", head_bytes=2, tail_bytes=2, spill=True)
+            with mock.patch("builtins.open", spy_open):
+                cap.feed(b"0123456789")
+                cap.close()
+            self.assertEqual(len(opened_on), 1)
+            self.assertIsNot(opened_on[0], threading.current_thread())
+            with open(cap.summary()["path"], "rb") as f:
+                self.assertEqual(f.read(), b"0123456789")
+
+    def test_spill_files_are_pruned(self):
+        with tempfile.TemporaryDirectory() as d, mock.patch.dict(os.environ, {"AWFL_COMMAND_SPILL_DIR": d, "AWFL_COMMAND_SPILL_KEEP": "3"}):
+            for i in range(5):
+                cap = BoundedCapture("stdout", head_bytes=1, tail_bytes=1, spill=True, spill_prefix=f"run{i}")
+                cap.feed(b"abcdef")
+                cap.close()
+            self.assertEqual(len(os.listdir(d)), 3)
+
+
+class TestRunCommandCapture(unittest.IsolatedAsyncioTestCase):
+    async def test_large_output_is_bounded_and_spilled(self):
+        env = {"AWFL_COMMAND_HEAD_BYTES": "1000", "AWFL_COMMAND_TAIL_BYTES": "1000"}
+        with tempfile.TemporaryDirectory() as d, mock.patch.dict(os.environ, {**env, "AWFL_COMMAND_SPILL_DIR": d}):
+            res = await run_command("seq 1 200000", spill=True)
+            info = res["stdout_info"]
+            self.assertLess(len(res["stdout"]), 2200)
+            self.assertTrue(res["stdout"].rstrip().endswith("200000"))
+            self.assertEqual(info["lines"], 200000)
+            self.assertTrue(info["truncated"])
+            with open(info["path"]) as f:
+                self.assertEqual(sum(1 for _ in f), 200000)
+            self.assertEqual(res["stderr_info"], {"bytes": 0, "lines": 0, "truncated": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
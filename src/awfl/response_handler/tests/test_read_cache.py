@@ -0,0 +1,104 @@
+import os
+import tempfile
+import time
+import unittest
+
+from awfl.response_handler import file_reader
+from awfl.response_handler.file_reader import read_range
+from awfl.response_handler.read_cache import ReadCache, get_read_cache, identity
+
+
+def _age(path: str, secs: float = 60) -> None:
+    t = time.time() - secs
+    os.utime(path, (t, t))
+
+
+class TestReadCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "a.txt")
+        with open(self.path, "w") as f:
+            f.write("hello\nworld\n")
+        get_read_cache().clear()
+
+    def tearDown(self):
+        get_read_cache().clear()
+        get_read_cache().stop_watching()
+        self.tmp.cleanup()
+
+    def test_repeated_read_hits_cache_without_disk_read(self):
+        _age(self.path)
+        first = read_range(self.path, {}, max_bytes=100)
+        reads = file_reader.reader_stats()["reads"]
+        before = get_read_cache().stats()["hits"]
+        self.assertEqual(read_range(self.path, {}, max_bytes=100), first)
+        self.assertEqual(file_reader.reader_stats()["reads"], reads)
+        self.assertEqual(get_read_cache().stats()["hits"], before + 1)
+        # A different window is its own entry
+        self.assertEqual(read_range(self.path, {"start_line": 2}, max_bytes=100)["content"], "world\n")
+
+    def test_recently_modified_file_is_not_cached(self):
+        read_range(self.path, {}, max_bytes=100)
+        st = get_read_cache().stats()
+        self.assertEqual(st["entries"], 0)
+        self.assertGreaterEqual(st["racy_skips"], 1)
+
+    def test_same_identity_rewrite_is_invalidated_explicitly(self):
+        _age(self.path)
+        read_range(self.path, {}, max_bytes=100)
+        st = os.stat(self.path)
+        with open(self.path, "w") as f:
+            f.write("HELLO\nWORLD\n")
+        # Same size and restored mtime: the identity alone cannot tell
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        get_read_cache().invalidate_path(self.path)
+        self.assertEqual(read_range(self.path, {}, max_bytes=100)["content"], "HELLO\nWORLD\n")
+
+    def test_changed_identity_misses_and_replaces_stale_pages(self):
+        _age(self.path, 120)
+        read_range(self.path, {}, max_bytes=100)
+        with open(self.path, "a") as f:
+            f.write("more\n")
+        _age(self.path, 60)
+        self.assertEqual(read_range(self.path, {}, max_bytes=100)["content"], "hello\nworld\nmore\n")
+        self.assertEqual(get_read_cache().stats()["entries"], 1)
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        cache = ReadCache(4 * 1024, watch=False)
+        _age(self.path)
+        ident = identity(self.path, os.stat(self.path))
+        page = {"content": "x" * 600}
+        for i in range(4):
+            cache.put(ident, i, page)
+        cache.get(ident, 0)
+        cache.put(ident, 4, page)
+        s = cache.stats()
+        self.assertLessEqual(s["bytes"], 4 * 1024)
+        self.assertGreater(s["evictions"], 0)
+        self.assertIsNotNone(cache.get(ident, 0))
+        self.assertIsNone(cache.get(ident, 1))
+        # Pages over a quarter of the budget are not cached
+        cache.put(ident, "big", {"content": "x" * 2000})
+        self.assertIsNone(cache.get(ident, "big"))
+
+    def test_watcher_invalidates_on_external_change(self):
+        cache = ReadCache(2**20, watch=True)
+        try:
+            _age(self.path)
+            ident = identity(self.path, os.stat(self.path))
+            cache.put(ident, "w", {"content": "hello"})
+            self.assertEqual(cache.stats()["watched_dirs"], 1)
+            time.sleep(0.2)
+            with open(self.path, "a") as f:
+                f.write("!")
+            deadline = time.time() + 5
+            while cache.stats()["entries"] and time.time() < deadline:
+                time.sleep(0.05)
+            self.assertEqual(cache.stats()["entries"], 0)
+            self.assertGreaterEqual(cache.stats()["invalidations"], 1)
+        finally:
+            cache.stop_watching()
+
+
+if __name__ == "__main__":
+    unittest.main()
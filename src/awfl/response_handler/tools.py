@@ -0,0 +1,213 @@
+import asyncio
+import os
+from pathlib import Path
+
+from awfl.utils import log_unique
+
+from .commands import ProgressStreamer, run_command, stream_options
+from .executor import ToolContext, register_tool
+from .file_reader import read_range
+from .file_writer import PatchConflict, PatchError, update_file_sync
+from .output_capture import spill_enabled
+from .read_cache import invalidate_path
+from .rh_utils import sanitize_shell_command
+
+# Built-in tools, registered with the executor on import. Pools: "file" for
+# READ_FILE/UPDATE_FILE, "command" for RUN_COMMAND (see executor for limits).
+
+
+def _resolve_path_for_io(filepath: str | os.PathLike, workdir: str | os.PathLike | None) -> Path:
+    """
+    Map a requested filepath to the provided workdir if present.
+    - Relative paths are interpreted relative to workdir.
+    - Absolute paths are left unchanged.
+    """
+    p = Path(filepath)
+    if not workdir:
+        return p
+    try:
+        wd = Path(workdir)
+    except Exception:
+        return p
+    if p.is_absolute():
+        return p
+    return wd / p
+
+
+def _get_cwd_for_commands(workdir: str | os.PathLike | None) -> str:
+    try:
+        return str(Path(workdir)) if workdir else str(Path.cwd())
+    except Exception:
+        return str(Path.cwd())
+
+
+def _capture_fields(result: dict) -> dict:
+    """Output size/truncation fields for a RUN_COMMAND result (see output_capture)."""
+    out, err = result["stdout_info"], result["stderr_info"]
+    fields = {"outputBytes": out["bytes"], "outputLines": out["lines"], "outputTruncated": out["truncated"]}
+    if out.get("path"):
+        fields["outputPath"] = out["path"]
+    if err["truncated"]:
+        fields["errorBytes"] = err["bytes"]
+        fields["errorTruncated"] = True
+        if err.get("path"):
+            fields["errorPath"] = err["path"]
+    return fields
+
+
+async def update_file(ctx: ToolContext) -> None:
+    filepath = ctx.args.get("filepath")
+    if not filepath or all(ctx.args.get(k) is None for k in ("content", "patch", "edits")):
+        return
+    try:
+        path = _resolve_path_for_io(filepath, ctx.workdir)
+        # Full content, unified diff or line edits; base_hash check; temp file + fsync + os.replace
+        written = await asyncio.to_thread(update_file_sync, str(path), ctx.args)
+        if not written.get("unchanged"):
+            invalidate_path(str(path))
+        await ctx.send_result({
+            "filepath": filepath,
+            "sessionId": ctx.session_id,
+            **written,
+            "timestamp": ctx.timestamp(),
+        })
+    except PatchError as e:
+        # The agent has to know its edit did not land (and re-read on conflict)
+        log_unique(f"UPDATE_FILE not applied: {filepath} — {e}")
+        await ctx.send_result({
+            "filepath": filepath,
+            "sessionId": ctx.session_id,
+            "error": str(e),
+            "conflict": isinstance(e, PatchConflict),
+            "timestamp": ctx.timestamp(),
+        })
+    except Exception as e:
+        # Error logging remains local
+        log_unique(f"Failed to write file: {filepath} — {e}")
+
+
+def _command_timeout(data: dict):
+    """Effective RUN_COMMAND timeout: event timeout_seconds (null = none) or RUN_COMMAND_TIMEOUT_SECONDS."""
+    try:
+        env_default = int(os.environ.get("RUN_COMMAND_TIMEOUT_SECONDS", "120"))
+    except Exception:
+        env_default = 120
+    if "timeout_seconds" not in data:
+        return env_default
+    ts_value = data.get("timeout_seconds")
+    if ts_value is None:
+        return None  # No timeout
+    try:
+        return float(ts_value)
+    except Exception:
+        return env_default
+
+
+async def run_command_tool(ctx: ToolContext) -> None:
+    command = ctx.args.get("command")
+    if not command:
+        return
+    # Best-effort sanitize common LLM artifacts (no non-error logging here)
+    command, _reason = sanitize_shell_command(command)
+    data = ctx.data
+    timeout_sec = _command_timeout(data)
+
+    # Opt-in progress callbacks while the command runs (event.stream_output)
+    streamer = None
+    opts = stream_options(data.get("stream_output"))
+    if opts and ctx.ev.callback_id and ctx.send_progress is not None:
+        async def _send_progress(payload: dict):
+            payload.update({"sessionId": ctx.session_id, "command": command})
+            await ctx.send_progress(payload)
+
+        streamer = ProgressStreamer(_send_progress, **opts)
+
+    try:
+        # asyncio subprocess: the loop keeps serving SSE, leases and the prompt meanwhile
+        if streamer is not None:
+            streamer.start()
+        try:
+            result = await run_command(
+                command,
+                cwd=_get_cwd_for_commands(ctx.workdir),
+                timeout=timeout_sec,
+                on_output=streamer.feed if streamer is not None else None,
+                spill=spill_enabled(data.get("spill_output")),
+            )
+        finally:
+            if streamer is not None:
+                await streamer.close()
+    except Exception as e:
+        # Error logging remains in handler
+        log_unique(f"Command failed: {e}")
+        return
+
+    final_extra = _capture_fields(result)
+    if streamer is not None:
+        final_extra.update({"streamed": True, "progressUpdates": streamer.sent})
+    # Already head+tail bounded; a marker replaces the omitted middle
+    output = result["stdout"].strip()
+    if not result["timed_out"]:
+        await ctx.send_result({
+            "sessionId": ctx.session_id,
+            "command": command,
+            "output": output,
+            "error": result["stderr"].strip(),
+            "exitCode": result["exit_code"],
+            "timestamp": ctx.timestamp(),
+            **final_extra,
+        })
+        return
+    # Command exceeded the timeout; report the partial output
+    stderr_text = result["stderr"]
+    err_msg = f"Timed out after {timeout_sec}s" + (f": {stderr_text.strip()}" if stderr_text else "")
+    # Log timeout with explicit null exit code
+    log_unique("RUN_COMMAND timed out: exit=null")
+    await ctx.send_result({
+        "sessionId": ctx.session_id,
+        "command": command,
+        "output": output,
+        "error": err_msg,
+        "timestamp": ctx.timestamp(),
+        "timed_out": True,
+        "exitCode": None,
+        **final_extra,
+    })
+
+
+async def read_file(ctx: ToolContext) -> None:
+    filepath = ctx.args.get("filepath")
+    if not filepath:
+        return
+    try:
+        mapped_path = _resolve_path_for_io(filepath, ctx.workdir)
+        # Avoid sending overly large payloads back in callbacks
+        max_bytes = int(os.environ.get("READ_FILE_MAX_BYTES", "200000"))
+        # Bounded, ranged read (offset/length or start_line/end_line); UTF-8 with replacement.
+        # Off the loop: indexing lines of a large file is a full pass over it.
+        page = await asyncio.to_thread(read_range, str(mapped_path), ctx.args, max_bytes=max_bytes)
+
+        await ctx.send_result({
+            "sessionId": ctx.session_id,
+            "filepath": filepath,
+            **page,
+            "timestamp": ctx.timestamp(),
+        })
+    except Exception as e:
+        # Error logging remains in handler
+        log_unique(f"Failed to read file: {filepath} — {e}")
+        await ctx.send_result({
+            "sessionId": ctx.session_id,
+            "filepath": filepath,
+            "content": str(e),
+            "timestamp": ctx.timestamp(),
+        })
+
+
+# File tools do their I/O in worker threads: no timeout or stop once started (see executor)
+register_tool("UPDATE_FILE", update_file, pool="file", cancellable=False)
+register_tool("READ_FILE", read_file, pool="file", cancellable=False)
+register_tool("RUN_COMMAND", run_command_tool, pool="command")
+
+
+__all__ = ["update_file", "run_command_tool", "read_file"]
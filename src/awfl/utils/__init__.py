@@ -14,10 +14,16 @@ from .urls import (
 )
 from .workflows import (
     trigger_workflow,
+    trigger_workflow_async,
+    submit_workflow,
     _get_workflow_env_suffix,
     _ensure_env_suffix,
     _strip_env_suffix,
 )
+from .json_backend import (
+    json_loads,
+    json_backend_name,
+)
 from .constants import (
     PROJECT,
     LOCATION,
@@ -34,9 +40,14 @@ __all__ = [
     "get_api_origin",
     # workflows
     "trigger_workflow",
+    "trigger_workflow_async",
+    "submit_workflow",
     "_get_workflow_env_suffix",
     "_ensure_env_suffix",
     "_strip_env_suffix",
+    # json
+    "json_loads",
+    "json_backend_name",
     # constants
     "PROJECT",
     "LOCATION",
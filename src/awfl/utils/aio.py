@@ -0,0 +1,51 @@
+import asyncio
+from typing import Any, Awaitable, Optional, Set
+
+from .logging import log_unique
+
+# Helpers for code that may run either on the CLI's event loop (REPL, consumers)
+# or from a plain synchronous one-shot command.
+
+# Strong references: the loop only keeps weak references to tasks
+_background: Set[asyncio.Task] = set()
+
+
+def running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _done(task: asyncio.Task) -> None:
+    _background.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        log_unique(f"⚠️ Background task {task.get_name()} failed: {exc}")
+
+
+def spawn(coro: Awaitable[Any], *, name: str) -> asyncio.Task:
+    """Run coro in the background on the running loop; failures are logged, not raised."""
+    task = asyncio.get_running_loop().create_task(coro, name=name)
+    _background.add(task)
+    task.add_done_callback(_done)
+    return task
+
+
+def run_blocking(coro: Awaitable[Any]) -> Any:
+    """Run coro to completion from synchronous code that has no event loop."""
+
+    async def _main():
+        from .http import close_http_session
+
+        try:
+            return await coro
+        finally:
+            await close_http_session()
+
+    return asyncio.run(_main())
+
+
+__all__ = ["running_loop", "spawn", "run_blocking"]
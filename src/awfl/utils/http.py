@@ -0,0 +1,206 @@
+import asyncio
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from .logging import log_unique
+
+# Process-wide pooled HTTP clients.
+#
+# Every subsystem (SSE consumer, cursors, leases, workspace resolution, tool
+# callbacks, workflow execute/stop, auth token exchanges) goes through one of
+# two shared clients instead of opening its own connections:
+#
+# - get_http_session(): one aiohttp.ClientSession per event loop with a
+#   keep-alive TCPConnector (per-host limit, DNS cache). Callers pass
+#   per-request timeouts where the default does not fit (e.g. the SSE stream).
+# - get_sync_session(): one requests.Session with a pooled HTTPAdapter for the
+#   synchronous call sites.
+#
+# Tuning (env): AWFL_HTTP_POOL_LIMIT (100), AWFL_HTTP_POOL_PER_HOST (16),
+# AWFL_HTTP_DNS_TTL_SECS (300), AWFL_HTTP_KEEPALIVE_SECS (30),
+# AWFL_HTTP_TIMEOUT_SECS (30), AWFL_HTTP_CONNECT_TIMEOUT_SECS (10).
+# http_stats() reports request counts and connection reuse for `status`.
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def default_timeout() -> aiohttp.ClientTimeout:
+    return aiohttp.ClientTimeout(
+        total=_env_float("AWFL_HTTP_TIMEOUT_SECS", 30.0),
+        sock_connect=_env_float("AWFL_HTTP_CONNECT_TIMEOUT_SECS", 10.0),
+    )
+
+
+def auth_headers(base: Optional[Dict[str, str]] = None, *, purpose: Optional[str] = None) -> Dict[str, str]:
+    """base headers plus the API auth headers.
+
+    Best-effort: when auth cannot be resolved the request goes out without it
+    (logged when a purpose is given, e.g. "cursors GET").
+    """
+    headers: Dict[str, str] = dict(base or {})
+    try:
+        from awfl.auth import get_auth_headers  # late import: awfl.auth imports awfl.utils
+
+        headers.update(get_auth_headers() or {})
+    except Exception as e:
+        if purpose:
+            log_unique(f"⚠️ Could not resolve auth headers for {purpose}: {e}")
+    return headers
+
+
+async def auth_headers_async(base: Optional[Dict[str, str]] = None, *, purpose: Optional[str] = None) -> Dict[str, str]:
+    """auth_headers() for callers on the event loop: token refreshes do not block it."""
+    headers: Dict[str, str] = dict(base or {})
+    try:
+        from awfl.auth import get_auth_headers_async
+
+        headers.update(await get_auth_headers_async() or {})
+    except Exception as e:
+        if purpose:
+            log_unique(f"⚠️ Could not resolve auth headers for {purpose}: {e}")
+    return headers
+
+
+# ----- async (aiohttp) -----
+
+_async_stats: Dict[str, int] = {
+    "requests": 0,
+    "connections_created": 0,
+    "connections_reused": 0,
+    "dns_cache_hits": 0,
+    "dns_cache_misses": 0,
+    "sessions_created": 0,
+}
+
+# id(loop) -> (loop, session); aiohttp sessions are bound to the loop that created them
+_sessions: Dict[int, Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+
+
+def _count(key: str):
+    async def _hook(session, ctx, params):
+        _async_stats[key] += 1
+
+    return _hook
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    tc = aiohttp.TraceConfig()
+    tc.on_request_start.append(_count("requests"))
+    tc.on_connection_create_end.append(_count("connections_created"))
+    tc.on_connection_reuseconn.append(_count("connections_reused"))
+    tc.on_dns_cache_hit.append(_count("dns_cache_hits"))
+    tc.on_dns_cache_miss.append(_count("dns_cache_misses"))
+    return tc
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Shared keep-alive session for the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    for key, (l, s) in list(_sessions.items()):
+        if l.is_closed() or (l is loop and s.closed):
+            _sessions.pop(key, None)
+    entry = _sessions.get(id(loop))
+    if entry is not None:
+        return entry[1]
+    connector = aiohttp.TCPConnector(
+        limit=max(1, _env_int("AWFL_HTTP_POOL_LIMIT", 100)),
+        limit_per_host=max(1, _env_int("AWFL_HTTP_POOL_PER_HOST", 16)),
+        use_dns_cache=True,
+        ttl_dns_cache=max(1, _env_int("AWFL_HTTP_DNS_TTL_SECS", 300)),
+        keepalive_timeout=max(1.0, _env_float("AWFL_HTTP_KEEPALIVE_SECS", 30.0)),
+    )
+    session = aiohttp.ClientSession(connector=connector, timeout=default_timeout(), trace_configs=[_trace_config()])
+    _sessions[id(loop)] = (loop, session)
+    _async_stats["sessions_created"] += 1
+    return session
+
+
+async def close_http_session() -> None:
+    """Close the running loop's shared session (call before the loop shuts down)."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    entry = _sessions.pop(id(loop), None)
+    if entry is not None and not entry[1].closed:
+        await entry[1].close()
+
+
+# ----- sync (requests) -----
+
+_sync_session: Optional[requests.Session] = None
+_sync_lock = threading.Lock()
+
+
+def get_sync_session() -> requests.Session:
+    """Shared requests.Session with a keep-alive connection pool."""
+    global _sync_session
+    if _sync_session is not None:
+        return _sync_session
+    with _sync_lock:
+        if _sync_session is None:
+            s = requests.Session()
+            per_host = max(1, _env_int("AWFL_HTTP_POOL_PER_HOST", 16))
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=per_host)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _sync_session = s
+    return _sync_session
+
+
+def _sync_stats() -> Dict[str, int]:
+    out = {"requests": 0, "connections_created": 0, "pools": 0}
+    s = _sync_session
+    if s is None:
+        return out
+    seen = set()
+    for adapter in s.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        try:
+            pools = list(adapter.poolmanager.pools._container.values())
+        except Exception:
+            continue
+        for pool in pools:
+            out["pools"] += 1
+            out["requests"] += getattr(pool, "num_requests", 0)
+            out["connections_created"] += getattr(pool, "num_connections", 0)
+    return out
+
+
+def http_stats() -> Dict[str, Dict[str, Any]]:
+    """Request and connection-reuse counters for the shared clients."""
+    a = dict(_async_stats)
+    a["open_sessions"] = sum(1 for l, s in _sessions.values() if not s.closed)
+    s = _sync_stats()
+    s["connections_reused"] = max(0, s["requests"] - s["connections_created"])
+    return {"async": a, "sync": s}
+
+
+__all__ = [
+    "auth_headers",
+    "auth_headers_async",
+    "default_timeout",
+    "get_http_session",
+    "close_http_session",
+    "get_sync_session",
+    "http_stats",
+]
@@ -0,0 +1,33 @@
+import json
+import os
+from typing import Any
+
+# Optional fast JSON decoding for the event hot path.
+#
+# orjson is used when installed (pip install "awfl[fast]") unless
+# AWFL_JSON_BACKEND=stdlib; otherwise the stdlib json module is used. Inputs
+# orjson rejects but json accepts (NaN/Infinity, lone surrogates) fall back to
+# the stdlib decoder so behavior never depends on which backend is present.
+
+_orjson: Any = None
+if (os.getenv("AWFL_JSON_BACKEND") or "").strip().lower() != "stdlib":
+    try:
+        import orjson as _orjson  # type: ignore
+    except Exception:
+        _orjson = None
+
+
+def json_backend_name() -> str:
+    return "orjson" if _orjson is not None else "json"
+
+
+def json_loads(data: str | bytes | bytearray | memoryview) -> Any:
+    """Decode a JSON document using the fastest available backend."""
+    if _orjson is not None:
+        try:
+            return _orjson.loads(data)
+        except _orjson.JSONDecodeError:
+            pass
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import time
+import unittest
+from unittest import mock
+
+from aiohttp.test_utils import TestServer
+
+from awfl import state
+from awfl.cmds.exec_ctl import stop_or_cancel_active_async
+from awfl.devrelay import RelayState, make_app
+from awfl.utils.http import close_http_session
+from awfl.utils.workflows import submit_workflow, trigger_workflow, trigger_workflow_async
+
+
+class TestAsyncTrigger(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.relay = RelayState(execute_delay_secs=0.3)
+        self.server = TestServer(make_app(self.relay))
+        await self.server.start_server()
+        env = mock.patch.dict(
+            os.environ,
+            {"API_ORIGIN": str(self.server.make_url("")).rstrip("/"), "SKIP_AUTH": "1", "WORKFLOW_EXEC_MODE": "api"},
+        )
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(state.clear_active_execution)
+
+    async def asyncTearDown(self):
+        await close_http_session()
+        await self.server.close()
+
+    async def test_execute_does_not_block_the_loop(self):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        t = asyncio.create_task(ticker())
+        try:
+            await trigger_workflow_async("wf", {"sessionId": "s1", "query": "hi"})
+        finally:
+            t.cancel()
+        self.assertGreater(ticks, 10)
+        name, wf = state.get_active_execution()
+        self.assertIn("/executions/", name)
+        self.assertEqual(wf, "wf")
+
+        self.assertTrue(await stop_or_cancel_active_async())
+        self.assertIsNone(state.get_active_execution())
+        self.assertTrue(next(iter(self.relay.executions.values()))["stopped"])
+
+    async def test_submit_returns_immediately_and_keeps_order(self):
+        t0 = time.monotonic()
+        tasks = [submit_workflow("wf", {"sessionId": "s1", "query": f"q{i}"}) for i in range(3)]
+        trigger_workflow("wf", {"sessionId": "s1", "query": "q3"})  # on the loop: also submitted
+        self.assertLess(time.monotonic() - t0, 0.1)
+        await asyncio.wait_for(asyncio.gather(*tasks), 5)
+        for _ in range(100):
+            if len(self.relay.executions) == 4:
+                break
+            await asyncio.sleep(0.05)
+        queries = [ex["params"]["query"] for ex in self.relay.executions.values()]
+        self.assertEqual(queries, ["q0", "q1", "q2", "q3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
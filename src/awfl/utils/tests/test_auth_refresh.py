@@ -0,0 +1,56 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+from awfl import auth
+
+
+class TestAsyncRefreshSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.acct = {"idToken": "old", "refreshToken": "r", "expiresAt": 0, "firebaseUid": "u"}
+        self.refreshes = 0
+
+        async def fake_refresh(token):
+            self.refreshes += 1
+            await asyncio.sleep(0.05)
+            return f"new-{self.refreshes}", token, auth._now() + 3600
+
+        def fake_store(a, id_token, refresh_token, expires_at, _project=None):
+            a.update({"idToken": id_token, "refreshToken": refresh_token, "expiresAt": expires_at})
+            return a
+
+        env = {k: v for k, v in os.environ.items() if k not in ("SKIP_AUTH", "FIREBASE_ID_TOKEN", "FIREBASE_CUSTOM_TOKEN")}
+        for p in (
+            mock.patch.dict(os.environ, env, clear=True),
+            mock.patch.object(auth, "_resolve_gcp_project", lambda: "p"),
+            mock.patch.object(auth, "_cached_account", lambda _p: self.acct),
+            mock.patch.object(auth, "_firebase_refresh_async", fake_refresh),
+            mock.patch.object(auth, "_store_refreshed", fake_store),
+            mock.patch.object(auth, "get_auth_headers", lambda: {"Authorization": f"Bearer {self.acct['idToken']}"}),
+        ):
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _contend(self, n: int = 5):
+        async def main():
+            return await asyncio.gather(*(auth.get_auth_headers_async() for _ in range(n)))
+
+        return asyncio.run(main())
+
+    def test_concurrent_callers_share_one_refresh(self):
+        results = self._contend()
+        self.assertEqual(self.refreshes, 1)
+        self.assertEqual({r["Authorization"] for r in results}, {"Bearer new-1"})
+
+    def test_contention_on_separate_loops(self):
+        self._contend()
+        # Expire again so the second loop contends on the lock too
+        self.acct["expiresAt"] = 0
+        results = self._contend()
+        self.assertEqual(self.refreshes, 2)
+        self.assertEqual({r["Authorization"] for r in results}, {"Bearer new-2"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+from aiohttp.test_utils import TestServer
+
+from awfl.devrelay import RelayState, make_app
+from awfl.events.workspace import get_or_create_workspace
+from awfl.utils.http import auth_headers, close_http_session, get_http_session, get_sync_session, http_stats
+
+
+class TestSharedHttpClients(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = TestServer(make_app(RelayState()))
+        await self.server.start_server()
+        env = mock.patch.dict(os.environ, {"API_ORIGIN": str(self.server.make_url("")).rstrip("/"), "SKIP_AUTH": "1"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    async def asyncTearDown(self):
+        await close_http_session()
+        await self.server.close()
+
+    async def test_async_session_is_shared_and_reuses_connections(self):
+        http = get_http_session()
+        self.assertIs(get_http_session(), http)
+        before = http_stats()["async"]
+        for i in range(5):
+            await get_or_create_workspace(http, f"p{i}")
+        after = http_stats()["async"]
+        self.assertEqual(after["requests"] - before["requests"], 10)  # resolve + register per project
+        self.assertEqual(after["connections_created"] - before["connections_created"], 1)
+        self.assertEqual(after["connections_reused"] - before["connections_reused"], 9)
+
+        await close_http_session()
+        self.assertTrue(http.closed)
+        self.assertIsNot(get_http_session(), http)
+
+    async def test_sync_session_pools_connections(self):
+        url = str(self.server.make_url("/_relay/stats"))
+
+        def fetch(n):
+            s = get_sync_session()
+            return [s.get(url, timeout=5).status_code for _ in range(n)]
+
+        before = http_stats()["sync"]
+        self.assertEqual(await asyncio.to_thread(fetch, 3), [200, 200, 200])
+        after = http_stats()["sync"]
+        self.assertEqual(after["requests"] - before["requests"], 3)
+        self.assertEqual(after["connections_created"] - before["connections_created"], 1)
+
+    async def test_auth_headers_are_best_effort(self):
+        def boom():
+            raise RuntimeError("no token")
+
+        with mock.patch("awfl.auth.get_auth_headers", boom):
+            self.assertEqual(auth_headers({"Accept": "x"}, purpose="test"), {"Accept": "x"})
+        self.assertEqual(auth_headers({"Accept": "x"})["X-Skip-Auth"], "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
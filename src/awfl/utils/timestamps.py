@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional
+
+
+def parse_timestamp(ts: object) -> Optional[float]:
+    """Epoch seconds for an ISO-8601 (Z or offset) or numeric-seconds timestamp, else None."""
+    if ts is None or ts == "":
+        return None
+    if isinstance(ts, (int, float)) and not isinstance(ts, bool):
+        return float(ts)
+    s = str(ts).strip()
+    try:
+        if s.endswith("Z"):
+            s = s[:-1] + "+00:00"
+        return datetime.fromisoformat(s).timestamp()
+    except Exception:
+        try:
+            return float(s)
+        except Exception:
+            return None
+
+
+__all__ = ["parse_timestamp"]
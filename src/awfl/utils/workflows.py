@@ -1,10 +1,15 @@
+import asyncio
+import json
 import os
-import requests
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
-from awfl.auth import get_auth_headers
+import aiohttp
+
+from awfl.auth import get_auth_headers_async
 from awfl.state import set_active_execution, get_workflow_env_suffix as _state_get_env_suffix
 
+from .aio import run_blocking, running_loop, spawn
+from .http import get_http_session
 from .logging import log_unique, _is_debug
 from .urls import get_api_origin
 
@@ -42,14 +47,10 @@ def _mask_auth_header(headers: dict) -> dict:
     return masked
 
 
-def trigger_workflow(name: str, data: Dict[str, Any]):
-    """Trigger a workflow. Supports two modes:
-    - api (default): POST /workflows/execute with Firebase Auth
-    - gcloud: (not implemented here in refactor snapshot)
-
-    Select via WORKFLOW_EXEC_MODE env var: 'api' (default) or 'gcloud'.
+def _execute_request(name: str, data: Dict[str, Any], auth: Dict[str, str]) -> Optional[Tuple[str, Dict[str, str], Dict[str, Any], str]]:
+    """Build (url, headers, payload, workflow name) for /workflows/execute, or None when not in api mode.
 
-    IMPORTANT: Env suffixing is now centralized here to avoid double-appending.
+    IMPORTANT: Env suffixing is centralized here to avoid double-appending.
       - api mode: send UNSUFFIXED workflowName (server will apply WORKFLOW_ENV)
       - gcloud mode: execute SUFFIXED workflow name locally (not implemented in this snapshot)
     """
@@ -69,103 +70,139 @@ def trigger_workflow(name: str, data: Dict[str, Any]):
     if "fund" not in data:
         data["fund"] = fund_value if fund_value is not None else 1
 
-    # Always include userAuthToken parameter when available (Google Identity Platform ID token)
-    # user_auth_token = None
-    auth_headers_for_params = {}
-    try:
-        auth_headers_for_params = get_auth_headers()
-        # user_auth_token = _extract_user_auth_token_from_headers(auth_headers_for_params)
-    except Exception as e:
-        # Non-fatal for param injection; continue without token
-        log_unique(f"⚠️ Could not resolve user auth token for params: {e}")
-
     data["background"] = False
 
     exec_mode = os.getenv("WORKFLOW_EXEC_MODE", "api").lower()
     suffix = _get_workflow_env_suffix()
 
-    if exec_mode == "api":
-        # Server applies env suffix; ensure we DO NOT include it
-        wf_name = _strip_env_suffix(name, suffix)
-        origin = get_api_origin()
-        url = f"{origin}/workflows/execute"
-        payload = {
-            "workflowName": wf_name,
-            "params": data,
-            "sync": True,
-        }
+    if exec_mode != "api":
+        # Placeholder for gcloud execution mode; intentionally left unimplemented in initial split
+        log_unique("⚠️ WORKFLOW_EXEC_MODE=gcloud not implemented in utils.workflows yet")
+        return None
+
+    # Server applies env suffix; ensure we DO NOT include it
+    wf_name = _strip_env_suffix(name, suffix)
+    origin = get_api_origin()
+    url = f"{origin}/workflows/execute"
+    payload = {
+        "workflowName": wf_name,
+        "params": data,
+        "sync": True,
+    }
+    headers = {"Content-Type": "application/json"}
+    headers.update(auth)
+
+    if _is_debug():
+        masked = _mask_auth_header(headers)
+        log_unique(
+            "AWFL_DEBUG: Executing via API"
+            + f"\n  exec_mode=api wf_name={wf_name} suffix={suffix!r}"
+            + f"\n  origin={origin}"
+            + f"\n  url={url}"
+            + f"\n  headers={masked}"
+            + f"\n  params.keys={list(payload.keys())}"
+        )
+    return url, headers, payload, wf_name
+
+
+def _handle_execute_response(status: int, text: str, resp_headers, req_url: str, wf_name: str) -> None:
+    if status >= 400:
         try:
-            headers = {"Content-Type": "application/json"}
-            # Reuse the headers we already resolved if present; else resolve now
-            if auth_headers_for_params:
-                headers.update(auth_headers_for_params)
-            else:
-                headers.update(get_auth_headers())
-        except Exception as e:
-            log_unique(f"❌ Auth initialization failed: {e}")
-            return
-
+            err_body = json.loads(text)
+        except Exception:
+            err_body = text
         if _is_debug():
-            masked = _mask_auth_header(headers)
             log_unique(
-                "AWFL_DEBUG: Executing via API"
-                + f"\n  exec_mode=api wf_name={wf_name} suffix={suffix!r}"
-                + f"\n  origin={origin}"
-                + f"\n  url={url}"
-                + f"\n  headers={masked}"
-                + f"\n  params.keys={list(payload.keys())}"
+                "AWFL_DEBUG: API error"
+                + f"\n  status={status} content-type={resp_headers.get('content-type')} via={resp_headers.get('via')}"
+                + f"\n  request_url={req_url}"
+                + f"\n  response_body={str(err_body)[:500]}"
             )
+        log_unique(f"❌ API execute failed ({status}): {err_body}")
+        return
 
-        try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=60)
-            if resp.status_code >= 400:
-                try:
-                    err_body = resp.json()
-                except Exception:
-                    err_body = resp.text
-                if _is_debug():
-                    req_url = getattr(resp.request, 'url', url)
-                    ct = resp.headers.get('content-type')
-                    via = resp.headers.get('via')
-                    log_unique(
-                        "AWFL_DEBUG: API error"
-                        + f"\n  status={resp.status_code} content-type={ct} via={via}"
-                        + f"\n  request_url={req_url}"
-                        + f"\n  response_body={str(err_body)[:500]}"
-                    )
-                log_unique(f"❌ API execute failed ({resp.status_code}): {err_body}")
-                return
-
-            try:
-                body = resp.json()
-            except Exception:
-                body = {"raw": resp.text}
-
-            # Try to extract an execution name if the server returns one
-            execution_name = None
-            if isinstance(body, dict):
-                execution_name = body.get("executionName") or body.get("name")
-                if not execution_name and isinstance(body.get("execution"), dict):
-                    execution_name = body["execution"].get("name")
-
-            # if execution_name:
-            #     log_unique(f"🚀 Execution started: {execution_name}")
-            # else:
-            #     log_unique(f"🚀 Execution requested for {wf_name}")
-
-            if execution_name:
-                set_active_execution(execution_name, wf_name)
-            return
-        except Exception as e:
-            if _is_debug():
-                log_unique(f"AWFL_DEBUG: Exception during requests.post: {e}")
-            log_unique(f"❌ Error calling API execute: {e}")
-            return
-
-    # Placeholder for gcloud execution mode; intentionally left unimplemented in initial split
-    log_unique("⚠️ WORKFLOW_EXEC_MODE=gcloud not implemented in utils.workflows yet")
+    try:
+        body = json.loads(text)
+    except Exception:
+        body = {"raw": text}
+
+    # Try to extract an execution name if the server returns one
+    execution_name = None
+    if isinstance(body, dict):
+        execution_name = body.get("executionName") or body.get("name")
+        if not execution_name and isinstance(body.get("execution"), dict):
+            execution_name = body["execution"].get("name")
+
+    if execution_name:
+        set_active_execution(execution_name, wf_name)
+
+
+async def trigger_workflow_async(name: str, data: Dict[str, Any]) -> None:
+    """Trigger a workflow without blocking the event loop.
+
+    - api (default): POST /workflows/execute with Firebase Auth on the shared aiohttp session
+    - gcloud: (not implemented here in refactor snapshot)
+
+    Select via WORKFLOW_EXEC_MODE env var: 'api' (default) or 'gcloud'.
+    The execute call is synchronous server-side (up to 60s); awaiting it here keeps
+    the SSE consumers and the project lock refresher running meanwhile.
+    """
+    try:
+        auth = await get_auth_headers_async()
+    except Exception as e:
+        log_unique(f"❌ Auth initialization failed: {e}")
+        return
+
+    req = _execute_request(name, data, auth)
+    if req is None:
+        return
+    url, headers, payload, wf_name = req
+    try:
+        async with get_http_session().post(url, headers=headers, json=payload, timeout=aiohttp.ClientTimeout(total=60)) as resp:
+            text = await resp.text()
+            _handle_execute_response(resp.status, text, resp.headers, str(resp.url), wf_name)
+    except Exception as e:
+        if _is_debug():
+            log_unique(f"AWFL_DEBUG: Exception during execute POST: {e!r}")
+        log_unique(f"❌ Error calling API execute: {e}")
+
+
+_last_submit: Optional[asyncio.Task] = None
+
+
+def submit_workflow(name: str, data: Dict[str, Any]) -> asyncio.Task:
+    """Schedule trigger_workflow_async() on the running loop and return immediately.
+
+    Submissions are chained so prompts reach the server in the order they were typed.
+    """
+    global _last_submit
+    prev = _last_submit
+    loop = asyncio.get_running_loop()
+
+    async def _run():
+        if prev is not None and not prev.done() and prev.get_loop() is loop:
+            await asyncio.wait({prev})
+        await trigger_workflow_async(name, data)
+
+    _last_submit = spawn(_run(), name=f"trigger-{name}")
+    return _last_submit
+
+
+def trigger_workflow(name: str, data: Dict[str, Any]):
+    """Trigger a workflow (see trigger_workflow_async).
+
+    From synchronous one-shot commands this blocks until the server answers; when
+    called on the CLI's event loop (e.g. `call` typed at the prompt) it submits in
+    the background via submit_workflow() instead.
+    """
+    if running_loop() is not None:
+        submit_workflow(name, data)
+        return
+    run_blocking(trigger_workflow_async(name, data))
 
 
 __all__ = [
     "trigger_workflow",
+    "trigger_workflow_async",
+    "submit_workflow",
 ]